@@ -5,11 +5,146 @@ Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
 Date: March 27, 2026
 """
 
-class InterferenceGraph:
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from types import MappingProxyType
+
+from interm_rep import ThreeAdrInst
+
+
+class ColouringSearch:
+    """
+    The exact colouring search. Works on any object with a graph mapping
+    (variable -> neighbours), a color dictionary and a search_nodes
+    counter: an InterferenceGraph colours itself, while an
+    AllocationState colours a shared FrozenGraph. The pinned and
+    forbidden register constraints (see InterferenceGraph) default to
+    none.
+    """
+
+    pinned = MappingProxyType({})
+    forbidden = MappingProxyType({})
+
+    def is_safe(self, node, register): 
+        """
+        Checks whether assigning the given register to the given node
+        would conflict with any of its neighbours' current assignments.
+        Args:
+            node: The variable name (str) to check.
+            register: The register number (int) being considered.
+        Returns:
+            bool: True if no neighbour of the node is already assigned
+                to the given register, False otherwise.
+        """
+        for neighbor in self.graph.get(node, ()): 
+            if self.color.get(neighbor) == register:
+                return False    
+        return True
+      
+    def allocate_registers(self, num_registers, color_these_nodes, colours_used=None,
+                           budget=None):
+        """
+        Attempts to assign registers to all nodes using backtracking graph
+        colouring. The backtracking keeps its own stack (one entry per
+        node being coloured) instead of recursing, so graphs of any size
+        can be searched without hitting the recursion limit.
+
+        Registers are interchangeable, so a node is only offered the
+        colours already in use plus the lowest unused one: trying any other
+        unused colour would just explore a renamed copy of the same partial
+        colouring. This cuts up to k! equivalent branches from a proof that
+        no colouring exists, and the first colouring found is unchanged.
+
+        Pinned nodes are pre-coloured by the outermost call and left out
+        of the search, and a node is never offered a forbidden register.
+        Registers named by any constraint are not interchangeable, so the
+        outermost call counts all of them as already in use.
+        Args:
+            num_registers: The number of available CPU registers
+                (colours).
+            color_these_nodes: A list of variable name strings still
+                to be coloured.
+            colours_used: The number of colours (0 up to colours_used - 1)
+                the current partial colouring may already use. If None,
+                the pins are applied, and it is taken from the colours in
+                self.color and the forbidden registers.
+            budget: The most search nodes this call may use, or None for
+                no limit. The search is exponential in the worst case.
+        Returns:
+            bool: True if a valid colouring was found for all nodes,
+                False otherwise (including when the pins conflict).
+                None if the budget ran out first; the nodes are then left
+                uncoloured.
+        """
+        if colours_used is None:
+            if _pin_conflict(self, num_registers):
+                return False
+            self.color.update(_pinned_nodes(self))
+            color_these_nodes = [n for n in color_these_nodes if n not in self.pinned]
+            colours_used = max(chain(self.color.values(), *self.forbidden.values()),
+                               default=-1) + 1
+        nodes = list(color_these_nodes)
+        limit_nodes = None if budget is None else self.search_nodes + budget
+        self._count_search_node()
+        if not nodes:
+            return True
+
+        # Per depth: the next register to try for nodes[depth], and the
+        # colours the partial colouring above it may use.
+        next_reg = [0] * len(nodes)
+        used = [colours_used] * len(nodes)
+        depth = 0
+        while depth >= 0:
+            curr = nodes[depth]
+            self.color.pop(curr, None)
+            # The registers curr cannot take: its neighbours' (see
+            # is_safe) and its forbidden ones.
+            taken = {self.color.get(neighbour) for neighbour in self.graph.get(curr, ())}
+            taken.update(self.forbidden.get(curr, ()))
+            limit = min(num_registers, used[depth] + 1)
+            reg = next_reg[depth]
+            while reg < limit and reg in taken:
+                reg += 1
+            if reg == limit:
+                # No colour left for this node: backtrack
+                next_reg[depth] = 0
+                depth -= 1
+                continue
+            self.color[curr] = reg
+            next_reg[depth] = reg + 1
+            self._count_search_node()
+            if limit_nodes is not None and self.search_nodes >= limit_nodes:
+                for node in nodes[:depth + 1]:
+                    del self.color[node]
+                return None
+            if depth + 1 == len(nodes):
+                # Optimal coloring for all nodes has been found
+                return True
+            used[depth + 1] = max(used[depth], reg + 1)
+            depth += 1
+        # No possible coloring exists
+        return False
+
+    def _count_search_node(self):
+        """Count one node of the search tree; subclasses may override it
+        to stop a search (see portfolio.py)."""
+        self.search_nodes += 1
+
+
+class InterferenceGraph(ColouringSearch):
     """
     Interference graph for register allocation.
     Key: Variable name (string)
-    Value: Set of interfering variables (set of strings)
+    Value: Interfering variables, as a dict whose keys are the variable
+        names (values are None). A dict is used as an insertion-ordered
+        set: iterating a set of strings follows their hashes, which change
+        with PYTHONHASHSEED, and the order of nodes and neighbours decides
+        ties in colouring and spilling. With dicts the same input always
+        gives the same graph, colouring and assembly.
+
+    Register constraints: pinned maps a variable to the register it must
+    be given, and forbidden maps a variable to the registers it must not
+    be given. build_interfere_graph copies them from the instruction list.
     
     Designed with dynamically allocated nodes and edges. 
     *Preferred method to 2D array implementation as there will likely be
@@ -23,6 +158,9 @@ class InterferenceGraph:
         """
         self.graph = {}
         self.color = {}
+        self.pinned = {}        # variable -> register it must be given
+        self.forbidden = {}     # variable -> registers it must not be given
+        self.search_nodes = 0   # calls made by allocate_registers so far
         
     def add_node(self, var):
         """
@@ -34,7 +172,7 @@ class InterferenceGraph:
             None
         """
         if var not in self.graph:
-            self.graph[var] = set()
+            self.graph[var] = {}
 
     def add_edge(self, var1, var2):
         """
@@ -50,8 +188,43 @@ class InterferenceGraph:
         if var1 != var2:
             self.add_node(var1)
             self.add_node(var2)
-            self.graph[var1].add(var2)
-            self.graph[var2].add(var1)
+            self.graph[var1][var2] = None
+            self.graph[var2][var1] = None
+
+    def remove_edge(self, var1, var2):
+        """
+        Removes the interference edge between two variables, if present.
+        The nodes themselves are kept.
+        Args:
+            var1: The first variable name (str).
+            var2: The second variable name (str).
+        Returns:
+            None
+        """
+        self.graph.get(var1, {}).pop(var2, None)
+        self.graph.get(var2, {}).pop(var1, None)
+
+    def remove_node(self, var):
+        """
+        Removes a variable, every edge touching it and its colour.
+        Args:
+            var: The variable name (str) to remove.
+        Returns:
+            None
+        """
+        for neighbour in self.graph.pop(var, ()):
+            self.graph[neighbour].pop(var, None)
+        self.color.pop(var, None)
+
+    def freeze(self):
+        """
+        Returns a read-only snapshot of the graph's nodes, edges and
+        register constraints (not its colouring); later changes to this
+        graph do not affect it.
+        Returns:
+            FrozenGraph: The snapshot.
+        """
+        return FrozenGraph(self.graph, self.pinned, self.forbidden)
 
     def __str__(self):
         """
@@ -65,68 +238,349 @@ class InterferenceGraph:
         for node, edges in self.graph.items():
             res += f"  {node}: {', '.join(edges)}\n"
         return res
-    
-    def is_safe(self, node, register): 
+
+
+def _pinned_nodes(graph) -> dict:
+    """Return the pins of the graph's nodes (pins of variables that are
+    not in the graph are ignored)."""
+    return {var: reg for var, reg in graph.pinned.items() if var in graph.graph}
+
+
+def _pin_conflict(graph, num_registers):
+    """
+    Checks that the pins can all be honoured at once.
+    Args:
+        graph: The graph (anything with graph, pinned and forbidden).
+        num_registers: The number of available CPU registers.
+    Returns:
+        str: A description of the first conflict, or None if there is
+            none.
+    """
+    pinned = _pinned_nodes(graph)
+    for var, reg in pinned.items():
+        if not 0 <= reg < num_registers:
+            return f"'{var}' is pinned to R{reg}, but only {num_registers} register(s) exist"
+        if reg in graph.forbidden.get(var, ()):
+            return f"'{var}' is pinned to R{reg}, which it is forbidden"
+        for neighbour in graph.graph[var]:
+            if pinned.get(neighbour) == reg:
+                return f"'{var}' and '{neighbour}' interfere but are both pinned to R{reg}"
+    return None
+
+
+def _simplify(graph, num_colours, keep=()):
+    """
+    Chaitin-style simplification. Repeatedly removes a node with fewer than
+    num_colours remaining neighbours; when none is left, the node with the
+    most remaining neighbours is removed as a spill candidate instead (ties
+    go to the earliest node).
+    Args:
+        graph: The InterferenceGraph to simplify.
+        num_colours: The number of colours available.
+        keep: Nodes that must not become spill candidates (the pinned
+            ones); they are only removed once nothing else is left.
+    Returns:
+        tuple: (order, spilled) where order lists every node in reverse
+            removal order, the order in which they should be coloured, and
+            spilled lists the spill candidates in the order they were
+            chosen. Colouring the nodes of order that are not in spilled
+            never needs to backtrack.
+    """
+    degree = {node: len(edges) for node, edges in graph.graph.items()}
+    removed = []
+    spilled = []
+    while degree:
+        node = next((n for n, d in degree.items() if d < num_colours), None)
+        if node is None:
+            candidates = [n for n in degree if n not in keep] if keep else degree
+            if candidates:
+                node = max(candidates, key=degree.get)
+                spilled.append(node)
+            else:
+                node = next(iter(degree))
+        removed.append(node)
+        del degree[node]
+        for neighbour in graph.graph[node]:
+            if neighbour in degree:
+                degree[neighbour] -= 1
+    return removed[::-1], spilled
+
+
+def colour_in_order(graph, num_colours, order):
+    """
+    Gives each node in order the lowest colour none of its already
+    coloured neighbours has (and that is not forbidden to it). For an
+    order produced by _simplify with no spill candidates this always
+    succeeds and is exactly the colouring allocate_registers would find,
+    without its backtracking stack.
+    Args:
+        graph: The InterferenceGraph to colour; colours are added to
+            graph.color.
+        num_colours: The number of colours available.
+        order: The nodes to colour, in order.
+    Returns:
+        bool: True if every node got a colour. On False, the nodes
+            before the first failure keep their colours.
+    """
+    color = graph.color
+    forbidden = graph.forbidden
+    for node in order:
+        used = {color.get(n) for n in graph.graph[node]}
+        if forbidden:
+            used.update(forbidden.get(node, ()))
+        colour = next((c for c in range(num_colours) if c not in used), None)
+        if colour is None:
+            return False
+        color[node] = colour
+    return True
+
+
+def allocate_with_spills(graph, num_registers, search=None):
+    """
+    Colours the graph with num_registers registers, spilling variables to
+    memory when no valid colouring exists. If any variable has to be
+    spilled, register R<num_registers - 1> is reserved as the scratch
+    register used by the spill code, so only num_registers - 1 colours are
+    handed out.
+
+    When _simplify finds nothing to spill, its order is coloured directly
+    (colour_in_order; no backtracking is needed). Otherwise the exact
+    search is tried in that order, and if it fails too the spill
+    candidates of _simplify with one colour fewer are spilled.
+
+    Pinned variables start with their registers and are never spilled,
+    and no variable is given a forbidden register. Constraints can make
+    the direct colouring fail, in which case the exact search runs, and
+    can make the colouring after spilling fail, in which case each
+    variable it could not colour is spilled as well.
+    Args:
+        graph: The InterferenceGraph to colour. Its color dictionary is
+            overwritten with the final assignment.
+        num_registers: The number of available CPU registers.
+        search: The exact search, called as search(graph, num_registers,
+            order) and returning True if it coloured the graph. Defaults
+            to InterferenceGraph.allocate_registers; see
+            portfolio.portfolio_search for a parallel one.
+    Returns:
+        list: The spilled variable names, in the order they were chosen.
+            Empty if every variable was given a register.
+    Raises:
+        ValueError: If spilling is needed but fewer than two registers
+            are available (one is always taken by the scratch register),
+            or the pins conflict with each other, with the forbidden
+            registers or with the scratch register.
+    """
+    conflict = _pin_conflict(graph, num_registers)
+    if conflict:
+        raise ValueError(f"Register constraints cannot be met: {conflict}")
+    pinned = _pinned_nodes(graph)
+    graph.color = dict(pinned)
+    order, candidates = _simplify(graph, num_registers, pinned)
+    if pinned:
+        order = [n for n in order if n not in pinned]
+    if not candidates and colour_in_order(graph, num_registers, order):
+        return []
+    graph.color = dict(pinned)
+    search = search or InterferenceGraph.allocate_registers
+    if search(graph, num_registers, order):
+        return []
+    return _spill_and_colour(graph, num_registers, pinned)
+
+
+def _spill_and_colour(graph, num_registers, pinned):
+    """
+    The spilling half of allocate_with_spills, once the graph is known
+    not to fit in num_registers: reserves the scratch register, spills
+    the candidates of _simplify with one colour fewer and colours the
+    rest.
+    Args:
+        graph: The InterferenceGraph; its color dictionary is overwritten.
+        num_registers: The number of available CPU registers.
+        pinned: The graph's pinned nodes (see _pinned_nodes).
+    Returns:
+        list: The spilled variable names, in the order they were chosen.
+    Raises:
+        ValueError: If fewer than two registers are available, or a pin
+            is on the scratch register.
+    """
+    if num_registers < 2:
+        raise ValueError(f"Spilling requires at least 2 registers, got {num_registers}")
+    scratch = num_registers - 1
+    if scratch in pinned.values():
+        raise ValueError(f"Register constraints cannot be met: R{scratch} is pinned "
+                         f"but is needed as the spill scratch register")
+
+    order, spilled = _simplify(graph, scratch, pinned)
+    graph.color = dict(pinned)
+    remaining = [n for n in order if n not in spilled and n not in pinned]
+    while not colour_in_order(graph, scratch, remaining):
+        # Only a register constraint can make this fail: spill the
+        # variable that could not be coloured and carry on after it.
+        failed = next(i for i, n in enumerate(remaining) if n not in graph.color)
+        spilled.append(remaining[failed])
+        remaining = remaining[failed + 1:]
+    return spilled
+
+
+class FrozenGraph:
+    """
+    An immutable interference graph: a read-only mapping from each
+    variable to the tuple of its neighbours, in the order of the graph
+    it was taken from, and read-only register constraints. It holds no
+    colouring, so any number of AllocationStates, in any number of
+    threads, can colour it at the same time without locks.
+    """
+
+    def __init__(self, graph, pinned=None, forbidden=None):
         """
-        Checks whether assigning the given register to the given node
-        would conflict with any of its neighbours' current assignments.
+        Initializes the snapshot.
         Args:
-            node: The variable name (str) to check.
-            register: The register number (int) being considered.
-        Returns:
-            bool: True if no neighbour of the node is already assigned
-                to the given register, False otherwise.
+            graph: The adjacency dictionary to copy (variable -> iterable
+                of neighbours), e.g. InterferenceGraph.graph.
+            pinned: Optional variable -> register pins to copy.
+            forbidden: Optional variable -> forbidden registers to copy.
         """
-        for neighbor in self.graph.get(node, set()): 
-            if self.color.get(neighbor) == register:
-                return False    
-        return True
-      
-    def allocate_registers(self, num_registers, color_these_nodes):
+        self._graph = MappingProxyType({node: tuple(edges)
+                                        for node, edges in graph.items()})
+        self.pinned = MappingProxyType(dict(pinned or {}))
+        self.forbidden = MappingProxyType({var: frozenset(registers)
+                                           for var, registers in (forbidden or {}).items()})
+
+    @property
+    def graph(self):
+        """The read-only adjacency mapping."""
+        return self._graph
+
+    def __str__(self):
+        """Returns the graph in the same format as InterferenceGraph."""
+        res = "Interference Graph:\n"
+        for node, edges in self._graph.items():
+            res += f"  {node}: {', '.join(edges)}\n"
+        return res
+
+
+class AllocationState(ColouringSearch):
+    """
+    One colouring of a FrozenGraph. It has the graph, color and
+    search_nodes attributes allocate_with_spills and the exact search
+    work on, but only color, spilled and search_nodes belong to it; the
+    graph is shared and never written.
+    """
+
+    def __init__(self, frozen, num_registers):
         """
-        Attempts to assign registers to all nodes using recursive
-        backtracking graph colouring.
+        Initializes an empty colouring.
         Args:
-            num_registers: The number of available CPU registers
-                (colours).
-            color_these_nodes: A list of variable name strings still
-                to be coloured.
-        Returns:
-            bool: True if a valid colouring was found for all nodes,
-                False otherwise.
+            frozen: The FrozenGraph to colour.
+            num_registers: The number of available CPU registers.
         """
-        #Base Case all nodes colored
-        if not color_these_nodes:
-            # No more nodes to color
-            return True
-        
-        curr = color_these_nodes[0]
-
-        for reg in range(num_registers):
-            if self.is_safe(curr, reg):
-                self.color[curr] = reg
-                if self.allocate_registers(num_registers, color_these_nodes[1:]):
-                    # Optimal coloring for all nodes has been found
-                    return True
-                del self.color[curr]
-        # No possible coloring exists
-        return False
-    
+        self.frozen = frozen
+        self.graph = frozen.graph
+        # Views without constraints (shared_ir.SharedView) keep the
+        # empty defaults of ColouringSearch.
+        self.pinned = getattr(frozen, "pinned", self.pinned)
+        self.forbidden = getattr(frozen, "forbidden", self.forbidden)
+        self.num_registers = num_registers
+        self.color = {}
+        self.spilled = []
+        self.search_nodes = 0
+
+
+def allocate_frozen(frozen, num_registers, search=None):
+    """
+    Runs allocate_with_spills on a FrozenGraph without touching it.
+    Args:
+        frozen: The FrozenGraph to colour.
+        num_registers: The number of available CPU registers.
+        search: The exact search passed on to allocate_with_spills.
+    Returns:
+        AllocationState: The colouring and spilled variables.
+    Raises:
+        ValueError: If spilling is needed but fewer than two registers
+            are available.
+    """
+    state = AllocationState(frozen, num_registers)
+    state.spilled = allocate_with_spills(state, num_registers, search)
+    return state
+
+
+def allocate_concurrently(frozen, jobs, max_workers=None):
+    """
+    Colours one shared FrozenGraph several times at once in a thread
+    pool, e.g. for several register counts or search strategies.
+    Args:
+        frozen: The FrozenGraph to colour.
+        jobs: Per allocation, either a register count or a
+            (register count, search) pair; see allocate_frozen.
+        max_workers: The number of threads; defaults to the
+            ThreadPoolExecutor default.
+    Returns:
+        list: One AllocationState per job, in job order.
+    Raises:
+        ValueError: If any job needs to spill with fewer than two
+            registers.
+    """
+    jobs = [job if isinstance(job, tuple) else (job, None) for job in jobs]
+    with ThreadPoolExecutor(max_workers) as pool:
+        return list(pool.map(lambda job: allocate_frozen(frozen, *job), jobs))
+
 
 def _init_live_vars(instruct_list, graph):
-    """Seed the graph with live-on-exit nodes and return the initial live set."""
-    live = set(instruct_list.live_on_exit)
+    """Seed the graph with live-on-exit nodes and return the initial live
+    set, as an insertion-ordered dict (see InterferenceGraph)."""
+    live = dict.fromkeys(instruct_list.live_on_exit)
     for var in live:
         graph.add_node(var)
     return live
 
 
+def _fresh_temporary(instruct_list):
+    """Return a generator of temporaries ('t<n>') that the list does not
+    use, numbered after its highest temporary."""
+    names = {var for inst in instruct_list.instructions
+             for var in (inst.dest, inst.src1, inst.src2) if var}
+    names.update(instruct_list.live_on_exit)
+    numbers = [int(name[1:]) for name in names if name[0] == "t" and name[1:].isdigit()]
+    number = max(numbers, default=-1) + 1
+    while True:
+        yield f"t{number}"
+        number += 1
+
+
+def split_self_divisions(instruct_list) -> int:
+    """
+    Rewrites every 'x = y / x' (with y not x) as 't = x' then 'x = y / t',
+    with a fresh temporary t. The divisor edge of check_divisor_var
+    cannot keep x away from itself, and 'MOV y, Rx' would overwrite the
+    divisor; after the rewrite the edge keeps x and t apart. Must run
+    after the IR optimiser, whose copy propagation would undo it.
+    Args:
+        instruct_list: The ThreeAdrInstList to rewrite in place.
+    Returns:
+        int: The number of divisions rewritten.
+    """
+    fresh = None
+    rewritten = []
+    for inst in instruct_list.instructions:
+        if inst.op == "/" and inst.src2 == inst.dest and inst.src1 != inst.dest:
+            fresh = fresh or _fresh_temporary(instruct_list)
+            temp = next(fresh)
+            rewritten.append(ThreeAdrInst(temp, inst.src2))
+            inst = ThreeAdrInst(inst.dest, inst.src1, "/", temp)
+        rewritten.append(inst)
+    count = len(rewritten) - len(instruct_list.instructions)
+    instruct_list.instructions = rewritten
+    return count
+
+
 def build_interfere_graph(instruct_list):
     """
     Builds the interference graph from the given instruction list by
     iterating through the instructions in reverse order, creating nodes
     for each live variable and connecting the variables that interfere
-    with each other.
+    with each other. The list's register constraints are copied onto
+    the graph. The list is not changed; run split_self_divisions first
+    to keep a division out of its own divisor's register.
     Args:
         instruct_list: An instance of the ThreeAdrInstList containing the list
             of instructions and live variable information.
@@ -139,8 +593,12 @@ def build_interfere_graph(instruct_list):
 
     for instr in reversed(instruct_list.instructions):
         check_dest_var(instr, graph, curr_live_vars)
+        check_divisor_var(instr, graph)
         check_source_var(instr, graph, curr_live_vars)
 
+    graph.pinned = dict(instruct_list.pinned)
+    graph.forbidden = {var: frozenset(registers)
+                       for var, registers in instruct_list.forbidden.items()}
     return graph
 
 def check_dest_var(instr, graph, curr_live_vars):
@@ -150,7 +608,8 @@ def check_dest_var(instr, graph, curr_live_vars):
     Args:
         instr: A ThreeAdrInst object representing the instruction to check.
         graph: The interference graph.
-        curr_live_vars: The set of currently live variables.
+        curr_live_vars: The currently live variables (a dict used as an
+            ordered set).
     """
     # Handle destination variables - if the instruction defines a variable,
         # that variable interferes with everything currently live
@@ -160,8 +619,21 @@ def check_dest_var(instr, graph, curr_live_vars):
             graph.add_edge(instr.dest, live_var)
             
         # The defined variable is no longer live before this instruction
-        if instr.dest in curr_live_vars:
-            curr_live_vars.remove(instr.dest)
+        curr_live_vars.pop(instr.dest, None)
+
+def check_divisor_var(instr, graph):
+    """
+    Makes the destination of a division interfere with its divisor. The
+    target is two-address ('MOV src1, Rd' then 'DIV src2, Rd'), so if both
+    shared a register the divisor would be overwritten before it is read.
+    Subtraction and the commutative operators can be reordered by the code
+    generator instead and need no extra edge.
+    Args:
+        instr: A ThreeAdrInst object representing the instruction to check.
+        graph: The interference graph.
+    """
+    if instr.op == "/" and instr.src2 and not instr.src2.isdigit():
+        graph.add_edge(instr.dest, instr.src2)
 
 def check_source_var(instr, graph, curr_live_vars):
     """
@@ -170,14 +642,15 @@ def check_source_var(instr, graph, curr_live_vars):
     Args:
         instr: A ThreeAdrInst object representing the instruction to check.
         graph: The interference graph.
-        curr_live_vars: The set of currently live variables.
+        curr_live_vars: The currently live variables (a dict used as an
+            ordered set).
     """   
     # Handle source variables - if the instruction uses a variable, that
     # variable must be live before this instruction
     if instr.src1 and not instr.src1.isdigit(): # Ignore literals
-        curr_live_vars.add(instr.src1)
+        curr_live_vars[instr.src1] = None
         graph.add_node(instr.src1)
 
     if instr.src2 and not instr.src2.isdigit(): # Ignore literals
-        curr_live_vars.add(instr.src2)
-        graph.add_node(instr.src2)
\ No newline at end of file
+        curr_live_vars[instr.src2] = None
+        graph.add_node(instr.src2)
@@ -0,0 +1,310 @@
+"""
+Summary: Compact binary encoding of an AsmInstList, so downstream tools do
+    not have to re-parse the textual .s listing. Also converts between the
+    binary and the text formats in either direction.
+
+    Layout (all integers little-endian):
+        header   magic b"RASM", version, then num_regs, number of symbols,
+                 number of live-on-exit variables and number of
+                 instructions, each a u32
+        symbols  u32 byte length, then the AsmVariable names as UTF-8
+                 joined with newlines; a symbol's index is its position
+        live     one u32 symbol index per live-on-exit variable
+        padding  zero bytes up to a multiple of 8
+        code     one 8-byte record per instruction: opcode byte, mode byte
+                 (source mode in bits 0-1, destination mode in bits 2-3),
+                 u16 destination value and i32 source value. A value is a
+                 register number, an immediate or a symbol index,
+                 depending on the mode.
+
+    Run as a script to convert files:
+        python asm_binary.py to-bin <listing.s> <listing.sb>
+        python asm_binary.py to-text <listing.sb> <listing.s>
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import mmap
+import struct
+import sys
+
+from target import (AsmInstList, AsmInst, AsmOperator, AsmOperandMode,
+                    register_operand, variable_operand, immediate_operand)
+
+MAGIC = b"RASM"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBxxxIIII")
+_U32 = struct.Struct("<I")
+_RECORD = struct.Struct("<BBHi")
+
+_OPCODES = [AsmOperator.ADD, AsmOperator.SUB, AsmOperator.MUL,
+            AsmOperator.DIV, AsmOperator.MVR]   # MVD is an alias of MVR
+_OPCODE_OF = {op: code for code, op in enumerate(_OPCODES)}
+_MODES = [AsmOperandMode.IMM, AsmOperandMode.ABS, AsmOperandMode.RGD]
+_MODE_OF = {mode: code for code, mode in enumerate(_MODES)}
+_MNEMONICS = {op.value: op for op in _OPCODES}
+
+
+def _pad(length: int) -> int:
+    """Return the number of zero bytes that align length to 8."""
+    return -length % 8
+
+
+class _SymbolTable:
+    """Assigns consecutive indices to AsmVariable names on first use."""
+
+    def __init__(self):
+        """Initializes an empty table."""
+        self.index = {}
+
+    def add(self, name: str) -> int:
+        """Return the index of name, adding it if it is new."""
+        if name not in self.index:
+            self.index[name] = len(self.index)
+        return self.index[name]
+
+
+def _operand_value(operand, symbols: _SymbolTable) -> int:
+    """Return the integer stored in a record for operand."""
+    if operand.mode == AsmOperandMode.IMM:
+        return operand.val
+    if operand.mode == AsmOperandMode.ABS:
+        return symbols.add(operand.val.var_name)
+    return operand.val.reg_num
+
+
+def encode(asm_list: AsmInstList) -> bytes:
+    """
+    Encodes an instruction list in the binary format.
+    Args:
+        asm_list: The AsmInstList to encode.
+    Returns:
+        bytes: The encoded listing.
+    Raises:
+        ValueError: If an immediate does not fit in 32 bits, or if a
+            destination register or symbol index does not fit in 16 bits.
+    """
+    symbols = _SymbolTable()
+    live = [symbols.add(var) for var in asm_list.live_on_exit]
+    code = bytearray(_RECORD.size * len(asm_list.instructions))
+    for i, inst in enumerate(asm_list.instructions):
+        modes = _MODE_OF[inst.src.mode] | _MODE_OF[inst.dest.mode] << 2
+        try:
+            _RECORD.pack_into(code, i * _RECORD.size, _OPCODE_OF[inst.op], modes,
+                              _operand_value(inst.dest, symbols),
+                              _operand_value(inst.src, symbols))
+        except struct.error as e:
+            raise ValueError(f"Instruction {i} ({inst}) cannot be encoded: {e}")
+
+    names = "\n".join(symbols.index).encode()
+    head = _HEADER.pack(MAGIC, VERSION, asm_list.num_regs, len(symbols.index),
+                        len(live), len(asm_list.instructions))
+    body = _U32.pack(len(names)) + names + struct.pack(f"<{len(live)}I", *live)
+    return head + body + bytes(_pad(len(head) + len(body))) + code
+
+
+def write_binary(asm_list: AsmInstList, out) -> None:
+    """
+    Writes the binary encoding of an instruction list to a binary
+    writable, such as a file opened with mode 'wb'.
+    Args:
+        asm_list: The AsmInstList to encode.
+        out: Any object with a write(bytes) method.
+    Returns:
+        None
+    """
+    out.write(encode(asm_list))
+
+
+class AsmBinaryReader:
+    """
+    Reads the binary format in place. The buffer is wrapped in a
+    memoryview and instructions are only decoded when they are accessed,
+    so opening a file through mmap reads nothing but the header, symbol
+    table and live list up front.
+    """
+
+    def __init__(self, buffer):
+        """
+        Initializes the reader over an encoded listing.
+        Args:
+            buffer: Any object supporting the buffer protocol (bytes,
+                bytearray, mmap).
+        Raises:
+            ValueError: If the buffer does not hold this format.
+        """
+        self.buffer = memoryview(buffer)
+        if len(self.buffer) < _HEADER.size:
+            raise ValueError("Not a binary assembly listing: too short")
+        magic, version, self.num_regs, num_symbols, num_live, self.num_insts = \
+            _HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a binary assembly listing (magic {magic!r}, "
+                             f"version {version})")
+
+        pos = _HEADER.size
+        names_len = _U32.unpack_from(self.buffer, pos)[0]
+        pos += _U32.size
+        names = bytes(self.buffer[pos:pos + names_len]).decode()
+        self.symbols = names.split("\n") if num_symbols else []
+        pos += names_len
+        live = struct.unpack_from(f"<{num_live}I", self.buffer, pos)
+        self.live_on_exit = [self.symbols[i] for i in live]
+        pos += _U32.size * num_live
+        self._code = pos + _pad(pos)
+        if len(self.buffer) < self._code + _RECORD.size * self.num_insts:
+            raise ValueError("Binary assembly listing is truncated")
+
+    @classmethod
+    def open(cls, path: str) -> "AsmBinaryReader":
+        """
+        Maps a binary listing file into memory and returns a reader over
+        it. The mapping stays open for as long as the reader is alive.
+        Args:
+            path: Path of the file to read.
+        Returns:
+            AsmBinaryReader: A reader backed by the memory map.
+        """
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self):
+        """Returns the number of instructions."""
+        return self.num_insts
+
+    def records(self):
+        """
+        Iterates over the raw records without building any objects for
+        the operands.
+        Yields:
+            tuple: (opcode, modes, dest value, src value) per instruction.
+        """
+        end = self._code + _RECORD.size * self.num_insts
+        return _RECORD.iter_unpack(self.buffer[self._code:end])
+
+    def _operand(self, mode: int, value: int):
+        """Return the interned AsmOperand for a mode code and value."""
+        if mode == 0:
+            return immediate_operand(value)
+        if mode == 1:
+            return variable_operand(self.symbols[value])
+        return register_operand(value)
+
+    def _inst(self, record) -> AsmInst:
+        """Return the AsmInst for a raw record."""
+        opcode, modes, dest, src = record
+        return AsmInst(_OPCODES[opcode], self._operand(modes & 3, src),
+                       self._operand(modes >> 2, dest))
+
+    def __getitem__(self, index: int) -> AsmInst:
+        """
+        Decodes a single instruction.
+        Args:
+            index: Position of the instruction.
+        Returns:
+            AsmInst: The decoded instruction.
+        Raises:
+            IndexError: If index is out of range.
+        """
+        if not 0 <= index < self.num_insts:
+            raise IndexError(f"Index: {index}, is out of bounds")
+        return self._inst(_RECORD.unpack_from(self.buffer, self._code + index * _RECORD.size))
+
+    def __iter__(self):
+        """Yields each decoded AsmInst in order."""
+        return map(self._inst, self.records())
+
+    def to_inst_list(self) -> AsmInstList:
+        """
+        Decodes the whole listing.
+        Returns:
+            AsmInstList: The decoded instructions, register count and
+                live-on-exit variables.
+        """
+        asm_list = AsmInstList(self.num_regs)
+        asm_list.instructions = list(self)
+        asm_list.set_live_on_exit(self.live_on_exit)
+        return asm_list
+
+
+def decode(data) -> AsmInstList:
+    """Decode a binary listing (bytes or any buffer) into an AsmInstList."""
+    return AsmBinaryReader(data).to_inst_list()
+
+
+def _parse_operand(text: str):
+    """Return the AsmOperand for one operand of a text listing."""
+    if text[0] == "R" and text[1:].isdigit():
+        return register_operand(int(text[1:]))
+    if text.lstrip("-").isdigit():
+        return immediate_operand(int(text))
+    return variable_operand(text)
+
+
+def parse_asm_text(text: str, num_regs: int = 0) -> AsmInstList:
+    """
+    Parses a text listing in the format written by AsmInstList.write.
+    The text format does not record live-on-exit variables, so the
+    result has none.
+    Args:
+        text: The listing, one 'OP    src, dest' instruction per line.
+        num_regs: The register count to store on the result.
+    Returns:
+        AsmInstList: The parsed instructions.
+    Raises:
+        ValueError: If a line is not a valid instruction.
+    """
+    asm_list = AsmInstList(num_regs)
+    for line_num, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            mnemonic, operands = line.split(None, 1)
+            src, dest = operands.split(",")
+            asm_list.add_inst(AsmInst(_MNEMONICS[mnemonic], _parse_operand(src.strip()),
+                                      _parse_operand(dest.strip())))
+        except (KeyError, ValueError, IndexError):
+            raise ValueError(f"Line {line_num}: invalid instruction '{line.strip()}'")
+    return asm_list
+
+
+def text_to_binary(text: str, num_regs: int = 0) -> bytes:
+    """Convert a text listing to the binary format."""
+    return encode(parse_asm_text(text, num_regs))
+
+
+def binary_to_text(data) -> str:
+    """Convert a binary listing to the text format."""
+    return str(decode(data))
+
+
+def main(args):
+    """
+    Converts a listing file between the text and binary formats.
+    Args:
+        args: The command-line arguments: mode ('to-bin' or 'to-text'),
+            input path and output path.
+    Returns:
+        None
+    """
+    if len(args) != 4 or args[1] not in ("to-bin", "to-text"):
+        print("Usage: python asm_binary.py to-bin|to-text <input> <output>",
+              file=sys.stderr)
+        sys.exit(1)
+    mode, in_path, out_path = args[1:]
+    if mode == "to-bin":
+        with open(in_path) as f:
+            data = text_to_binary(f.read())
+        with open(out_path, "wb") as f:
+            f.write(data)
+    else:
+        reader = AsmBinaryReader.open(in_path)
+        with open(out_path, "w") as f:
+            reader.to_inst_list().write(f)
+    print(f"Converted '{in_path}' to '{out_path}'.")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,233 @@
+"""
+Summary: Batch compiler that overlaps disk I/O with allocation. Input
+    files flow through three stages joined by bounded asyncio queues:
+    read (thread pool), compile (process pool: parse, optimise, allocate,
+    generate) and write (thread pool). While one file is being coloured,
+    others are being read and written. A full queue blocks the stage
+    feeding it, which bounds how many files are held in memory at once.
+
+    Run as a script:
+        python batch.py <num_registers> <file> [<file> ...]
+            [--queue-size N] [--workers N] [--io-threads N]
+
+    Each input is written to a .s file next to it, as main.py does.
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import NamedTuple
+
+import pipeline
+from main import _write_replacing
+
+_STOP = None    # queue sentinel telling a stage worker to finish
+
+
+class BatchReport(NamedTuple):
+    files: int              # files compiled and written
+    failed: list            # (path, error message) per failed file
+    seconds: float          # wall-clock time of the whole batch
+    bytes_read: int
+    ir_instructions: int    # IR instructions after the IR optimiser
+    asm_instructions: int
+    stage_seconds: dict     # stage -> worker-seconds spent in it
+    peak_queue: dict        # queue -> highest number of waiting items
+
+
+def _read(path: str) -> bytes:
+    """Return the contents of the file at path."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write(path: str, text: str) -> None:
+    """Write text to the file at path, replacing it only once the whole
+    text is written (see main._write_replacing)."""
+    _write_replacing(path, lambda out_file: out_file.write(text))
+
+
+def _compile(data: bytes, num_registers: int):
+    """Compile one file's contents; runs in a worker process."""
+    result = pipeline.compile_bytes(data, num_registers)
+    return result.assembly, result.stats
+
+
+async def run_batch(paths, num_registers: int, queue_size: int = 8,
+                    workers: int = None, io_threads: int = 4,
+                    executor=None) -> BatchReport:
+    """
+    Compiles every input file and writes its .s file.
+    Args:
+        paths: The input file paths, in text or binary IR format.
+        num_registers: The number of available CPU registers.
+        queue_size: Capacity of each queue between stages. Readers stop
+            reading ahead once this many files wait to be compiled, and
+            compile workers stop once this many wait to be written.
+        workers: Number of concurrent compile jobs (and processes, when
+            the pool is created here); defaults to the CPU count.
+        io_threads: Number of reader and of writer threads.
+        executor: Optional executor for the compile stage. If None, a
+            ProcessPoolExecutor is created and shut down afterwards.
+    Returns:
+        BatchReport: Counts, failures, timings and queue high-water marks.
+    """
+    loop = asyncio.get_running_loop()
+    workers = workers or os.cpu_count() or 1
+    io_pool = ThreadPoolExecutor(io_threads)
+    cpu_pool = executor or ProcessPoolExecutor(workers, mp_context=pipeline.worker_context())
+    to_compile = asyncio.Queue(queue_size)
+    to_write = asyncio.Queue(queue_size)
+    stage_seconds = {"read": 0.0, "compile": 0.0, "write": 0.0}
+    peak_queue = {"compile": 0, "write": 0}
+    totals = {"files": 0, "bytes": 0, "ir": 0, "asm": 0}
+    failed = []
+    pending = iter(paths)
+
+    async def run(stage, pool, fn, *args):
+        """Run fn on pool, adding its duration to the stage's total."""
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        finally:
+            stage_seconds[stage] += time.perf_counter() - start
+
+    async def put(queue, name, item):
+        """Put item on queue, waiting while it is full."""
+        await queue.put(item)
+        peak_queue[name] = max(peak_queue[name], queue.qsize())
+
+    async def reader():
+        for path in pending:
+            try:
+                data = await run("read", io_pool, _read, path)
+            except OSError as e:
+                failed.append((path, str(e)))
+                continue
+            totals["bytes"] += len(data)
+            await put(to_compile, "compile", (path, data))
+
+    async def compiler():
+        while (item := await to_compile.get()) is not _STOP:
+            path, data = item
+            try:
+                assembly, stats = await run("compile", cpu_pool, _compile, data, num_registers)
+            except Exception as e:
+                failed.append((path, str(e)))
+                continue
+            totals["ir"] += stats["ir_instructions"]
+            totals["asm"] += stats["asm_instructions"]
+            await put(to_write, "write", (os.path.splitext(path)[0] + ".s", assembly))
+
+    async def writer():
+        while (item := await to_write.get()) is not _STOP:
+            out_path, assembly = item
+            try:
+                await run("write", io_pool, _write, out_path, assembly)
+            except OSError as e:
+                failed.append((out_path, str(e)))
+                continue
+            totals["files"] += 1
+
+    start = time.perf_counter()
+    try:
+        compilers = [asyncio.create_task(compiler()) for _ in range(workers)]
+        writers = [asyncio.create_task(writer()) for _ in range(io_threads)]
+        await asyncio.gather(*(reader() for _ in range(io_threads)))
+        for _ in compilers:
+            await to_compile.put(_STOP)
+        await asyncio.gather(*compilers)
+        for _ in writers:
+            await to_write.put(_STOP)
+        await asyncio.gather(*writers)
+    finally:
+        io_pool.shutdown()
+        if executor is None:
+            cpu_pool.shutdown()
+    return BatchReport(totals["files"], failed, time.perf_counter() - start,
+                       totals["bytes"], totals["ir"], totals["asm"],
+                       stage_seconds, peak_queue)
+
+
+def format_report(report: BatchReport) -> str:
+    """
+    Formats a batch report for the console.
+    Args:
+        report: The BatchReport to format.
+    Returns:
+        str: Throughput, per-stage time and queue high-water marks, then
+            one line per failed file.
+    """
+    seconds = report.seconds or 1e-9
+    lines = [
+        f"Compiled {report.files} file(s) in {report.seconds:.3f}s "
+        f"({report.files / seconds:.1f} files/s, "
+        f"{report.ir_instructions / seconds:.0f} IR instructions/s, "
+        f"{report.bytes_read / seconds / 1024:.0f} KiB/s read).",
+        "Worker-seconds per stage: " + ", ".join(
+            f"{stage} {busy:.3f}" for stage, busy in report.stage_seconds.items()),
+        "Peak queue depth: " + ", ".join(
+            f"{name} {depth}" for name, depth in report.peak_queue.items()),
+    ]
+    lines += [f"Failed: {path}: {error}" for path, error in report.failed]
+    return "\n".join(lines)
+
+
+def _parse_args(args):
+    """
+    Parses the command-line arguments.
+    Args:
+        args: sys.argv.
+    Returns:
+        tuple: (num_registers, paths, keyword arguments for run_batch).
+    """
+    usage = ("Usage: python batch.py <num_registers> <file> [<file> ...] "
+             "[--queue-size N] [--workers N] [--io-threads N]")
+    flags = {"--queue-size": "queue_size", "--workers": "workers",
+             "--io-threads": "io_threads"}
+    settings, positional = {}, []
+    rest = args[1:]
+    try:
+        while rest:
+            if rest[0] in flags:
+                settings[flags[rest[0]]] = int(rest[1])
+                if settings[flags[rest[0]]] < 1:
+                    raise ValueError
+                rest = rest[2:]
+            elif rest[0].startswith("--"):
+                raise ValueError
+            else:
+                positional.append(rest[0])
+                rest = rest[1:]
+        num_registers = int(positional[0])
+        if num_registers < 1 or len(positional) < 2:
+            raise ValueError
+    except (IndexError, ValueError):
+        print(usage, file=sys.stderr)
+        sys.exit(1)
+    return num_registers, positional[1:], settings
+
+
+def main(args):
+    """
+    Compiles every file named on the command line and prints the batch
+    report; exits with status 1 if any file failed.
+    Args:
+        args: The command-line arguments.
+    Returns:
+        None
+    """
+    num_registers, paths, settings = _parse_args(args)
+    report = asyncio.run(run_batch(paths, num_registers, **settings))
+    print(format_report(report))
+    if report.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,43 @@
+"""
+Summary: Compares the text and binary assembly listing formats: size on
+    disk, time to load a listing back into an AsmInstList, and time to
+    scan the raw binary records without building objects.
+    Run from the py_code/ directory:
+        python benchmarks/bench_asm_binary.py [num_instructions ...]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import sys
+
+from bench_utils import timed
+from bench_operands import _make_ir
+
+from generate import generate_assembly
+from asm_binary import encode, decode, parse_asm_text, AsmBinaryReader
+
+
+def _scan(data):
+    """Count register-destination records without decoding operands."""
+    return sum(1 for record in AsmBinaryReader(data).records() if record[1] >> 2 == 2)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 200_000]
+    print(f"{'instructions':>13}{'text KiB':>10}{'bin KiB':>9}{'ratio':>7}"
+          f"{'text load':>11}{'bin load':>10}{'speedup':>9}{'bin scan':>10}")
+    for size in sizes:
+        code_list, colour_map = _make_ir(size)
+        asm = generate_assembly(code_list, colour_map, 64)
+        text, data = str(asm), encode(asm)
+        _, text_load = timed(parse_asm_text, text, repeat=3)
+        _, bin_load = timed(decode, data, repeat=3)
+        _, bin_scan = timed(_scan, data, repeat=3)
+        print(f"{size:>13}{len(text) / 1024:>10.0f}{len(data) / 1024:>9.0f}"
+              f"{len(text) / len(data):>6.1f}x{text_load:>11.3f}{bin_load:>10.3f}"
+              f"{text_load / bin_load:>8.1f}x{bin_scan:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Summary: Compares compiling a directory of inputs one file after another
+    (read, compile, write, as main.py does per file) with the asyncio
+    batch pipeline at several queue sizes.
+    Run from the py_code/ directory:
+        python benchmarks/bench_batch.py [num_files] [num_instructions]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from bench_utils import make_block
+
+import batch
+import pipeline
+
+
+def _sequential(paths, num_registers):
+    """Read, compile and write each file in turn."""
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        result = pipeline.compile_bytes(data, num_registers)
+        with open(os.path.splitext(path)[0] + ".s", "w") as f:
+            f.write(result.assembly)
+
+
+def main():
+    num_files = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    tmpdir = tempfile.mkdtemp()
+    paths = []
+    for seed in range(num_files):
+        paths.append(os.path.join(tmpdir, f"block{seed}.txt"))
+        with open(paths[-1], "w") as f:
+            f.write(make_block(size, 4, seed))
+
+    start = time.perf_counter()
+    _sequential(paths, 4)
+    sequential = time.perf_counter() - start
+    print(f"{'mode':<24}{'seconds':>9}{'files/s':>9}{'peak queues':>13}")
+    print(f"{'sequential':<24}{sequential:>9.3f}{num_files / sequential:>9.1f}")
+    for queue_size in (1, 4, 16):
+        report = asyncio.run(batch.run_batch(paths, 4, queue_size=queue_size))
+        peaks = "/".join(str(depth) for depth in report.peak_queue.values())
+        print(f"{f'batch, queue size {queue_size}':<24}{report.seconds:>9.3f}"
+              f"{report.files / report.seconds:>9.1f}{peaks:>13}")
+    shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Summary: Estimated cost of the allocator's colouring against the cheapest
+    colouring cost_search finds, for several search budgets, under both
+    metrics of the cost model (cycles and instructions). Blocks are
+    optimised by the IR optimiser first, as main.py does; the tighter
+    register counts also spill.
+    Run from the py_code/ directory:
+        python benchmarks/bench_cost_search.py
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import sys
+
+from bench_utils import make_block, parse_text, timed
+
+from allocator import build_interfere_graph, allocate_with_spills
+from cost_search import cheapest_colouring
+from ir_optimiser import optimise as optimise_ir
+
+BUDGETS = (1_000, 10_000, 100_000)
+RUNS = [(200, 8, 12), (200, 8, 6), (2_000, 12, 16), (2_000, 12, 8)]    # insts, width, registers
+
+
+def main(args):
+    print(f"{'insts':>7}{'width':>6}{'regs':>6}{'metric':>14}{'allocator':>11}"
+          + "".join(f"{f'budget {b}':>16}" for b in BUDGETS) + f"{'seconds':>9}")
+    for num_insts, width, registers in RUNS:
+        code_list = parse_text(make_block(num_insts, width))
+        optimise_ir(code_list)
+        graph = build_interfere_graph(code_list)
+        allocate_with_spills(graph, registers)
+        start = dict(graph.color)
+        for metric in ("cycles", "instructions"):
+            cells = []
+            for budget in BUDGETS:
+                graph.color = dict(start)
+                result, seconds = timed(cheapest_colouring, code_list, graph, registers,
+                                        metric, budget)
+                mark = "*" if result.optimal else ""
+                cells.append(f"{result.cost}{mark}")
+            print(f"{num_insts:>7}{width:>6}{registers:>6}{metric:>14}{result.initial_cost:>11}"
+                  + "".join(f"{cell:>16}" for cell in cells) + f"{seconds:>9.2f}")
+    print("* proved optimal; seconds are for the largest budget")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
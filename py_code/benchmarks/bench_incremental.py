@@ -0,0 +1,102 @@
+"""
+Summary: Measures edit-to-result latency of the incremental allocator. A
+    large synthetic block is allocated once; then random single-instruction
+    inserts, removes and replaces are applied through IncrementalAllocator
+    and timed against rebuilding the interference graph and allocating
+    from scratch after the same edit.
+    Run from the py_code/ directory: python benchmarks/bench_incremental.py
+        [num_insts] [num_edits]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from bench_utils import make_block, parse_text, timed
+
+from allocator import build_interfere_graph, allocate_with_spills
+from interm_rep import ThreeAdrInst
+from incremental import IncrementalAllocator
+
+NUM_REGISTERS = 8
+WIDTH = 4
+
+
+def _full(code_list):
+    """Rebuild the graph and allocate it from scratch."""
+    graph = build_interfere_graph(code_list)
+    allocate_with_spills(graph, NUM_REGISTERS)
+    return graph
+
+
+def _random_edit(inc, rng, inserted):
+    """
+    Picks one random edit of inc. Inserts define a fresh variable from
+    the values the previous instruction reads, removes take out an earlier
+    insert, and replaces change an instruction's operator and second
+    operand, so no edit makes a value live across the whole block.
+    Args:
+        inc: The IncrementalAllocator to edit.
+        rng: The random.Random to draw from.
+        inserted: The names defined by earlier inserts still in the block.
+    Returns:
+        tuple: (kind of edit, function that applies it).
+    """
+    instructions = inc.code_list.instructions
+    kind = rng.choice(("insert", "remove", "replace") if inserted else ("insert", "replace"))
+    if kind == "remove":
+        name = inserted.pop(rng.randrange(len(inserted)))
+        index = next(i for i, inst in enumerate(instructions) if inst.dest == name)
+        return kind, lambda: inc.remove(index)
+    index = rng.randrange(1, len(instructions))
+    near = instructions[index - 1]
+    src2 = near.src2 or near.src1
+    if kind == "insert":
+        name = f"n{len(inserted)}_{index}"
+        inserted.append(name)
+        inst = ThreeAdrInst(name, near.src1, rng.choice("+-*"), src2)
+        return kind, lambda: inc.insert(index, inst)
+    old = instructions[index]
+    inst = ThreeAdrInst(old.dest, old.src1, rng.choice("+-*"), src2)
+    return kind, lambda: inc.replace(index, inst)
+
+
+def main(args):
+    num_insts = int(args[1]) if len(args) > 1 else 10_000
+    num_edits = int(args[2]) if len(args) > 2 else 200
+    code_list = parse_text(make_block(num_insts, WIDTH))
+    inc, build_seconds = timed(IncrementalAllocator, code_list, NUM_REGISTERS)
+    print(f"{num_insts} instructions, k={NUM_REGISTERS}: "
+          f"initial allocation {build_seconds * 1000:.1f} ms")
+
+    rng = random.Random(0)
+    inserted = []
+    latencies = {"insert": [], "remove": [], "replace": []}
+    relived, full = [], 0
+    for _ in range(num_edits):
+        kind, edit = _random_edit(inc, rng, inserted)
+        start = time.perf_counter()
+        edit()
+        latencies[kind].append(time.perf_counter() - start)
+        relived.append(inc.last_edit["relived"])
+        full += inc.last_edit["full"]
+    _, rebuild_seconds = timed(_full, code_list, repeat=3)
+
+    print(f"{'edit':<10}{'count':>7}{'median ms':>11}{'max ms':>9}")
+    for kind, times in latencies.items():
+        if times:
+            print(f"{kind:<10}{len(times):>7}{statistics.median(times) * 1000:>11.3f}"
+                  f"{max(times) * 1000:>9.3f}")
+    print(f"{'rebuild':<10}{'':>7}{rebuild_seconds * 1000:>11.3f}")
+    print(f"Instructions relived per edit: median {statistics.median(relived)}, "
+          f"max {max(relived)}; full recolours: {full}")
+    graph = build_interfere_graph(code_list)
+    print("Graph matches a rebuild:", graph.graph == inc.graph.graph)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
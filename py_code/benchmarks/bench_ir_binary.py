@@ -0,0 +1,46 @@
+"""
+Summary: Compares loading a block from the text input syntax (Tokenizer
+    and Parser) with loading it from the binary IR format, fully decoded
+    and lazily through mmap.
+    Run from the py_code/ directory:
+        python benchmarks/bench_ir_binary.py [num_instructions ...]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import os
+import sys
+
+from bench_utils import make_block, write_temp, parse_file, timed
+
+import ir_binary
+
+
+def _open_lazy(path):
+    """Open the file and decode only its last instruction."""
+    reader = ir_binary.IRBinaryReader.open(path)
+    return reader[len(reader) - 1]
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    print(f"{'instructions':>13}{'text KiB':>10}{'bin KiB':>9}{'parse s':>9}"
+          f"{'load s':>8}{'speedup':>9}{'lazy open s':>13}")
+    for size in sizes:
+        text_path = write_temp(make_block(size, 6))
+        code_list, parse_time = timed(parse_file, text_path)
+        bin_path = write_temp("", suffix=".irb")
+        with open(bin_path, "wb") as f:
+            f.write(ir_binary.encode(code_list))
+        _, load_time = timed(ir_binary.load, bin_path, repeat=3)
+        _, lazy_time = timed(_open_lazy, bin_path, repeat=3)
+        print(f"{size:>13}{os.path.getsize(text_path) / 1024:>10.0f}"
+              f"{os.path.getsize(bin_path) / 1024:>9.0f}{parse_time:>9.3f}"
+              f"{load_time:>8.3f}{parse_time / load_time:>8.1f}x{lazy_time:>13.5f}")
+        os.unlink(text_path)
+        os.unlink(bin_path)
+
+
+if __name__ == "__main__":
+    main()
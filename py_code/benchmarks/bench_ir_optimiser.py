@@ -0,0 +1,40 @@
+"""
+Summary: Reports how much smaller the IR optimiser makes each block, the
+    interference graph built from it, and the generated code.
+    Run from the py_code/ directory: python benchmarks/bench_ir_optimiser.py
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import copy
+
+from bench_utils import corpus
+
+from allocator import build_interfere_graph, allocate_with_spills
+from generate import generate_assembly
+from ir_optimiser import optimise
+
+
+def _measure(code_list, k=4):
+    """Return (instructions, graph nodes, graph edges, asm instructions)."""
+    graph = build_interfere_graph(code_list)
+    edges = sum(len(adj) for adj in graph.graph.values()) // 2
+    allocate_with_spills(graph, k)
+    asm = generate_assembly(code_list, graph.color, k)
+    return len(code_list.instructions), len(graph.graph), edges, len(asm.instructions)
+
+
+def main():
+    print(f"{'block':<24}{'insts':>12}{'nodes':>12}{'edges':>12}{'asm':>12}")
+    for name, code_list in corpus():
+        before = _measure(code_list)
+        optimised = copy.deepcopy(code_list)
+        optimise(optimised)
+        after = _measure(optimised)
+        cols = "".join(f"{b:>6}->{a:<4}" for b, a in zip(before, after))
+        print(f"{name:<24}{cols}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Summary: Tokenizer throughput of the regex lexer against the previous
+    character-by-character scanner, on a large generated input. The input
+    is processed in line-aligned chunks so the token lists of the whole
+    input never have to be held at once.
+    Run from the py_code/ directory:
+        python benchmarks/bench_lexer.py [megabytes] [chunk_megabytes]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import sys
+import time
+
+from bench_utils import make_block
+
+from tokenizer import Token, Tokenizer
+
+
+class _CharTokenizer(Tokenizer):
+    """The previous tokenize(): one Python-level step per character, with
+    every alphanumeric run re-classified by Token.get_type."""
+
+    def _read_run(self, pos, digits_only):
+        """Return the end of the digit or alphanumeric run at pos."""
+        content = self.content
+        while pos < len(content) and (content[pos].isdigit() if digits_only
+                                      else content[pos].isalnum()):
+            pos += 1
+        return pos
+
+    def tokenize(self):
+        content, pos = self.content, 0
+        while pos < len(content):
+            char = content[pos]
+            pos += 1
+            if char == " ":
+                continue
+            if char.isdigit() or char.isalpha():
+                end = self._read_run(pos, char.isdigit())
+                var = content[pos - 1:end]
+                pos = end
+                self.tokens.append(Token(value=var, type=Token.get_type(var)))
+            if char in "+-/*=\n:,":
+                self.tokens.append(Token(value=char, type=Token.get_type(char)))
+
+
+def _chunks(megabytes, chunk_megabytes):
+    """Yield line-aligned text chunks adding up to about megabytes."""
+    block = make_block(20_000, 6)
+    body = block[:block.rindex("live:")]
+    chunk = body * max(1, int(chunk_megabytes * 2**20 // len(body)))
+    for _ in range(max(1, round(megabytes / (len(chunk) / 2**20)))):
+        yield chunk
+
+
+def _throughput(cls, megabytes, chunk_megabytes):
+    """Return (MiB tokenized, tokens, seconds) for a tokenizer class."""
+    size = tokens = 0
+    seconds = 0.0
+    for chunk in _chunks(megabytes, chunk_megabytes):
+        tokenizer = cls.from_text(chunk)
+        start = time.perf_counter()
+        tokenizer.tokenize()
+        seconds += time.perf_counter() - start
+        size += len(chunk)
+        tokens += len(tokenizer.tokens)
+    return size / 2**20, tokens, seconds
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+    chunk_megabytes = float(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"{'lexer':<22}{'MiB':>7}{'tokens':>12}{'seconds':>9}{'MiB/s':>8}{'Mtok/s':>8}")
+    for name, cls in (("per-character", _CharTokenizer), ("regex (findall)", Tokenizer)):
+        size, tokens, seconds = _throughput(cls, megabytes, chunk_megabytes)
+        print(f"{name:<22}{size:>7.0f}{tokens:>12}{seconds:>9.2f}"
+              f"{size / seconds:>8.2f}{tokens / seconds / 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Summary: How memory scales with instruction count and live-set width. Each
+    phase of the pipeline runs under memory_profile.MemoryProfiler, and
+    the bytes each phase retains (the file contents, the token list, the
+    ThreeAdrInstList, the InterferenceGraph and the AsmInstList) are
+    printed with the highest peak of any phase.
+    Run from the py_code/ directory:
+        python benchmarks/bench_memory.py
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import os
+import sys
+
+from bench_utils import make_block, write_temp
+
+from tokenizer import Tokenizer
+from parser import Parser
+from allocator import build_interfere_graph, allocate_with_spills
+from generate import generate_assembly
+from memory_profile import MemoryProfiler
+
+NUM_REGISTERS = 64      # enough for every width below, so nothing spills
+PHASES = ("read", "tokenize", "parse", "graph", "allocate", "generate")
+RUNS = [(n, 8) for n in (2_000, 8_000, 32_000)] + [(8_000, w) for w in (2, 16, 40)]
+
+
+def profile(num_insts, width):
+    """Return the MemoryProfiler of one compile of a synthetic block."""
+    path = write_temp(make_block(num_insts, width))
+    profiler = MemoryProfiler(top_sites=0)
+    profiler.start()
+    try:
+        with profiler.phase("read"):
+            tokenizer = Tokenizer(path)
+        with profiler.phase("tokenize"):
+            tokenizer.tokenize()
+        with profiler.phase("parse"):
+            code_list = Parser(tokenizer.tokens, tokenizer.position).parse()
+        with profiler.phase("graph"):
+            graph = build_interfere_graph(code_list)
+        with profiler.phase("allocate"):
+            allocate_with_spills(graph, NUM_REGISTERS)
+        with profiler.phase("generate"):
+            asm = generate_assembly(code_list, graph.color, NUM_REGISTERS)
+        del tokenizer, code_list, graph, asm
+    finally:
+        profiler.stop()
+        os.unlink(path)
+    return profiler
+
+
+def main(args):
+    print("Retained KiB per phase, and the highest phase peak")
+    print(f"{'insts':>7}{'width':>6}" + "".join(f"{p:>10}" for p in PHASES)
+          + f"{'peak':>10}{'B/inst':>8}")
+    for num_insts, width in RUNS:
+        phases = profile(num_insts, width).phases
+        retained = [record.retained / 1024 for record in phases]
+        peak = max(record.peak for record in phases)
+        total = sum(record.retained for record in phases)
+        print(f"{num_insts:>7}{width:>6}" + "".join(f"{kib:>10.0f}" for kib in retained)
+              + f"{peak / 1024:>10.0f}{total / num_insts:>8.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
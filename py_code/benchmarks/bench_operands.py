@@ -0,0 +1,52 @@
+"""
+Summary: Measures code generation time and the memory retained by the
+    generated AsmInstList, i.e. how many operand and instruction objects
+    codegen allocates.
+    Run from the py_code/ directory:
+        python benchmarks/bench_operands.py [num_instructions ...]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import sys
+import tracemalloc
+
+from bench_utils import timed
+
+from interm_rep import ThreeAdrInst, ThreeAdrInstList
+from generate import generate_assembly
+
+
+def _make_ir(num_insts, num_vars=64):
+    """Return a block cycling through num_vars variables, with a colour map
+    giving each of them its own register and one memory operand per
+    instruction. Only codegen is measured, so liveness is not checked."""
+    code_list = ThreeAdrInstList()
+    names = [f"t{i}" for i in range(num_vars)]
+    for i in range(num_insts):
+        dest, src = names[i % num_vars], names[(i + 1) % num_vars]
+        code_list.add_instruct(ThreeAdrInst(dest, src, "+", "m" if i % 2 else "7"))
+    code_list.set_live_on_exit(names[:4])
+    return code_list, {name: i for i, name in enumerate(names)}
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    print(f"{'instructions':>13}{'seconds':>10}{'retained MiB':>14}{'blocks':>10}")
+    for size in sizes:
+        code_list, colour_map = _make_ir(size)
+        _, seconds = timed(generate_assembly, code_list, colour_map, 64, repeat=3)
+        tracemalloc.start()
+        asm = generate_assembly(code_list, colour_map, 64)
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        stats = snapshot.statistics("filename")
+        blocks = sum(stat.count for stat in stats)
+        size_bytes = sum(stat.size for stat in stats)
+        print(f"{size:>13}{seconds:>10.3f}{size_bytes / 2**20:>14.2f}{blocks:>10}")
+        del asm
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Summary: Parse throughput of the sequential Tokenizer and Parser against
+    parallel chunked parsing with several worker counts, on a large
+    generated input file. Results are checked to be identical.
+    Run from the py_code/ directory:
+        python benchmarks/bench_parallel_parse.py [megabytes]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import os
+import sys
+import tempfile
+
+from bench_utils import make_block, parse_file, timed
+
+import parallel_parse
+
+
+def write_input(megabytes: float) -> str:
+    """Write a valid block of about megabytes to a temporary file and
+    return its path."""
+    block = make_block(20_000, 6)
+    body, live = block[:block.rindex("live:")], block[block.rindex("live:"):]
+    copies = max(1, round(megabytes * 2**20 / len(body)))
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        for _ in range(copies):
+            f.write(body)
+        f.write(live)
+        return f.name
+
+
+def _same(a, b) -> bool:
+    """Return True if two instruction lists are identical."""
+    return a.live_on_exit == b.live_on_exit and len(a.instructions) == len(b.instructions) \
+        and all(vars(x) == vars(y) for x, y in zip(a.instructions, b.instructions))
+
+
+def main(args):
+    megabytes = float(args[1]) if len(args) > 1 else 20
+    path = write_input(megabytes)
+    size = os.path.getsize(path) / 2**20
+    try:
+        expected, seconds = timed(parse_file, path)
+        print(f"{size:.1f} MiB, {len(expected.instructions)} instructions, "
+              f"{os.cpu_count()} CPU(s)")
+        print(f"{'mode':<20}{'seconds':>9}{'MiB/s':>8}")
+        print(f"{'sequential':<20}{seconds:>9.2f}{size / seconds:>8.2f}")
+        for workers in (1, 2, 4):
+            code_list, seconds = timed(parallel_parse.parse_file, path, workers)
+            assert _same(code_list, expected)
+            print(f"{f'parallel, {workers} worker(s)':<20}{seconds:>9.2f}{size / seconds:>8.2f}")
+            del code_list
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,38 @@
+"""
+Summary: Reports the instruction reduction achieved by the peephole
+    optimiser on the benchmark corpus.
+    Run from the py_code/ directory: python benchmarks/bench_peephole.py
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+from bench_utils import corpus
+
+from allocator import build_interfere_graph, allocate_with_spills
+from generate import generate_assembly
+from peephole import remove_self_moves, remove_dead_code
+
+
+def main():
+    print(f"{'block':<24}{'k':>4}{'before':>8}{'self-mv':>9}{'dead':>6}{'after':>7}{'saved':>8}")
+    total_before = total_after = 0
+    for name, code_list in corpus():
+        for k in (4, 8):
+            graph = build_interfere_graph(code_list)
+            allocate_with_spills(graph, k)
+            asm = generate_assembly(code_list, graph.color, k)
+            before = len(asm.instructions)
+            self_moves = remove_self_moves(asm)
+            dead = remove_dead_code(asm)
+            after = len(asm.instructions)
+            saved = 100.0 * (before - after) / before if before else 0.0
+            total_before += before
+            total_after += after
+            print(f"{name:<24}{k:>4}{before:>8}{self_moves:>9}{dead:>6}{after:>7}{saved:>7.1f}%")
+    saved = 100.0 * (total_before - total_after) / total_before
+    print(f"{'total':<28}{total_before:>8}{'':>15}{total_after:>7}{saved:>7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
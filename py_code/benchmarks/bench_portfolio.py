@@ -0,0 +1,76 @@
+"""
+Summary: Wall-clock time of the exact colouring search run sequentially in
+    the simplify order (as allocate_with_spills does) against the parallel
+    portfolio, on dense random graphs near their chromatic number. The
+    sequential search is stopped after a budget of search nodes.
+    Run from the py_code/ directory:
+        python benchmarks/bench_portfolio.py [workers] [budget]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import random
+import sys
+import time
+
+import bench_utils  # noqa: F401  (puts py_code on sys.path)
+
+from allocator import InterferenceGraph, _simplify
+from portfolio import colour_portfolio, _BudgetedGraph, _BudgetExceeded
+
+NUM_NODES = 40
+EDGE_PROBABILITY = 0.3
+NUM_COLOURS = 5
+NUM_INSTANCES = 8
+
+
+def make_instance(seed):
+    """Return a random graph of NUM_NODES nodes with EDGE_PROBABILITY."""
+    rng = random.Random(seed)
+    graph = InterferenceGraph()
+    nodes = [f"v{i}" for i in range(NUM_NODES)]
+    for node in nodes:
+        graph.add_node(node)
+    for i, a in enumerate(nodes):
+        for b in nodes[i + 1:]:
+            if rng.random() < EDGE_PROBABILITY:
+                graph.add_edge(a, b)
+    return graph
+
+
+def _sequential(graph, order, budget):
+    """Return (result or None if over budget, seconds) of the plain search."""
+    search = _BudgetedGraph(graph.graph, {}, budget)
+    start = time.perf_counter()
+    try:
+        result = search.allocate_registers(NUM_COLOURS, order)
+    except _BudgetExceeded:
+        result = None
+    return result, time.perf_counter() - start
+
+
+def main(args):
+    workers = int(args[1]) if len(args) > 1 else 4
+    budget = int(args[2]) if len(args) > 2 else 2_000_000
+    print(f"{NUM_NODES} nodes, p={EDGE_PROBABILITY}, k={NUM_COLOURS}, "
+          f"{workers} portfolio workers")
+    print(f"{'seed':>5}{'sequential s':>14}{'portfolio s':>13}{'result':>8}  winner")
+    worst_sequential = worst_portfolio = 0.0
+    for seed in range(NUM_INSTANCES):
+        graph = make_instance(seed)
+        order, _ = _simplify(graph, NUM_COLOURS)
+        found, sequential = _sequential(graph, order, budget)
+        result = colour_portfolio(graph, NUM_COLOURS, order, workers=workers)
+        assert found is None or found == result.colourable
+        worst_sequential = max(worst_sequential, sequential)
+        worst_portfolio = max(worst_portfolio, result.seconds)
+        shown = f">{sequential:.3f}" if found is None else f"{sequential:.3f}"
+        print(f"{seed:>5}{shown:>14}{result.seconds:>13.3f}"
+              f"{str(result.colourable):>8}  {result.strategy}")
+    print(f"Worst case: sequential {worst_sequential:.3f}s (or more), "
+          f"portfolio {worst_portfolio:.3f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,86 @@
+"""
+Summary: Compares compiling a batch of small blocks by starting main.py
+    once per file with sending the same blocks to a running allocator
+    server, one request at a time and over several concurrent
+    connections.
+    Run from the py_code/ directory:
+        python benchmarks/bench_server.py [num_files]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_utils import make_block, write_temp
+
+import server
+
+_MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def _run_processes(paths):
+    """Compile every file with a fresh main.py process."""
+    for path in paths:
+        subprocess.run([sys.executable, _MAIN, "4", path], check=True,
+                       stdout=subprocess.DEVNULL)
+
+
+def _run_requests(address, paths, clients):
+    """Send one request per file, split over a number of client threads."""
+    def send(chunk):
+        return server.send_requests(address, [{"num_registers": 4, "path": p}
+                                              for p in chunk])
+    chunks = [paths[i::clients] for i in range(clients)]
+    with ThreadPoolExecutor(clients) as pool:
+        responses = [r for batch in pool.map(send, chunks) for r in batch]
+    assert all(r["ok"] for r in responses), responses
+
+
+def _timed(fn, *args):
+    """Return the wall-clock seconds fn takes."""
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    num_files = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    paths = [write_temp(make_block(40, 4, seed)) for seed in range(num_files)]
+    address = os.path.join(tempfile.mkdtemp(), "allocator.sock")
+
+    loop = asyncio.new_event_loop()
+    srv = server.AllocatorServer()
+    loop.run_until_complete(srv.start_unix(address))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    _run_requests(address, paths[:1], 1)    # start the worker processes
+
+    print(f"{'mode':<28}{'seconds':>9}{'files/s':>9}")
+    rows = [("main.py per file", _timed(_run_processes, paths)),
+            ("server, 1 connection", _timed(_run_requests, address, paths, 1)),
+            ("server, 8 connections", _timed(_run_requests, address, paths, 8))]
+    for name, seconds in rows:
+        print(f"{name:<28}{seconds:>9.3f}{num_files / seconds:>9.0f}")
+
+    asyncio.run_coroutine_threadsafe(srv.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    shutil.rmtree(os.path.dirname(address))
+    for path in paths:
+        os.unlink(path)
+        for ext in (".s", ".sb"):
+            if os.path.exists(os.path.splitext(path)[0] + ext):
+                os.unlink(os.path.splitext(path)[0] + ext)
+
+
+if __name__ == "__main__":
+    main()
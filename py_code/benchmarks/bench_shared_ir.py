@@ -0,0 +1,93 @@
+"""
+Summary: Cost of handing an instruction list and its interference graph to
+    worker processes by pickling against a shared_ir block. Measured
+    in-process (serialise + deserialise against export + attach) and end
+    to end, with process pool tasks that each need the whole graph.
+    Run from the py_code/ directory:
+        python benchmarks/bench_shared_ir.py [tasks]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bench_utils import make_block, parse_text
+
+import pipeline
+import shared_ir
+from allocator import build_interfere_graph
+
+SIZES = (1_000, 5_000, 20_000)
+WIDTH = 40
+
+
+def _degrees_pickled(code_list, graph):
+    """Task given the pickled objects: sum of degrees."""
+    return sum(len(edges) for edges in graph.values())
+
+
+def _degrees_shared(block):
+    """Task given a shared block name: sum of degrees."""
+    with shared_ir.attach(block) as view:
+        return sum(len(row) for row in view.graph.values())
+
+
+def _in_process(code_list, graph):
+    """Return (pickle seconds, pickle bytes, export seconds, attach seconds)."""
+    start = time.perf_counter()
+    data = pickle.dumps((code_list, dict(graph.graph)))
+    pickle.loads(data)
+    pickled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shared = shared_ir.SharedExport(graph, code_list)
+    exported = time.perf_counter() - start
+    start = time.perf_counter()
+    shared_ir.attach(shared.name).close()
+    attached = time.perf_counter() - start
+    shared.close()
+    return pickled, len(data), exported, attached
+
+
+def _end_to_end(pool, code_list, graph, tasks):
+    """Return (pickled seconds, shared seconds) to run tasks on the pool."""
+    adjacency = dict(graph.graph)
+    start = time.perf_counter()
+    expected = [pool.submit(_degrees_pickled, code_list, adjacency) for _ in range(tasks)]
+    expected = [future.result() for future in expected]
+    pickled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with shared_ir.SharedExport(graph, code_list) as shared:
+        results = [pool.submit(_degrees_shared, shared.name) for _ in range(tasks)]
+        results = [future.result() for future in results]
+    assert results == expected
+    return pickled, time.perf_counter() - start
+
+
+def main(args):
+    tasks = int(args[1]) if len(args) > 1 else 16
+    print(f"width {WIDTH}, {tasks} pool tasks per hand-off")
+    print(f"{'insts':>7}{'edges':>9}{'pickle KiB':>12}{'shm KiB':>9}{'pickle ms':>11}"
+          f"{'export ms':>11}{'attach ms':>11}{'pool pickle s':>15}{'pool shm s':>12}")
+    with ProcessPoolExecutor(2, mp_context=pipeline.worker_context()) as pool:
+        pool.submit(len, "").result()    # start the workers before timing
+        for size in SIZES:
+            code_list = parse_text(make_block(size, WIDTH))
+            graph = build_interfere_graph(code_list)
+            edges = sum(len(e) for e in graph.graph.values()) // 2
+            pickled, nbytes, exported, attached = _in_process(code_list, graph)
+            with shared_ir.SharedExport(graph, code_list) as shared:
+                shm_bytes = shared.size
+            pool_pickled, pool_shared = _end_to_end(pool, code_list, graph, tasks)
+            print(f"{size:>7}{edges:>9}{nbytes / 1024:>12.0f}{shm_bytes / 1024:>9.0f}"
+                  f"{pickled * 1e3:>11.1f}{exported * 1e3:>11.1f}{attached * 1e3:>11.2f}"
+                  f"{pool_pickled:>15.3f}{pool_shared:>12.3f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,39 @@
+"""
+Summary: Measures how many extra instructions spill code adds. Every block
+    in the benchmark corpus is allocated with a shrinking number of
+    registers, spilling as needed, and the generated code is compared with
+    the instruction count when every variable gets its own register.
+    Run from the py_code/ directory: python benchmarks/bench_spill.py
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+from bench_utils import corpus
+
+from allocator import build_interfere_graph, allocate_with_spills
+from generate import generate_assembly
+
+
+def _instruction_count(code_list, k):
+    """Allocate code_list with k registers and return (number of generated
+    instructions, number of spilled variables)."""
+    graph = build_interfere_graph(code_list)
+    spilled = allocate_with_spills(graph, k)
+    asm = generate_assembly(code_list, graph.color, k)
+    return len(asm.instructions), len(spilled)
+
+
+def main():
+    print(f"{'block':<24}{'k':>4}{'spilled':>9}{'insts':>8}{'extra':>8}{'overhead':>10}")
+    for name, code_list in corpus():
+        base = _instruction_count(code_list, max(len(build_interfere_graph(code_list).graph), 1))[0]
+        for k in (4, 3, 2):
+            total, num_spilled = _instruction_count(code_list, k)
+            overhead = 100.0 * (total - base) / base if base else 0.0
+            print(f"{name:<24}{k:>4}{num_spilled:>9}{total:>8}"
+                  f"{total - base:>8}{overhead:>9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
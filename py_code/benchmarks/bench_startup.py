@@ -0,0 +1,91 @@
+"""
+Summary: Measures the start-up cost of main.py on an empty input, where
+    almost all of the wall time is interpreter start-up and imports.
+    Reports the import time of each module main.py loads (from
+    'python -X importtime'), the time to the first line of output and the
+    total run time, each the median of several runs, against a bare
+    'python -c pass'. The project modules' import time is checked against
+    a budget.
+    Run from the py_code/ directory:
+        python benchmarks/bench_startup.py [runs]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PY_CODE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EMPTY = os.path.join(PY_CODE, "test_drivers", "test_inputs", "6empty.txt")
+MAIN = [sys.executable, os.path.join(PY_CODE, "main.py"), "3", EMPTY]
+
+IMPORT_BUDGET_MS = 25.0     # total import time of the project's own modules, re included
+
+
+def _project_modules():
+    """Return the names of the modules in py_code/."""
+    return {name[:-3] for name in os.listdir(PY_CODE) if name.endswith(".py")}
+
+
+def import_times():
+    """
+    Runs main.py once under -X importtime.
+    Returns:
+        dict: Top-level module name -> cumulative import time in ms, for
+            the modules imported directly by main.py (or by site).
+    """
+    result = subprocess.run([MAIN[0], "-X", "importtime"] + MAIN[1:], cwd=PY_CODE,
+                            capture_output=True, text=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        if not name.startswith("  "):   # nested imports are indented
+            times[name.strip()] = int(cumulative_us) / 1000
+    return times
+
+
+def _first_output(command):
+    """Return (seconds to the first stdout line, total seconds)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=PY_CODE, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL)
+    proc.stdout.readline()
+    first = time.perf_counter() - start
+    proc.stdout.read()
+    proc.wait()
+    return first, time.perf_counter() - start
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    output = os.path.splitext(EMPTY)[0] + ".s"
+    keep_output = os.path.exists(output)
+    project = _project_modules()
+    samples = [import_times() for _ in range(runs)]
+    print(f"{'module':<16}{'import ms':>10}")
+    medians = {name: statistics.median(s.get(name, 0.0) for s in samples)
+               for name in samples[0] if name in project}
+    for name, ms in sorted(medians.items(), key=lambda item: -item[1]):
+        print(f"{name:<16}{ms:>10.2f}")
+    total = sum(medians.values())
+    verdict = "within" if total <= IMPORT_BUDGET_MS else "OVER"
+    print(f"{'total':<16}{total:>10.2f}  ({verdict} budget of {IMPORT_BUDGET_MS:.0f} ms)")
+
+    bare = statistics.median(_first_output([sys.executable, "-c", "print()"])[1]
+                             for _ in range(runs))
+    timings = [_first_output(MAIN) for _ in range(runs)]
+    print(f"\nbare interpreter      {bare * 1000:8.1f} ms")
+    print(f"first output          {statistics.median(t[0] for t in timings) * 1000:8.1f} ms")
+    print(f"main.py on 6empty.txt {statistics.median(t[1] for t in timings) * 1000:8.1f} ms")
+    if not keep_output:
+        os.unlink(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Summary: Compares ways of writing a large assembly listing: building it
+    with the old string concatenation, str(AsmInstList), AsmInstList.write
+    and the streaming write_assembly. Reports wall time and the peak memory
+    traced while writing to os.devnull.
+    Run from the py_code/ directory:
+        python benchmarks/bench_stream.py [num_instructions ...]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import os
+import sys
+import tracemalloc
+
+from bench_utils import timed
+
+from interm_rep import ThreeAdrInst, ThreeAdrInstList
+from generate import generate_assembly, write_assembly
+
+
+def _make_ir(num_insts):
+    """Return a long chain 't<i> = t<i-1> + 1' and a colour map for it.
+    Only the writer is measured, so the colouring need not be valid."""
+    code_list = ThreeAdrInstList()
+    code_list.add_instruct(ThreeAdrInst("t0", "1"))
+    for i in range(1, num_insts):
+        code_list.add_instruct(ThreeAdrInst(f"t{i}", f"t{i - 1}", "+", "1"))
+    code_list.set_live_on_exit([f"t{num_insts - 1}"])
+    colour_map = {f"t{i}": i % 8 for i in range(num_insts)}
+    return code_list, colour_map
+
+
+def _old_concat(code_list, colour_map, out):
+    """The original AsmInstList.__str__: repeated string concatenation."""
+    asm = generate_assembly(code_list, colour_map, 8)
+    string = ""
+    for inst in asm.instructions:
+        string += f"    {str(inst)}\n"
+    out.write(string)
+
+
+def _str_listing(code_list, colour_map, out):
+    out.write(str(generate_assembly(code_list, colour_map, 8)))
+
+
+def _list_write(code_list, colour_map, out):
+    generate_assembly(code_list, colour_map, 8).write(out)
+
+
+def _streamed(code_list, colour_map, out):
+    write_assembly(code_list, colour_map, 8, out)
+
+
+def _run(fn, code_list, colour_map):
+    """Return (seconds, peak traced bytes) for writing with fn."""
+    with open(os.devnull, "w", buffering=1 << 16) as out:
+        _, seconds = timed(fn, code_list, colour_map, out)
+        tracemalloc.start()
+        fn(code_list, colour_map, out)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 400_000]
+    methods = [("old concat", _old_concat), ("str(asm)", _str_listing),
+               ("asm.write", _list_write), ("write_assembly", _streamed)]
+    print(f"{'instructions':>13}  {'method':<16}{'seconds':>9}{'peak MiB':>10}")
+    for size in sizes:
+        code_list, colour_map = _make_ir(size)
+        for name, fn in methods:
+            seconds, peak = _run(fn, code_list, colour_map)
+            print(f"{size:>13}  {name:<16}{seconds:>9.3f}{peak / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Summary: Search-node counts of the exact colouring search with and without
+    colour-symmetry breaking. Each instance is a random graph with a
+    planted clique of k + 1 nodes, so no k-colouring exists and the search
+    has to prove it; nodes are visited in the order allocate_with_spills
+    uses. The search without symmetry breaking is stopped after a budget
+    of search nodes.
+    Run from the py_code/ directory:
+        python benchmarks/bench_symmetry.py [budget]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import random
+import sys
+import time
+
+import bench_utils  # noqa: F401  (puts py_code on sys.path)
+
+from allocator import InterferenceGraph, _simplify
+
+NUM_NODES = 40
+EDGE_PROBABILITY = 0.1
+
+
+class _BudgetExceeded(Exception):
+    """Raised when the reference search runs out of search nodes."""
+
+
+class _PlainSearch(InterferenceGraph):
+    """The previous allocate_registers: every register is tried for every
+    node, so each partial colouring is explored in all its renamings."""
+
+    def __init__(self, graph, budget):
+        super().__init__()
+        self.graph = graph.graph
+        self.budget = budget
+
+    def allocate_registers(self, num_registers, color_these_nodes, colours_used=None):
+        self.search_nodes += 1
+        if self.search_nodes > self.budget:
+            raise _BudgetExceeded
+        if not color_these_nodes:
+            return True
+        curr = color_these_nodes[0]
+        for reg in range(num_registers):
+            if self.is_safe(curr, reg):
+                self.color[curr] = reg
+                if self.allocate_registers(num_registers, color_these_nodes[1:]):
+                    return True
+                del self.color[curr]
+        return False
+
+
+def make_instance(k, seed):
+    """
+    Builds a random graph that has no k-colouring.
+    Args:
+        k: The number of colours.
+        seed: Seed for the random generator.
+    Returns:
+        InterferenceGraph: NUM_NODES random nodes plus a clique of k + 1
+            of them chosen at random.
+    """
+    rng = random.Random(seed)
+    graph = InterferenceGraph()
+    nodes = [f"v{i}" for i in range(NUM_NODES)]
+    for node in nodes:
+        graph.add_node(node)
+    for i, a in enumerate(nodes):
+        for b in nodes[i + 1:]:
+            if rng.random() < EDGE_PROBABILITY:
+                graph.add_edge(a, b)
+    clique = rng.sample(nodes, k + 1)
+    for i, a in enumerate(clique):
+        for b in clique[i + 1:]:
+            graph.add_edge(a, b)
+    return graph
+
+
+def _search(graph, k):
+    """Run graph's exact search in simplify order; return (result, nodes, seconds)."""
+    order, _ = _simplify(graph, k)
+    start = time.perf_counter()
+    try:
+        result = graph.allocate_registers(k, order)
+    except _BudgetExceeded:
+        result = None
+    return result, graph.search_nodes, time.perf_counter() - start
+
+
+def main(args):
+    budget = int(args[1]) if len(args) > 1 else 200_000
+    print(f"{'k':>3}{'plain nodes':>14}{'plain s':>10}{'broken nodes':>14}"
+          f"{'broken s':>10}")
+    for k in range(6, 17, 2):
+        instance = make_instance(k, seed=k)
+        plain = _search(_PlainSearch(instance, budget), k)
+        broken = _search(instance, k)
+        assert broken[0] is False
+        plain_nodes = f">{budget}" if plain[0] is None else str(plain[1])
+        print(f"{k:>3}{plain_nodes:>14}{plain[2]:>10.3f}{broken[1]:>14}{broken[2]:>10.3f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
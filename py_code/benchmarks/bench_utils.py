@@ -0,0 +1,107 @@
+"""
+Summary: Shared helpers for the benchmark scripts. Generates synthetic
+    three-address blocks of a given size and live-set width, and runs the
+    tokenizer and parser over them.
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from tokenizer import Tokenizer
+from parser import Parser
+
+TEST_INPUTS = os.path.join(parent_dir, "test_drivers", "test_inputs")
+BASE_VARS = "abcdefghijklmnopqrsuvwxyz"   # every single letter except 't'
+
+
+def make_block(num_insts, width, seed=0):
+    """
+    Builds the source text of a random straight-line block.
+    Args:
+        num_insts: The number of instructions to generate.
+        width: How many of the most recently defined temporaries each
+            instruction may read, which bounds the live-set width.
+        seed: Seed for the random generator, so runs are repeatable.
+    Returns:
+        str: The block in the input file syntax, ending with a live: line.
+    """
+    rng = random.Random(seed)
+    ops = "+-*/"
+    defined = list(BASE_VARS[:4])
+    lines = [f"{var} = {rng.randint(1, 9)}" for var in defined]
+    for i in range(1, num_insts + 1):
+        window = defined[-width:]
+        dest = f"t{i}"
+        src1 = rng.choice(window)
+        if rng.random() < 0.2:
+            lines.append(f"{dest} = -{src1}")
+        else:
+            src2 = rng.choice(window + [str(rng.randint(1, 9))])
+            lines.append(f"{dest} = {src1} {rng.choice(ops)} {src2}")
+        defined.append(dest)
+    lines.append(f"live: {', '.join(defined[-min(width, 4):])}")
+    return "\n".join(lines) + "\n"
+
+
+def write_temp(text, suffix=".txt"):
+    """Write text to a new temporary file and return its path."""
+    with tempfile.NamedTemporaryFile(mode="w", suffix=suffix, delete=False) as f:
+        f.write(text)
+        return f.name
+
+
+def parse_file(path):
+    """Tokenize and parse the file at path and return its ThreeAdrInstList."""
+    tok = Tokenizer(path)
+    tok.tokenize()
+    return Parser(tok.tokens, tok.position).parse()
+
+
+def parse_text(text):
+    """Tokenize and parse source text and return its ThreeAdrInstList."""
+    path = write_temp(text)
+    try:
+        return parse_file(path)
+    finally:
+        os.unlink(path)
+
+
+def corpus():
+    """
+    Returns the benchmark corpus: every valid file in test_inputs plus a
+    few synthetic blocks.
+    Returns:
+        list: (name, ThreeAdrInstList) pairs.
+    """
+    blocks = []
+    for name in sorted(os.listdir(TEST_INPUTS)):
+        if not name.endswith(".txt"):
+            continue
+        try:
+            blocks.append((name, parse_file(os.path.join(TEST_INPUTS, name))))
+        except (ValueError, TypeError):
+            continue    # 5live_var_error.txt is invalid on purpose
+    for num_insts, width in ((30, 3), (60, 4), (120, 5)):
+        blocks.append((f"synthetic-{num_insts}x{width}", parse_text(make_block(num_insts, width))))
+    return blocks
+
+
+def timed(fn, *args, repeat=1):
+    """Call fn(*args) repeat times; return (last result, best seconds)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
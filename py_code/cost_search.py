@@ -0,0 +1,214 @@
+"""
+Summary: Cost-driven choice among valid colourings. Every valid colouring
+    of the interference graph gives correct code, but not the same code:
+    when an instruction's destination shares a register with a source,
+    generate_assembly's MOV becomes a self-move, which the peephole
+    optimiser removes, and 'd = a - d' needs a negation that 'd = a - b'
+    does not. cheapest_colouring starts from the allocator's colouring and
+    searches the colourings of the same variables (the spilled ones stay
+    spilled) for the one whose listing costs least under the cost model
+    in target.py: estimated cycles (OPERATOR_CYCLES plus MEMORY_CYCLES per
+    memory operand) or instruction count.
+
+    The cost of a listing is the cost of generate_assembly's output less
+    its self-moves (colouring_cost). The code for one IR instruction only
+    depends on the registers of its own variables, so the search is a
+    branch and bound: variables are coloured in order of first use, each
+    instruction is charged as soon as its last variable is coloured, and
+    a partial colouring that already costs as much as the best complete
+    one is abandoned. Colours not yet used (and not pinned or forbidden)
+    are interchangeable, so only one of them is tried at each step. The
+    search stops backtracking once a budget of search nodes is spent (the
+    descent under way is still finished, so even a small budget reaches
+    one complete colouring) and keeps the best colouring found; the
+    result says whether it was proved optimal.
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+from itertools import chain
+from typing import NamedTuple
+
+from allocator import _pinned_nodes
+from generate import (_OP_MAP, _translate_instruction, _scratch_register,
+                      _make_store_inst, generate_assembly)
+from peephole import is_self_move, remove_self_moves
+from target import COST_METRICS
+
+SEARCH_BUDGET = 20_000      # search nodes before the search stops backtracking
+
+
+class CostResult(NamedTuple):
+    metric: str             # 'cycles' or 'instructions'
+    cost: int               # estimated cost of the chosen colouring
+    initial_cost: int       # estimated cost of the colouring the search started from
+    search_nodes: int       # colour assignments tried
+    optimal: bool           # True if the search covered every colouring
+
+
+def colouring_cost(code_list, colour_map, num_registers, metric="cycles") -> int:
+    """
+    Estimates the cost of the code a colouring produces.
+    Args:
+        code_list: The ThreeAdrInstList to generate code for.
+        colour_map: A dictionary mapping variable names to registers;
+            missing variables are spilled.
+        num_registers: The number of available CPU registers.
+        metric: 'cycles' or 'instructions' (see target.AsmInst.cost).
+    Returns:
+        int: The cost of generate_assembly's listing without its
+            self-moves.
+    Raises:
+        ValueError: If the metric is unknown, or generate_assembly
+            rejects the colouring.
+    """
+    _check_metric(metric)
+    asm = generate_assembly(code_list, colour_map, num_registers)
+    remove_self_moves(asm)
+    return asm.cost(metric)
+
+
+def _check_metric(metric):
+    """Raise ValueError unless metric is one of COST_METRICS."""
+    if metric not in COST_METRICS:
+        raise ValueError(f"Unknown cost metric: {metric}. Valid metrics: "
+                         f"{', '.join(COST_METRICS)}")
+
+
+def _instruction_cost(instr, colour_map, scratch_reg, metric):
+    """Return the cost of one IR instruction's code without self-moves,
+    or infinity if it cannot be generated (a division into the register
+    of its divisor)."""
+    try:
+        insts = _translate_instruction(instr, colour_map, _OP_MAP, scratch_reg)
+    except ValueError:
+        return float("inf")
+    return sum(inst.cost(metric) for inst in insts if not is_self_move(inst))
+
+
+def _variables(instr, nodes):
+    """Return the operands of instr that are in nodes, in operand order."""
+    return [var for var in (instr.dest, instr.src1, instr.src2) if var in nodes]
+
+
+def _search_order(code_list, free):
+    """Return the free nodes in order of first use in code_list, then any
+    that are never used."""
+    order = dict.fromkeys(var for instr in code_list.instructions
+                          for var in _variables(instr, free))
+    order.update(dict.fromkeys(free))
+    return list(order)
+
+
+def _partners(code_list, free):
+    """Map each free node to the variables it shares an instruction with
+    as destination and source; giving them one register can turn a MOV
+    into a self-move."""
+    partners = {node: [] for node in free}
+    for instr in code_list.instructions:
+        for src in (instr.src1, instr.src2):
+            if src and src != instr.dest:
+                if instr.dest in partners:
+                    partners[instr.dest].append(src)
+                if src in partners:
+                    partners[src].append(instr.dest)
+    return partners
+
+
+def cheapest_colouring(code_list, graph, num_registers, metric="cycles",
+                       budget=SEARCH_BUDGET) -> CostResult:
+    """
+    Replaces a valid colouring with the cheapest one found within a
+    budget. Spilled variables stay spilled (so the scratch register stays
+    reserved), pinned variables keep their registers, and no variable is
+    given a forbidden register.
+    Args:
+        code_list: The ThreeAdrInstList the graph was built from.
+        graph: The InterferenceGraph; graph.color must hold a valid
+            colouring, e.g. from allocate_with_spills. It is replaced by
+            the cheapest colouring found (which may be the same one).
+        num_registers: The number of available CPU registers.
+        metric: 'cycles' or 'instructions' (see target.AsmInst.cost).
+        budget: The number of search nodes after which the search stops
+            backtracking and keeps the best colouring found.
+    Returns:
+        CostResult: The cost of the chosen colouring and of the one the
+            search started from, and whether the choice is optimal.
+    Raises:
+        ValueError: If the metric is unknown, or the starting colouring
+            cannot be generated.
+    """
+    _check_metric(metric)
+    adjacency = graph.graph
+    color = dict(graph.color)
+    initial = colouring_cost(code_list, color, num_registers, metric)
+    scratch_reg = _scratch_register(code_list, color, num_registers)
+    colours = num_registers - 1 if len(color) < len(adjacency) else num_registers
+    pinned = _pinned_nodes(graph)
+    forbidden = graph.forbidden
+    free = dict.fromkeys(node for node in color if node not in pinned)
+    nodes = _search_order(code_list, free)
+    partners = _partners(code_list, free)
+
+    # Each instruction is charged at the depth its last free variable is
+    # coloured; the rest (and the live-on-exit stores) cost the same for
+    # every colouring.
+    depth_of = {node: depth for depth, node in enumerate(nodes)}
+    due = [[] for _ in nodes]
+    base = sum(_make_store_inst(var, color[var]).cost(metric)
+               for var in code_list.live_on_exit if var in color)
+    for instr in code_list.instructions:
+        depths = [depth_of[var] for var in _variables(instr, depth_of)]
+        if depths:
+            due[max(depths)].append(instr)
+        else:
+            base += _instruction_cost(instr, color, scratch_reg, metric)
+
+    best, best_colour = initial, dict(color)
+    for node in nodes:
+        del color[node]
+    reserved = max(chain(pinned.values(), *forbidden.values()), default=-1) + 1
+
+    def candidates(node, used):
+        """The colours to try for node, those of its coloured partners
+        first; only one colour beyond the used ones is offered."""
+        offered = [color[var] for var in partners[node] if var in color]
+        offered += range(min(colours, used + 1))
+        banned = forbidden.get(node, ())
+        return [reg for reg in dict.fromkeys(offered)
+                if reg < colours and reg not in banned]
+
+    search_nodes = 0
+    costs, used = [base], [reserved]
+    stack = [iter(candidates(nodes[0], reserved))] if nodes else []
+    while stack:
+        depth = len(stack) - 1
+        node = nodes[depth]
+        color.pop(node, None)
+        for reg in stack[-1]:
+            if any(color.get(neighbour) == reg for neighbour in adjacency[node]):
+                continue
+            search_nodes += 1
+            color[node] = reg
+            cost = costs[depth] + sum(_instruction_cost(instr, color, scratch_reg, metric)
+                                      for instr in due[depth])
+            if cost >= best:
+                continue
+            if depth + 1 == len(nodes):
+                best, best_colour = cost, dict(color)
+                continue
+            costs.append(cost)
+            used.append(max(used[depth], reg + 1))
+            stack.append(iter(candidates(nodes[depth + 1], used[-1])))
+            break
+        else:
+            if search_nodes >= budget and depth > 0:
+                break       # out of budget: no more backtracking
+            color.pop(node, None)
+            stack.pop()
+            costs.pop()
+            used.pop()
+
+    graph.color = {node: best_colour[node] for node in graph.color}
+    return CostResult(metric, best, initial, search_nodes, not stack)
@@ -5,37 +5,156 @@ Summary: This handles all logic for generating target assembly code from the
 Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
 Date: February 26, 2026
 """
-from target import AsmInstList, AsmInst, AsmOperator, AsmOperand, AsmOperandMode, AsmRegister, AsmVariable
-def _translate_instruction(instr, colour_map, op_map):
+from target import (AsmInstList, AsmInst, AsmOperator,
+                    register_operand, variable_operand, immediate_operand)
+
+_OP_MAP = {
+    "+": AsmOperator.ADD,
+    "-": AsmOperator.SUB,
+    "*": AsmOperator.MUL,
+    "/": AsmOperator.DIV,
+}
+_MINUS_ONE = immediate_operand(-1)
+_ZERO = immediate_operand(0)
+
+def _translate_instruction(instr, colour_map, op_map, scratch_reg=None):
     """
     Translates a single three-address instruction into a list of assembly
-    instructions using the provided register colour map.
+    instructions using the provided register colour map. If the destination
+    was spilled (it has no register in the colour map), the result is built
+    in the scratch register and then stored to the variable's spill slot.
     Args:
         instr: A ThreeAdrInst object representing the instruction to translate.
         colour_map: A dictionary mapping variable names to assigned register
             numbers.
         op_map: A dictionary mapping IR operator strings to AsmOperator values.
+        scratch_reg: The register number reserved for spill code, or None
+            if nothing was spilled.
     Returns:
         list: A list of AsmInst objects for the given instruction.
+    Raises:
+        ValueError: If the destination was spilled but no scratch register
+            was reserved.
     """
-    dest = AsmOperand(AsmOperandMode.RGD, AsmRegister(colour_map[instr.dest]))
-    if instr.op in op_map:
-        return [
+    spilled = instr.dest not in colour_map
+    if spilled and scratch_reg is None:
+        raise ValueError(f"No register or scratch register for '{instr.dest}'")
+    reg_num = scratch_reg if spilled else colour_map[instr.dest]
+    dest = register_operand(reg_num)
+
+    if instr.op in op_map and instr.src2:
+        src1 = make_operand(instr.src1, colour_map)
+        src2 = make_operand(instr.src2, colour_map)
+        if _in_register(src2, reg_num) and not _in_register(src1, reg_num):
+            if instr.op == "/" and instr.src2 == instr.dest:
+                insts = _translate_self_division(instr.dest, src1, reg_num)
+            else:
+                insts = _translate_dest_is_src2(op_map[instr.op], src1, src2, dest)
+        else:
+            insts = [
+                AsmInst(AsmOperator.MVR, src1, dest),
+                AsmInst(op_map[instr.op], src2, dest),
+            ]
+    elif instr.op and _in_register(make_operand(instr.src1, colour_map), reg_num):
+        # unary negation in place: MOV #0 would overwrite the operand
+        insts = [
             AsmInst(AsmOperator.MVR, make_operand(instr.src1, colour_map), dest),
-            AsmInst(op_map[instr.op], make_operand(instr.src2, colour_map), dest),
+            AsmInst(AsmOperator.MUL, _MINUS_ONE, dest),
         ]
     elif instr.op:  # unary negation
-        return [
-            AsmInst(AsmOperator.MVR, AsmOperand(AsmOperandMode.IMM, 0), dest),
+        insts = [
+            AsmInst(AsmOperator.MVR, _ZERO, dest),
             AsmInst(AsmOperator.SUB, make_operand(instr.src1, colour_map), dest),
         ]
     else:  # simple assignment
-        return [AsmInst(AsmOperator.MVR, make_operand(instr.src1, colour_map), dest)]
+        insts = [AsmInst(AsmOperator.MVR, make_operand(instr.src1, colour_map), dest)]
+
+    if spilled:
+        insts.append(_make_store_inst(instr.dest, reg_num))
+    return insts
+
+
+def _in_register(operand, reg_num):
+    """Return True if operand is register direct on register reg_num."""
+    return operand is register_operand(reg_num)
+
+
+def _translate_self_division(var, src1, reg_num):
+    """
+    Translates 'x = y / x', whose divisor no colouring can keep out of the
+    destination's register. The divisor is first stored to x's memory
+    location (x is in a register, so nothing else reads it there) and the
+    division reads it from memory. The pipeline's split_self_divisions
+    avoids the store by copying x to a temporary register instead; this
+    covers instruction lists that were not rewritten, e.g. those edited
+    through IncrementalAllocator.
+    Args:
+        var: The name of x.
+        src1: The AsmOperand of the dividend.
+        reg_num: The number of x's register.
+    Returns:
+        list: A list of AsmInst objects computing the instruction.
+    """
+    dest = register_operand(reg_num)
+    return [
+        _make_store_inst(var, reg_num),
+        AsmInst(AsmOperator.MVR, src1, dest),
+        AsmInst(AsmOperator.DIV, variable_operand(var), dest),
+    ]
+
+
+def _translate_dest_is_src2(asm_op, src1, src2, dest):
+    """
+    Translates 'dest = src1 op src2' when dest shares its register with
+    src2, where the usual 'MOV src1, Rd' would overwrite src2 before it
+    is read. Commutative operators swap their operands, and subtraction
+    computes src2 - src1 and then negates it.
+    Args:
+        asm_op: The AsmOperator for the binary operation.
+        src1: The AsmOperand of the first source.
+        src2: The AsmOperand of the second source (register direct on
+            dest's register).
+        dest: The AsmOperand of the destination register.
+    Returns:
+        list: A list of AsmInst objects computing the instruction.
+    Raises:
+        ValueError: If the operator is DIV, which cannot be reordered
+            without a second register. The allocator keeps a divisor out
+            of its destination's register (and 'x = y / x' goes through
+            _translate_self_division), so this only happens for a
+            colouring made some other way.
+    """
+    if asm_op in (AsmOperator.ADD, AsmOperator.MUL):
+        return [AsmInst(AsmOperator.MVR, src2, dest), AsmInst(asm_op, src1, dest)]
+    if asm_op == AsmOperator.SUB:
+        return [
+            AsmInst(AsmOperator.MVR, src2, dest),
+            AsmInst(AsmOperator.SUB, src1, dest),
+            AsmInst(AsmOperator.MUL, _MINUS_ONE, dest),
+        ]
+    raise ValueError(f"Cannot divide into {dest}: it also holds the divisor")
+
+
+def _scratch_register(ir_list, colour_map, num_regs):
+    """Return the scratch register number if any destination was spilled,
+    else None. Raises ValueError if the colour map already uses it."""
+    if all(instr.dest in colour_map for instr in ir_list.instructions):
+        return None
+    scratch_reg = num_regs - 1
+    if scratch_reg < 0 or scratch_reg in colour_map.values():
+        raise ValueError(f"Scratch register R{scratch_reg} is not free for spill code")
+    return scratch_reg
+
 
 def generate_assembly(ir_list, colour_map, num_regs):
     """
     Translates an intermediate representation instruction list into
     assembly instructions using the provided register colour map.
+
+    Variables missing from the colour map are treated as spilled: they live
+    in their memory location (spill slot) for the whole block. A use reads
+    the slot directly as an absolute operand, and a definition is computed
+    in the scratch register R<num_regs - 1> and stored back to the slot.
     Args:
         ir_list: A ThreeAdrInstList containing the intermediate
             representation instructions.
@@ -44,21 +163,75 @@ def generate_assembly(ir_list, colour_map, num_regs):
         num_regs: The number of available CPU registers.
     Returns:
         AsmInstList: The generated assembly instruction list.
+    Raises:
+        ValueError: If a variable was spilled but R<num_regs - 1> is not
+            free to be used as the scratch register, or if a division
+            writes into the register holding its divisor.
     """
     asm = AsmInstList(num_regs)
-    op_map = {
-        "+": AsmOperator.ADD,
-        "-": AsmOperator.SUB,
-        "*": AsmOperator.MUL,
-        "/": AsmOperator.DIV,
-    }
-    for instr in ir_list.instructions:
-        for asm_instr in _translate_instruction(instr, colour_map, op_map):
-            asm.add_inst(asm_instr)
+    for asm_instr in _iter_body(ir_list, colour_map, num_regs):
+        asm.add_inst(asm_instr)
+    asm.spill_count = sum(1 for instr in ir_list.instructions
+                          if instr.dest not in colour_map)    # spill stores
 
+    asm.set_live_on_exit(ir_list.live_on_exit)
     return handle_live_on_exit(ir_list, colour_map, asm)
 
 
+def _iter_body(ir_list, colour_map, num_regs):
+    """Yield the AsmInst objects for every IR instruction, in order, without
+    the live-on-exit stores."""
+    scratch_reg = _scratch_register(ir_list, colour_map, num_regs)
+    for instr in ir_list.instructions:
+        yield from _translate_instruction(instr, colour_map, _OP_MAP, scratch_reg)
+
+
+def iter_assembly(ir_list, colour_map, num_regs):
+    """
+    Generates the same instructions as generate_assembly, one at a time,
+    without collecting them in an AsmInstList.
+    Args:
+        ir_list: A ThreeAdrInstList containing the intermediate
+            representation instructions.
+        colour_map: A dictionary mapping variable names (str) to
+            assigned register numbers (int).
+        num_regs: The number of available CPU registers.
+    Yields:
+        AsmInst: The next assembly instruction.
+    Raises:
+        ValueError: As for generate_assembly.
+    """
+    yield from _iter_body(ir_list, colour_map, num_regs)
+    for var in ir_list.live_on_exit:
+        if var in colour_map:
+            yield _make_store_inst(var, colour_map[var])
+
+
+def write_assembly(ir_list, colour_map, num_regs, out):
+    """
+    Streams the assembly listing for ir_list to a writable as each
+    instruction is produced, so memory use does not grow with the size
+    of the output. The text is identical to str(generate_assembly(...)).
+    Args:
+        ir_list: A ThreeAdrInstList containing the intermediate
+            representation instructions.
+        colour_map: A dictionary mapping variable names (str) to
+            assigned register numbers (int).
+        num_regs: The number of available CPU registers.
+        out: Any object with a write(str) method, ideally buffered
+            (e.g. a file opened in text mode).
+    Returns:
+        int: The number of instructions written.
+    Raises:
+        ValueError: As for generate_assembly.
+    """
+    count = 0
+    for asm_instr in iter_assembly(ir_list, colour_map, num_regs):
+        out.write(f"    {asm_instr}\n")
+        count += 1
+    return count
+
+
 def make_operand(value_str, colour_map):
     """
     Converts a string representing an operand into an AsmOperand object.
@@ -77,22 +250,21 @@ def make_operand(value_str, colour_map):
     
     # Check if it's an immediate value (integer)
     if value_str.isdigit() or (value_str.startswith('-') and value_str[1:].isdigit()):
-        return AsmOperand(AsmOperandMode.IMM, int(value_str))
+        return immediate_operand(int(value_str))
     # If it's a variable, look up its assigned register in the colour map
     else:
         if value_str in colour_map:
             reg_num = colour_map[value_str]
-            return AsmOperand(AsmOperandMode.RGD, AsmRegister(reg_num))
+            return register_operand(reg_num)
         else:
-            return AsmOperand(AsmOperandMode.ABS, AsmVariable(value_str, value_str))
+            return variable_operand(value_str)
+
 
+def _make_store_inst(var, reg_num):
+    """Return a MVD instruction that stores register reg_num back to var's
+    memory location."""
+    return AsmInst(AsmOperator.MVD, register_operand(reg_num), variable_operand(var))
 
-def _make_store_inst(var, colour_map):
-    """Return a MVD instruction that stores var's register value back to memory."""
-    reg_num = colour_map[var]
-    src = AsmOperand(AsmOperandMode.RGD, AsmRegister(reg_num))
-    dst = AsmOperand(AsmOperandMode.ABS, AsmVariable(var, var))
-    return AsmInst(AsmOperator.MVD, src, dst)
    
 def handle_live_on_exit(ir_list, colour_map, asm_list):
     """
@@ -111,5 +283,5 @@ def handle_live_on_exit(ir_list, colour_map, asm_list):
     """
     for var in ir_list.live_on_exit:
         if var in colour_map:
-            asm_list.add_inst(_make_store_inst(var, colour_map))
+            asm_list.add_inst(_make_store_inst(var, colour_map[var]))
     return asm_list
@@ -0,0 +1,351 @@
+"""
+Summary: Incremental register allocation for a block that is edited one
+    instruction at a time, e.g. from an editor on every keystroke. After
+    an insert or remove, liveness is recomputed backwards from the edit
+    only until it matches the previous result, the interference graph is
+    patched with the edges that appeared or disappeared, and only the
+    variables whose colour became invalid are recoloured.
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+from collections import Counter
+
+from allocator import build_interfere_graph, allocate_with_spills
+
+# Search nodes the exact search may spend backtracking, beyond one per
+# node, when the whole graph is allocated; past that the allocator spills
+# instead, so an edit never waits on an exponential search.
+SEARCH_BUDGET = 10_000
+
+
+def _bounded_search(graph, num_registers, order) -> bool:
+    """The exact search of allocate_with_spills, given up (as if it had
+    failed) after len(order) + SEARCH_BUDGET search nodes."""
+    return bool(graph.allocate_registers(num_registers, order,
+                                         budget=len(order) + SEARCH_BUDGET))
+
+
+def _is_var(operand) -> bool:
+    """Return True if operand is a variable name (not a literal or None)."""
+    return operand is not None and not operand.isdigit()
+
+
+def _pair(var1, var2):
+    """Return the undirected edge between two variables as a sorted tuple."""
+    return (var1, var2) if var1 < var2 else (var2, var1)
+
+
+def _live_in(inst, live_after: frozenset) -> frozenset:
+    """Return the variables live before inst, given those live after it."""
+    sources = {src for src in (inst.src1, inst.src2) if _is_var(src)}
+    return (live_after - {inst.dest}) | sources
+
+
+def _edges(inst, live_after: frozenset) -> list:
+    """
+    Returns the interference edges one instruction contributes, exactly as
+    build_interfere_graph adds them: the destination against everything
+    live after it, plus the divisor edge of a division. A division into
+    its own divisor ('x = y / x') adds no edge; generate_assembly divides
+    by x's memory copy instead.
+    Args:
+        inst: The ThreeAdrInst.
+        live_after: The variables live after inst.
+    Returns:
+        list: The edges as sorted pairs; may contain duplicates.
+    """
+    dest = inst.dest
+    edges = [_pair(dest, var) for var in live_after if var != dest]
+    if inst.op == "/" and _is_var(inst.src2) and inst.src2 != dest:
+        edges.append(_pair(dest, inst.src2))
+    return edges
+
+
+def _variables(inst) -> list:
+    """Return every variable inst mentions (its graph nodes)."""
+    return [var for var in (inst.dest, inst.src1, inst.src2) if _is_var(var)]
+
+
+class IncrementalAllocator:
+    """
+    Keeps an interference graph and colouring in step with a
+    ThreeAdrInstList as instructions are inserted, removed and replaced.
+
+    For each instruction the set of variables live after it is stored, and
+    every node and edge of the graph carries a count of the instructions
+    (and live-on-exit entries) that produce it, so an edit can take back
+    exactly what an instruction contributed.
+    """
+
+    def __init__(self, code_list, num_registers: int):
+        """
+        Builds the graph and colouring for the whole block once.
+        Args:
+            code_list: The ThreeAdrInstList to track. It is edited in
+                place by insert, remove and replace.
+            num_registers: The number of available CPU registers.
+        Raises:
+            ValueError: If the block cannot be allocated even with
+                spilling (see allocate_with_spills).
+        """
+        self.code_list = code_list
+        self.num_registers = num_registers
+        self.graph = build_interfere_graph(code_list)
+        self.spilled = allocate_with_spills(self.graph, num_registers, _bounded_search)
+        self.last_edit = {}
+        self.full_recolours = 0
+
+        live = frozenset(code_list.live_on_exit)
+        self.node_counts = Counter(live)
+        self.edge_counts = Counter()
+        self.live_after = [None] * len(code_list.instructions)
+        for i in range(len(code_list.instructions) - 1, -1, -1):
+            inst = code_list.instructions[i]
+            self.live_after[i] = live
+            self.node_counts.update(_variables(inst))
+            self.edge_counts.update(_edges(inst, live))
+            live = _live_in(inst, live)
+
+    @property
+    def color(self) -> dict:
+        """The current colouring: variable name -> register number."""
+        return self.graph.color
+
+    def _num_colours(self) -> int:
+        """Return the colours available, one fewer while any variable is
+        spilled (the last register is then the scratch register)."""
+        return self.num_registers - 1 if self.spilled else self.num_registers
+
+    def _live_before(self, index: int) -> frozenset:
+        """Return the variables live before instruction index (or live on
+        exit, for the position after the last instruction)."""
+        if index == len(self.live_after):
+            return frozenset(self.code_list.live_on_exit)
+        return _live_in(self.code_list.instructions[index], self.live_after[index])
+
+    def _add(self, inst, live_after, dirty: set) -> None:
+        """Count inst's nodes and edges into the graph."""
+        graph = self.graph
+        for var in _variables(inst):
+            if var not in graph.graph:
+                graph.add_node(var)
+                dirty.add(var)
+            self.node_counts[var] += 1
+        for var1, var2 in _edges(inst, live_after):
+            if self.edge_counts[(var1, var2)] == 0:
+                graph.add_edge(var1, var2)
+                self.last_edit["edges_added"] += 1
+                dirty.update((var1, var2))
+            self.edge_counts[(var1, var2)] += 1
+
+    def _subtract(self, inst, live_after, unused: set) -> None:
+        """Take inst's nodes and edges back out of the graph. Nodes whose
+        count drops to zero are only collected in unused, because while
+        liveness is being recomputed other instructions' stale edges may
+        still touch them; _remove_unused deletes them afterwards."""
+        graph = self.graph
+        for pair in _edges(inst, live_after):
+            self.edge_counts[pair] -= 1
+            if self.edge_counts[pair] == 0:
+                del self.edge_counts[pair]
+                graph.remove_edge(*pair)
+                self.last_edit["edges_removed"] += 1
+        for var in _variables(inst):
+            self.node_counts[var] -= 1
+            if self.node_counts[var] == 0:
+                unused.add(var)
+
+    def _remove_unused(self, unused: set) -> None:
+        """Delete the collected nodes that no instruction mentions any more."""
+        for var in unused:
+            if self.node_counts[var] == 0:
+                del self.node_counts[var]
+                self.graph.remove_node(var)
+                if var in self.spilled:
+                    self.spilled.remove(var)
+
+    def _propagate(self, index: int, dirty: set, unused: set) -> None:
+        """
+        Recomputes liveness backwards from instruction index, replacing
+        each instruction's edges, until the live set after an instruction
+        is unchanged; everything before that point is unaffected.
+        Args:
+            index: The last instruction whose live-after set may have
+                changed.
+            dirty: Collects the variables whose colour must be checked.
+            unused: Collects the variables that may have no uses left.
+        Returns:
+            None
+        """
+        instructions = self.code_list.instructions
+        while index >= 0:
+            live = self._live_before(index + 1)
+            if live == self.live_after[index]:
+                break
+            self._subtract(instructions[index], self.live_after[index], unused)
+            self.live_after[index] = live
+            self._add(instructions[index], live, dirty)
+            self.last_edit["relived"] += 1
+            index -= 1
+
+    def _free_colour(self, node, num_colours: int, avoid=()):
+        """Return the lowest colour no neighbour of node has (and not in
+        avoid or forbidden to node), or None."""
+        used = {self.graph.color.get(n) for n in self.graph.graph[node]}
+        used.update(avoid)
+        used.update(self.graph.forbidden.get(node, ()))
+        return next((c for c in range(num_colours) if c not in used), None)
+
+    def _recolour(self, node, num_colours: int) -> bool:
+        """
+        Gives node a valid colour: a free one if there is any, otherwise
+        by moving a single neighbour that is the only holder of some
+        colour to another free colour of its own. Pinned neighbours are
+        never moved.
+        Args:
+            node: The uncoloured variable.
+            num_colours: The number of colours available.
+        Returns:
+            bool: True if node was coloured.
+        """
+        color = self.graph.color
+        colour = self._free_colour(node, num_colours)
+        if colour is None:
+            holders = {}
+            for neighbour in self.graph.graph[node]:
+                if neighbour in color and neighbour not in self.graph.pinned:
+                    holders.setdefault(color[neighbour], []).append(neighbour)
+            for colour, nodes in sorted(holders.items()):
+                if len(nodes) != 1:
+                    continue
+                moved = self._free_colour(nodes[0], num_colours, avoid=(colour,))
+                if moved is not None:
+                    color[nodes[0]] = moved
+                    self.last_edit["recoloured"] += 1
+                    break
+            else:
+                return False
+        color[node] = colour
+        self.last_edit["recoloured"] += 1
+        return True
+
+    def _repair(self, dirty: set) -> None:
+        """
+        Restores a valid colouring after an edit. Only the dirty
+        variables (new nodes and the ends of new edges) can have lost a
+        valid colour; each one that did is recoloured locally. Pinned
+        variables take their registers first, so the others move around
+        them. If that fails, the whole graph is allocated again from
+        scratch.
+        Args:
+            dirty: The variables to check.
+        Returns:
+            None
+        Raises:
+            ValueError: If the full allocation fails (see
+                allocate_with_spills).
+        """
+        graph, color = self.graph, self.graph.color
+        num_colours = self._num_colours()
+        pinned = [node for node in sorted(dirty) if node in graph.pinned and node in graph.graph]
+        for node in pinned:
+            color[node] = graph.pinned[node]
+        if any(graph.pinned.get(n) == color[node] for node in pinned for n in graph.graph[node]):
+            self._recolour_all()    # two pinned variables now clash (raises)
+            return
+        for node in sorted(dirty):
+            if node not in graph.graph or node in self.spilled or node in graph.pinned:
+                continue
+            colour = color.get(node)
+            if colour is not None and graph.is_safe(node, colour):
+                continue
+            color.pop(node, None)
+            if not self._recolour(node, num_colours):
+                self._recolour_all()
+                return
+
+    def _recolour_all(self) -> None:
+        """Allocate the whole graph again from scratch (see _bounded_search)."""
+        self.spilled = allocate_with_spills(self.graph, self.num_registers,
+                                            _bounded_search)
+        self.full_recolours += 1
+        self.last_edit["full"] = True
+
+    def _start_edit(self) -> None:
+        """Reset the statistics of the last edit."""
+        self.last_edit = {"relived": 0, "edges_added": 0, "edges_removed": 0,
+                          "recoloured": 0, "full": False}
+
+    def insert(self, index: int, inst) -> None:
+        """
+        Inserts an instruction and updates the graph and colouring.
+        Args:
+            index: The position the instruction will occupy.
+            inst: The ThreeAdrInst to insert.
+        Returns:
+            None
+        Raises:
+            IndexError: If index is out of bounds.
+        """
+        if not 0 <= index <= len(self.live_after):
+            raise IndexError(f"Index: {index}, is out of bounds")
+        self._start_edit()
+        live = self._live_before(index)     # what the new instruction precedes
+        self.code_list.insert_instruct(index, inst)
+        self.live_after.insert(index, live)
+        dirty, unused = set(), set()
+        self._add(inst, live, dirty)
+        self._propagate(index - 1, dirty, unused)
+        self._remove_unused(unused)
+        self._repair(dirty)
+
+    def remove(self, index: int):
+        """
+        Removes an instruction and updates the graph and colouring.
+        Args:
+            index: The position of the instruction to remove.
+        Returns:
+            ThreeAdrInst: The removed instruction.
+        Raises:
+            IndexError: If index is out of bounds.
+        """
+        if not 0 <= index < len(self.live_after):
+            raise IndexError(f"Index: {index}, is out of bounds")
+        self._start_edit()
+        inst = self.code_list.remove_instruct(index)
+        dirty, unused = set(), set()
+        self._subtract(inst, self.live_after.pop(index), unused)
+        self._propagate(index - 1, dirty, unused)
+        self._remove_unused(unused)
+        self._repair(dirty)
+        return inst
+
+    def replace(self, index: int, inst):
+        """
+        Replaces an instruction in place and updates the graph and
+        colouring. Unlike a remove followed by an insert, liveness after
+        the instruction is kept, so a value the old instruction defined is
+        never briefly live across the whole prefix.
+        Args:
+            index: The position of the instruction to replace.
+            inst: The new ThreeAdrInst.
+        Returns:
+            ThreeAdrInst: The instruction that was replaced.
+        Raises:
+            IndexError: If index is out of bounds.
+        """
+        if not 0 <= index < len(self.live_after):
+            raise IndexError(f"Index: {index}, is out of bounds")
+        self._start_edit()
+        old = self.code_list.instructions[index]
+        live = self.live_after[index]
+        dirty, unused = set(), set()
+        self._subtract(old, live, unused)
+        self.code_list.instructions[index] = inst
+        self._add(inst, live, dirty)
+        self._propagate(index - 1, dirty, unused)
+        self._remove_unused(unused)
+        self._repair(dirty)
+        return old
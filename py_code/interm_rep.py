@@ -50,11 +50,13 @@ class ThreeAdrInstList:
 
     def __init__(self):
         """
-        Initializes an empty ThreeAdrInstList with no instructions
-        and no live-on-exit variables.
+        Initializes an empty ThreeAdrInstList with no instructions,
+        no live-on-exit variables and no register constraints.
         """
         self.instructions = []  # List to hold ThreeAdrInst objects
         self.live_on_exit = []  # List of variables live on exit
+        self.pinned = {}        # Variable -> register it must be given
+        self.forbidden = {}     # Variable -> set of registers it must not get
 
     def add_instruct(self, instruction):
         """
@@ -66,6 +68,22 @@ class ThreeAdrInstList:
         """
         self.instructions.append(instruction)
 
+    def insert_instruct(self, index, instruction):
+        """
+        Inserts a ThreeAdrInst before the given position.
+        Args:
+            index: The position the instruction will occupy; an index
+                equal to the list length appends.
+            instruction: The ThreeAdrInst object to insert.
+        Returns:
+            None
+        Raises:
+            IndexError: If index is out of bounds.
+        """
+        if not 0 <= index <= len(self.instructions):
+            raise IndexError(f"Index: {index}, is out of bounds")
+        self.instructions.insert(index, instruction)
+
     def remove_instruct(self, index):
         """
         Removes and returns a ThreeAdrInst from the instruction list
@@ -92,6 +110,31 @@ class ThreeAdrInstList:
         """
         self.live_on_exit = live_vars
 
+    def pin_register(self, var, register):
+        """
+        Requires a variable to be allocated a specific register (e.g. one
+        the calling convention expects it in). A later pin of the same
+        variable replaces an earlier one.
+        Args:
+            var: The variable name (str).
+            register: The register number (int).
+        Returns:
+            None
+        """
+        self.pinned[var] = register
+
+    def forbid_registers(self, var, registers):
+        """
+        Forbids a variable from being allocated any of the given
+        registers, in addition to any forbidden before.
+        Args:
+            var: The variable name (str).
+            registers: An iterable of register numbers (int).
+        Returns:
+            None
+        """
+        self.forbidden.setdefault(var, set()).update(registers)
+
     def __str__(self):
         """
         Returns a formatted string representation of the entire
@@ -104,5 +147,12 @@ class ThreeAdrInstList:
         for i, inst in enumerate(self.instructions):
             string += f"  {i}: {inst}\n"
         string += f"Live on exit: {', '.join(self.live_on_exit)}\n"
+        if self.pinned:
+            string += "Pinned: " + ", ".join(f"{var} R{reg}"
+                                             for var, reg in self.pinned.items()) + "\n"
+        if self.forbidden:
+            string += "Forbidden: " + ", ".join(
+                f"{var} " + " ".join(f"R{reg}" for reg in sorted(regs))
+                for var, regs in self.forbidden.items()) + "\n"
         string += "----------------------------------------"
         return string
\ No newline at end of file
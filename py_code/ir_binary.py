@@ -0,0 +1,266 @@
+"""
+Summary: Binary on-disk format for a ThreeAdrInstList, so repeat runs on
+    the same input skip tokenizing and parsing. Files are read through
+    mmap and instructions are only decoded when they are accessed.
+
+    Layout (all integers little-endian):
+        header   magic b"RIR0", version, then the number of strings,
+                 live-on-exit variables, pins, forbidden registers and
+                 instructions, each a u32
+        strings  u32 byte length, then every variable name and literal as
+                 UTF-8 joined with newlines; a string's index is its
+                 position
+        live     one u32 string index per live-on-exit variable
+        pins     u32 string index and u32 register per pinned variable
+        avoid    u32 string index and u32 register per forbidden
+                 (variable, register) pair
+        padding  zero bytes up to a multiple of 8
+        code     one 16-byte record per instruction: operator byte
+                 (0 for a simple assignment, else 1-4 for + - * /),
+                 three padding bytes, then the u32 string indices of
+                 dest, src1 and src2 (0xFFFFFFFF when src2 is absent)
+
+    Run as a script to convert files:
+        python ir_binary.py to-bin <input.txt> <input.irb>
+        python ir_binary.py to-text <input.irb> <input.txt>
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import mmap
+import struct
+import sys
+from collections.abc import Sequence
+
+from interm_rep import ThreeAdrInst, ThreeAdrInstList
+
+MAGIC = b"RIR0"
+VERSION = 2
+
+_HEADER = struct.Struct("<4sBxxxIIIII")
+_U32 = struct.Struct("<I")
+_RECORD = struct.Struct("<BxxxIII")
+_NONE = 0xFFFFFFFF
+
+_OPS = [None, "+", "-", "*", "/"]
+_OP_CODE = {op: code for code, op in enumerate(_OPS)}
+
+
+def _pad(length: int) -> int:
+    """Return the number of zero bytes that align length to 8."""
+    return -length % 8
+
+
+def encode(code_list: ThreeAdrInstList) -> bytes:
+    """
+    Encodes an instruction list in the binary IR format.
+    Args:
+        code_list: The ThreeAdrInstList to encode.
+    Returns:
+        bytes: The encoded block.
+    """
+    strings = {}
+    def index(value):
+        """Return the string index of value, adding it on first use."""
+        if value is None:
+            return _NONE
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    live = [index(var) for var in code_list.live_on_exit]
+    pins = [n for var, reg in code_list.pinned.items() for n in (index(var), reg)]
+    avoid = [n for var, registers in code_list.forbidden.items()
+             for reg in sorted(registers) for n in (index(var), reg)]
+    code = bytearray(_RECORD.size * len(code_list.instructions))
+    for i, inst in enumerate(code_list.instructions):
+        _RECORD.pack_into(code, i * _RECORD.size, _OP_CODE[inst.op],
+                          index(inst.dest), index(inst.src1), index(inst.src2))
+
+    names = "\n".join(strings).encode()
+    head = _HEADER.pack(MAGIC, VERSION, len(strings), len(live), len(pins) // 2,
+                        len(avoid) // 2, len(code_list.instructions))
+    tables = live + pins + avoid
+    body = _U32.pack(len(names)) + names + struct.pack(f"<{len(tables)}I", *tables)
+    return head + body + bytes(_pad(len(head) + len(body))) + code
+
+
+def is_binary_ir(path: str) -> bool:
+    """Return True if the file at path starts with the binary IR magic."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class IRBinaryReader(Sequence):
+    """
+    A read-only sequence of ThreeAdrInst decoded on demand from a binary
+    IR buffer. Only the header, string table, live list and register
+    constraints are decoded when the reader is created.
+    """
+
+    def __init__(self, buffer):
+        """
+        Initializes the reader over an encoded block.
+        Args:
+            buffer: Any object supporting the buffer protocol (bytes,
+                bytearray, mmap).
+        Raises:
+            ValueError: If the buffer does not hold this format.
+        """
+        self.buffer = memoryview(buffer)
+        if len(self.buffer) < _HEADER.size:
+            raise ValueError("Not a binary IR file: too short")
+        magic, version, num_strings, num_live, num_pins, num_avoid, self.num_insts = \
+            _HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a binary IR file (magic {magic!r}, version {version})")
+
+        pos = _HEADER.size
+        names_len = _U32.unpack_from(self.buffer, pos)[0]
+        pos += _U32.size
+        names = bytes(self.buffer[pos:pos + names_len]).decode()
+        self.strings = names.split("\n") if num_strings else []
+        pos += names_len
+        live = struct.unpack_from(f"<{num_live}I", self.buffer, pos)
+        self.live_on_exit = [self.strings[i] for i in live]
+        pos += _U32.size * num_live
+        pins = struct.unpack_from(f"<{2 * num_pins}I", self.buffer, pos)
+        self.pinned = {self.strings[i]: reg for i, reg in zip(pins[::2], pins[1::2])}
+        pos += _U32.size * 2 * num_pins
+        avoid = struct.unpack_from(f"<{2 * num_avoid}I", self.buffer, pos)
+        self.forbidden = {}
+        for i, reg in zip(avoid[::2], avoid[1::2]):
+            self.forbidden.setdefault(self.strings[i], set()).add(reg)
+        pos += _U32.size * 2 * num_avoid
+        self._code = pos + _pad(pos)
+        if len(self.buffer) < self._code + _RECORD.size * self.num_insts:
+            raise ValueError("Binary IR file is truncated")
+
+    @classmethod
+    def open(cls, path: str) -> "IRBinaryReader":
+        """
+        Maps a binary IR file into memory and returns a reader over it.
+        The mapping stays open for as long as the reader is alive.
+        Args:
+            path: Path of the file to read.
+        Returns:
+            IRBinaryReader: A reader backed by the memory map.
+        """
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self):
+        """Returns the number of instructions."""
+        return self.num_insts
+
+    def _inst(self, record) -> ThreeAdrInst:
+        """Return the ThreeAdrInst for a raw record."""
+        op, dest, src1, src2 = record
+        strings = self.strings
+        return ThreeAdrInst(strings[dest], strings[src1], _OPS[op],
+                            None if src2 == _NONE else strings[src2])
+
+    def __getitem__(self, index):
+        """
+        Decodes a single instruction.
+        Args:
+            index: Position of the instruction; negative indices count
+                from the end.
+        Returns:
+            ThreeAdrInst: The decoded instruction.
+        Raises:
+            IndexError: If index is out of range.
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.num_insts))]
+        if index < 0:
+            index += self.num_insts
+        if not 0 <= index < self.num_insts:
+            raise IndexError(f"Index: {index}, is out of bounds")
+        return self._inst(_RECORD.unpack_from(self.buffer, self._code + index * _RECORD.size))
+
+    def __iter__(self):
+        """Yields each decoded ThreeAdrInst in order."""
+        end = self._code + _RECORD.size * self.num_insts
+        return map(self._inst, _RECORD.iter_unpack(self.buffer[self._code:end]))
+
+    def to_inst_list(self) -> ThreeAdrInstList:
+        """
+        Decodes the whole block.
+        Returns:
+            ThreeAdrInstList: The decoded instructions, live-on-exit
+                variables and register constraints.
+        """
+        code_list = ThreeAdrInstList()
+        code_list.instructions = list(self)
+        code_list.set_live_on_exit(list(self.live_on_exit))
+        for var, reg in self.pinned.items():
+            code_list.pin_register(var, reg)
+        for var, registers in self.forbidden.items():
+            code_list.forbid_registers(var, registers)
+        return code_list
+
+
+def decode(data) -> ThreeAdrInstList:
+    """Decode a binary IR block (bytes or any buffer) into a ThreeAdrInstList."""
+    return IRBinaryReader(data).to_inst_list()
+
+
+def load(path: str) -> ThreeAdrInstList:
+    """Read a binary IR file through mmap into a ThreeAdrInstList."""
+    return IRBinaryReader.open(path).to_inst_list()
+
+
+def to_text(code_list: ThreeAdrInstList) -> str:
+    """
+    Formats an instruction list in the input file syntax accepted by the
+    Tokenizer and Parser.
+    Args:
+        code_list: The ThreeAdrInstList to format.
+    Returns:
+        str: One instruction per line, followed by the live: line and
+            any pin: and avoid: lines.
+    """
+    lines = [str(inst) for inst in code_list.instructions]
+    lines.append(f"live: {', '.join(code_list.live_on_exit)}")
+    if code_list.pinned:
+        lines.append("pin: " + ", ".join(f"{var} R{reg}" for var, reg in code_list.pinned.items()))
+    if code_list.forbidden:
+        lines.append("avoid: " + ", ".join(
+            f"{var} " + " ".join(f"R{reg}" for reg in sorted(registers))
+            for var, registers in code_list.forbidden.items()))
+    return "\n".join(lines) + "\n"
+
+
+def main(args):
+    """
+    Converts an input file between the text syntax and the binary IR
+    format.
+    Args:
+        args: The command-line arguments: mode ('to-bin' or 'to-text'),
+            input path and output path.
+    Returns:
+        None
+    """
+    if len(args) != 4 or args[1] not in ("to-bin", "to-text"):
+        print("Usage: python ir_binary.py to-bin|to-text <input> <output>",
+              file=sys.stderr)
+        sys.exit(1)
+    mode, in_path, out_path = args[1:]
+    if mode == "to-bin":
+        from tokenizer import Tokenizer
+        from parser import Parser
+        tokenizer = Tokenizer(in_path)
+        tokenizer.tokenize()
+        data = encode(Parser(tokenizer.tokens, tokenizer.position).parse())
+        with open(out_path, "wb") as f:
+            f.write(data)
+    else:
+        with open(out_path, "w") as f:
+            f.write(to_text(load(in_path)))
+    print(f"Converted '{in_path}' to '{out_path}'.")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,276 @@
+"""
+Summary: Optimisation passes over the three-address intermediate
+    representation, run before the interference graph is built. Every
+    variable a pass removes is one less node for the allocator to colour.
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+from interm_rep import ThreeAdrInst, ThreeAdrInstList
+
+_COMMUTATIVE = {"+", "*"}
+
+_FOLDERS = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+}
+
+
+def _is_literal(operand) -> bool:
+    """Return True if operand is an integer literal string."""
+    return operand is not None and operand.isdigit()
+
+
+def _literal_inst(dest, value: int) -> ThreeAdrInst:
+    """
+    Builds the instruction that assigns a constant to dest. Literals in the
+    IR are never negative, so a negative value becomes a unary negation.
+    Args:
+        dest: The destination variable name.
+        value: The integer value to assign.
+    Returns:
+        ThreeAdrInst: 'dest = value' or 'dest = - (-value)'.
+    """
+    if value < 0:
+        return ThreeAdrInst(dest, str(-value), "-")
+    return ThreeAdrInst(dest, str(value))
+
+
+def _fold(op, a: int, b: int):
+    """Return a op b, or None if the result cannot be folded (division by
+    zero, or a division with a remainder whose rounding is target-defined)."""
+    if op == "/":
+        if b == 0 or a % b != 0:
+            return None
+        return a // b
+    return _FOLDERS[op](a, b)
+
+
+class _CopyTable:
+    """Tracks which variables currently hold a known constant or a copy of
+    another variable while walking a block forwards."""
+
+    def __init__(self):
+        """Initializes an empty table."""
+        self.consts = {}    # variable -> int value
+        self.copies = {}    # variable -> variable it is a copy of
+
+    def value(self, operand):
+        """Return the known integer value of operand, or None."""
+        if _is_literal(operand):
+            return int(operand)
+        return self.consts.get(operand)
+
+    def replace(self, operand):
+        """Return the cheapest equivalent of operand: a literal if its value
+        is a known non-negative constant, else the variable it copies."""
+        if operand is None or _is_literal(operand):
+            return operand
+        value = self.consts.get(operand)
+        if value is not None and value >= 0:
+            return str(value)
+        return self.copies.get(operand, operand)
+
+    def kill(self, var):
+        """Forget everything that depends on the old value of var."""
+        self.consts.pop(var, None)
+        self.copies.pop(var, None)
+        for copy in [c for c, src in self.copies.items() if src == var]:
+            del self.copies[copy]
+
+    def record(self, inst: ThreeAdrInst):
+        """Remember what inst's destination holds after it executes."""
+        self.kill(inst.dest)
+        if inst.op is None and not _is_literal(inst.src1):
+            if inst.src1 != inst.dest:
+                self.copies[inst.dest] = inst.src1
+            return
+        value = self.value(inst.src1)
+        if inst.op is None:
+            self.consts[inst.dest] = value
+        elif inst.src2 is None and _is_literal(inst.src1):
+            self.consts[inst.dest] = -value
+
+
+def _rewrite(inst: ThreeAdrInst, table: _CopyTable) -> ThreeAdrInst:
+    """
+    Rewrites one instruction using the copy table: propagates copies and
+    constants into its operands and folds it if all of them are known.
+    Args:
+        inst: The ThreeAdrInst to rewrite.
+        table: The _CopyTable describing the state before inst.
+    Returns:
+        ThreeAdrInst: The rewritten instruction (inst itself if unchanged).
+    """
+    if inst.op and inst.src2:
+        a, b = table.value(inst.src1), table.value(inst.src2)
+        if a is not None and b is not None:
+            folded = _fold(inst.op, a, b)
+            if folded is not None:
+                return _literal_inst(inst.dest, folded)
+    elif inst.op:
+        a = table.value(inst.src1)
+        if a is not None:
+            return _literal_inst(inst.dest, -a)
+    else:
+        a = table.value(inst.src1)
+        if a is not None:
+            return _literal_inst(inst.dest, a)
+
+    src1, src2 = table.replace(inst.src1), table.replace(inst.src2)
+    if src1 == inst.src1 and src2 == inst.src2:
+        return inst
+    return ThreeAdrInst(inst.dest, src1, inst.op, src2)
+
+
+def propagate_and_fold(code_list: ThreeAdrInstList) -> int:
+    """
+    Propagates copies and constants forwards through the block and folds
+    arithmetic whose operands are all known, e.g. 't = 3 * 4' becomes
+    't = 12'. Redefining a variable invalidates every fact that depended
+    on its old value.
+    Args:
+        code_list: The ThreeAdrInstList to optimise in place.
+    Returns:
+        int: The number of instructions that were rewritten.
+    """
+    table = _CopyTable()
+    rewritten = 0
+    instructions = []
+    for inst in code_list.instructions:
+        new_inst = _rewrite(inst, table)
+        if new_inst is not inst:
+            rewritten += 1
+        table.record(new_inst)
+        instructions.append(new_inst)
+    code_list.instructions = instructions
+    return rewritten
+
+
+class _ValueTable:
+    """Local value numbering state: the value number each variable holds
+    and which variables hold each value, updated as a block is walked
+    forwards."""
+
+    def __init__(self):
+        """Initializes an empty table."""
+        self.numbers = {}   # variable or literal -> value number
+        self.holders = {}   # value number -> variables holding it, oldest first
+        self.exprs = {}     # (op, vn1, vn2) -> value number
+        self._next = 0
+
+    def new_number(self):
+        """Return a fresh value number."""
+        self._next += 1
+        return self._next
+
+    def number(self, operand):
+        """Return the value number of operand, numbering it on first use."""
+        if operand not in self.numbers:
+            self.numbers[operand] = self.new_number()
+        return self.numbers[operand]
+
+    def key(self, inst: ThreeAdrInst):
+        """Return the expression key of inst, with the operands of
+        commutative operators in a canonical order, or None for copies."""
+        if inst.op is None:
+            return None
+        if inst.src2 is None:
+            return ("neg", self.number(inst.src1), None)
+        vn1, vn2 = self.number(inst.src1), self.number(inst.src2)
+        if inst.op in _COMMUTATIVE and vn2 < vn1:
+            vn1, vn2 = vn2, vn1
+        return (inst.op, vn1, vn2)
+
+    def holder(self, key):
+        """Return a variable that still holds the value of key, or None."""
+        vars_holding = self.holders.get(self.exprs.get(key), ())
+        return next(iter(vars_holding), None)
+
+    def assign(self, var, number):
+        """Record that var now holds value number, dropping its old value."""
+        old = self.numbers.get(var)
+        if old in self.holders:
+            self.holders[old].pop(var, None)
+        self.numbers[var] = number
+        self.holders.setdefault(number, {})[var] = None
+
+
+def eliminate_common_subexpressions(code_list: ThreeAdrInstList) -> int:
+    """
+    Local value numbering. An instruction that recomputes a value some
+    variable still holds, e.g. 'y = b * a' after 'x = a * b', becomes a
+    copy 'y = x' for propagate_and_fold and remove_dead_code to clean up.
+    Operands are compared by value number rather than by name, so
+    redefining an operand (or the variable holding the result) correctly
+    stops the reuse.
+    Args:
+        code_list: The ThreeAdrInstList to optimise in place.
+    Returns:
+        int: The number of instructions rewritten as copies (or removed,
+            when the destination already holds the value).
+    """
+    table = _ValueTable()
+    rewritten = 0
+    instructions = []
+    for inst in code_list.instructions:
+        key = table.key(inst)
+        if key is None:
+            table.assign(inst.dest, table.number(inst.src1))
+        elif table.holder(key) is not None:
+            holder = table.holder(key)
+            rewritten += 1
+            if holder == inst.dest:
+                continue    # recomputes the value it already holds
+            table.assign(inst.dest, table.numbers[holder])
+            inst = ThreeAdrInst(inst.dest, holder)
+        else:
+            number = table.new_number()
+            table.exprs[key] = number
+            table.assign(inst.dest, number)
+        instructions.append(inst)
+    code_list.instructions = instructions
+    return rewritten
+
+
+def remove_dead_code(code_list: ThreeAdrInstList) -> int:
+    """
+    Removes definitions whose value is never used. Walks the block
+    backwards starting from the live-on-exit variables, in the same way as
+    build_interfere_graph.
+    Args:
+        code_list: The ThreeAdrInstList to optimise in place.
+    Returns:
+        int: The number of instructions removed.
+    """
+    live = set(code_list.live_on_exit)
+    kept = []
+    for inst in reversed(code_list.instructions):
+        if inst.dest not in live:
+            continue
+        live.discard(inst.dest)
+        for src in (inst.src1, inst.src2):
+            if src and not src.isdigit():
+                live.add(src)
+        kept.append(inst)
+    removed = len(code_list.instructions) - len(kept)
+    code_list.instructions = kept[::-1]
+    return removed
+
+
+def optimise(code_list: ThreeAdrInstList) -> int:
+    """
+    Runs copy propagation and constant folding, common subexpression
+    elimination, a second propagation to forward the copies it created,
+    and finally dead-code elimination over the block.
+    Args:
+        code_list: The ThreeAdrInstList to optimise in place.
+    Returns:
+        int: The number of instructions removed.
+    """
+    propagate_and_fold(code_list)
+    if eliminate_common_subexpressions(code_list):
+        propagate_and_fold(code_list)
+    return remove_dead_code(code_list)
@@ -9,31 +9,125 @@ Date: February 26, 2026
 
 from tokenizer import Tokenizer
 from parser import Parser
-from allocator import build_interfere_graph
-from generate import generate_assembly
+from allocator import build_interfere_graph, allocate_with_spills, split_self_divisions
+from ir_optimiser import optimise as optimise_ir
+from generate import generate_assembly, write_assembly
+from peephole import optimise as optimise_asm
 import sys
 import os
+import threading
+from contextlib import nullcontext
 
-def gen_output(code_list, color, num_registers, infile_name):
+# asm_binary and ir_binary are only imported when a binary format is in
+# use, so plain text runs do not pay for loading them (see
+# benchmarks/bench_startup.py). The magic is ir_binary.MAGIC, copied here
+# so the input file can be sniffed without importing ir_binary.
+_IR_BINARY_MAGIC = b"RIR0"
+
+_OPTIONS = {
+    "--stream": "write the assembly while generating it, skipping the "
+                "peephole optimiser (constant memory on huge inputs)",
+    "--binary": "write the binary listing format (.sb, see asm_binary.py) "
+                "instead of the text .s file",
+    "--all-errors": "on invalid input, report every tokenizer, parser and "
+                    "semantic error in the file instead of only the first",
+    "--parallel-parse": "tokenize and parse the input in newline-aligned chunks "
+                        "in parallel worker processes (see parallel_parse.py)",
+    "--portfolio": "when the graph needs the exact colouring search, race "
+                   "several differently ordered searches in parallel worker "
+                   "processes (see portfolio.py)",
+    "--memory": "trace allocations and report the peak and retained bytes of "
+                "each phase with its top allocation sites (see memory_profile.py)",
+    "--min-cycles": "search (with a budget) for the valid colouring whose code "
+                    "has the fewest estimated cycles, and report its cost "
+                    "(see cost_search.py)",
+    "--min-instructions": "as --min-cycles, but minimise the instruction count",
+}
+
+_OUT_BUFFER_SIZE = 1 << 16
+
+# Set by main() under --memory; see _phase.
+_PROFILER = None
+
+
+def _phase(name: str):
+    """Return a context manager that records the named phase's memory use
+    under --memory, and does nothing otherwise."""
+    return _PROFILER.phase(name) if _PROFILER is not None else nullcontext()
+
+
+def _write_replacing(path: str, write, binary: bool = False):
+    """
+    Writes an output file through a temporary file next to it, which
+    replaces path only once write has finished. If generation fails part
+    way (e.g. while streaming), no truncated file is left behind with a
+    fresh modification time, and an older output is kept as it was.
+    Args:
+        path: The output file path.
+        write: Called with the open temporary file; does the writing.
+        binary: If True, the file is opened in binary mode.
+    Returns:
+        The value returned by write.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if binary:
+            with open(tmp_path, "wb") as out_file:
+                result = write(out_file)
+        else:
+            with open(tmp_path, "w", buffering=_OUT_BUFFER_SIZE) as out_file:
+                result = write(out_file)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return result
+
+
+def gen_output(code_list, color, num_registers, infile_name, stream=False, binary=False):
     """
-    Generates assembly code from the IR list and writes it to an
-    output file.
+    Generates assembly code from the IR list, runs the peephole
+    optimiser over it and writes it to an output file.
     Args:
         code_list: A ThreeAdrInstList containing the parsed
             intermediate representation.
         color: A dictionary mapping variable names to assigned
             register numbers.
         num_registers: The number of available CPU registers.
+        infile_name: The input file path; the output is written next
+            to it with a .s extension.
+        stream: If True, each instruction is written as soon as it is
+            generated instead of building the whole listing first. The
+            peephole optimiser needs the whole listing, so it is skipped.
+        binary: If True, the listing is written in the binary format
+            to a .sb file instead. Cannot be combined with stream.
     Returns:
         None
     """
     try:
-        asm = generate_assembly(code_list, color, num_registers)
-        print("Assembly code generated successfully.")
-
-        out_file_path = os.path.splitext(infile_name)[0] + ".s"
-        with open(out_file_path, "w") as out_file:
-            out_file.write(str(asm))
+        out_file_path = os.path.splitext(infile_name)[0] + (".sb" if binary else ".s")
+        if stream:
+            with _phase("generate"):
+                count = _write_replacing(out_file_path, lambda out_file: write_assembly(
+                    code_list, color, num_registers, out_file))
+            print(f"Assembly code streamed ({count} instructions, peephole skipped).")
+        else:
+            with _phase("generate"):
+                asm = generate_assembly(code_list, color, num_registers)
+            print("Assembly code generated successfully.")
+            if asm.spill_count:
+                print(f"Spill code added {asm.spill_count} store(s) to spill slots.")
+            with _phase("peephole"):
+                removed = optimise_asm(asm)
+            print(f"Peephole optimiser removed {removed} instruction(s).")
+            with _phase("write"):
+                if binary:
+                    from asm_binary import write_binary
+                    _write_replacing(out_file_path, lambda out_file: write_binary(asm, out_file),
+                                     binary=True)
+                else:
+                    _write_replacing(out_file_path, asm.write)
         print(f"Assembly code written to '{out_file_path}' successfully.")
     except Exception as e:
         print(f"Error during assembly generation: {e}", file=sys.stderr)
@@ -41,11 +135,28 @@ def gen_output(code_list, color, num_registers, infile_name):
 
 
 def _validate_args(args) -> tuple:
-    """Return (num_regs_str, filename) or exit with usage message."""
-    if len(args) != 3:
+    """Return (num_regs_str, filename, options) or exit with usage message.
+    Options are the arguments starting with '--'; see _OPTIONS."""
+    options = {arg for arg in args[1:] if arg.startswith("--")}
+    positional = [arg for arg in args[1:] if not arg.startswith("--")]
+    if len(positional) != 2:
         print("Error: Incorrect number of arguments.", file=sys.stderr)
         sys.exit(1)
-    return args[1], args[2]
+    unknown = options - _OPTIONS.keys()
+    if unknown:
+        print(f"Error: Unknown option(s): {', '.join(sorted(unknown))}. "
+              f"Valid options: {', '.join(_OPTIONS)}", file=sys.stderr)
+        sys.exit(1)
+    if {"--stream", "--binary"} <= options:
+        print("Error: --stream and --binary cannot be combined.", file=sys.stderr)
+        sys.exit(1)
+    if {"--parallel-parse", "--all-errors"} <= options:
+        print("Error: --parallel-parse and --all-errors cannot be combined.", file=sys.stderr)
+        sys.exit(1)
+    if {"--min-cycles", "--min-instructions"} <= options:
+        print("Error: --min-cycles and --min-instructions cannot be combined.", file=sys.stderr)
+        sys.exit(1)
+    return positional[0], positional[1], options
 
 
 def _parse_num_registers(s: str) -> int:
@@ -70,65 +181,193 @@ def _validate_input_file(path: str) -> None:
         sys.exit(1)
 
 
-def _tokenize_and_parse(filename: str):
+def _tokenize_and_parse(filename: str, all_errors: bool = False, parallel: bool = False):
     """
-    Run tokenizer and parser on filename; exit on any error.
+    Run tokenizer and parser on filename, then optimise the parsed IR;
+    exit on any error. Binary IR files (see ir_binary.py) are loaded
+    directly instead.
     Args:
         filename: Path to the input file to tokenize and parse.
+        all_errors: If True, keep going after an error and report every
+            error in the file before exiting.
+        parallel: If True, tokenize and parse in parallel chunks.
     Returns:
         ThreeAdrInstList: The parsed instruction list.
     """
+    if _is_binary_ir(filename):
+        return _load_binary_ir(filename)
+    if parallel:
+        return _parse_in_parallel(filename)
     try:
-        tokenizer = Tokenizer(filename)
-        tokenizer.tokenize()
+        with _phase("read"):
+            tokenizer = Tokenizer(filename)
+        with _phase("tokenize"):
+            tokenizer.tokenize(keep_invalid=all_errors)
         print("Input tokenized successfully.")
         print(tokenizer)
     except Exception as e:
         print(f"Error during tokenization: {e}", file=sys.stderr)
         sys.exit(1)
     try:
-        parser = Parser(tokenizer.tokens)
-        parser.parse()
+        with _phase("parse"):
+            parser = Parser(tokenizer.tokens, tokenizer.position)
+            if all_errors:
+                _parse_reporting_all_errors(parser)
+            else:
+                parser.parse()
         print("Tokens parsed successfully.")
         print(parser.code_list)
     except Exception as e:
         print(f"Error during parser: {e}", file=sys.stderr)
         sys.exit(1)
+    with _phase("optimise_ir"):
+        removed = optimise_ir(parser.code_list)
+    print(f"IR optimiser removed {removed} instruction(s).")
+    print(parser.code_list)
     return parser.code_list
 
 
-def _build_and_allocate(code_list, num_registers: int) -> dict:
+def _parse_in_parallel(filename: str):
     """
-    Build interference graph and run register allocator; exit if no
-    valid colouring exists.
+    Tokenize and parse filename in parallel chunks, then optimise the
+    parsed IR; exit on any error. The token list is never built in one
+    piece, so it is not printed.
+    Args:
+        filename: Path to the input file.
+    Returns:
+        ThreeAdrInstList: The parsed instruction list.
+    """
+    import parallel_parse
+    try:
+        with _phase("parse"):
+            code_list = parallel_parse.parse_file(filename)
+    except TypeError as e:
+        print(f"Error during tokenization: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error during parser: {e}", file=sys.stderr)
+        sys.exit(1)
+    print("Input tokenized and parsed in parallel chunks.")
+    print(code_list)
+    with _phase("optimise_ir"):
+        removed = optimise_ir(code_list)
+    print(f"IR optimiser removed {removed} instruction(s).")
+    print(code_list)
+    return code_list
+
+
+def _parse_reporting_all_errors(parser) -> None:
+    """Parse in recovery mode; if anything was wrong, print every
+    diagnostic and exit."""
+    _, diagnostics = parser.parse_recovering()
+    if not diagnostics:
+        return
+    for error in diagnostics:
+        print(f"Error during parser: {error}", file=sys.stderr)
+    print(f"Found {len(diagnostics)} error(s).", file=sys.stderr)
+    sys.exit(1)
+
+
+def _is_binary_ir(filename: str) -> bool:
+    """Return True if filename starts with the binary IR magic; exit if it
+    cannot be read."""
+    try:
+        with open(filename, "rb") as f:
+            return f.read(len(_IR_BINARY_MAGIC)) == _IR_BINARY_MAGIC
+    except OSError as e:
+        print(f"Error during tokenization: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _load_binary_ir(filename: str):
+    """
+    Load a binary IR file, skipping tokenization and parsing, then
+    optimise it; exit on any error.
+    Args:
+        filename: Path to the binary IR file.
+    Returns:
+        ThreeAdrInstList: The loaded instruction list.
+    """
+    import ir_binary
+    try:
+        with _phase("load"):
+            code_list = ir_binary.load(filename)
+        print("Binary IR loaded successfully.")
+    except Exception as e:
+        print(f"Error loading binary IR: {e}", file=sys.stderr)
+        sys.exit(1)
+    with _phase("optimise_ir"):
+        removed = optimise_ir(code_list)
+    print(f"IR optimiser removed {removed} instruction(s).")
+    print(code_list)
+    return code_list
+
+
+def _build_and_allocate(code_list, num_registers: int, portfolio: bool = False,
+                        min_cost: str = None) -> dict:
+    """
+    Build interference graph and run register allocator, spilling
+    variables to memory if no valid colouring exists; exit if even
+    spilling cannot help (fewer than two registers).
     Args:
         code_list: A ThreeAdrInstList to allocate registers for.
         num_registers: The number of available CPU registers.
+        portfolio: If True, the exact search runs as a parallel portfolio.
+        min_cost: 'cycles' or 'instructions' to replace the colouring
+            with the cheapest one cost_search finds under that metric, or
+            None to keep the allocator's.
     Returns:
         dict: A mapping of variable names to assigned register numbers.
+            Spilled variables are absent from the mapping.
     """
     try:
-        graph = build_interfere_graph(code_list)
+        with _phase("graph"):
+            split_self_divisions(code_list)
+            graph = build_interfere_graph(code_list)
         print("Interference graph built successfully.")
         print(graph)
     except Exception as e:
         print(f"Error during interference graph construction: {e}", file=sys.stderr)
         sys.exit(1)
 
-    vars = list(graph.graph.keys())
-    succ = graph.allocate_registers(num_registers, vars)
-    if succ:
-        print(f"Success! Nodes have been allocated to {num_registers} registers")
-        print("\nRegister Coloring Table:")
-        for var, reg in graph.color.items():
-            print(f"  {var} -> R{reg}")
-    else:
-        print(f"Failure: Unable to color (allocate) nodes to {num_registers} registers.",
+    search = None
+    if portfolio:
+        from portfolio import portfolio_search
+        search = portfolio_search
+    try:
+        with _phase("allocate"):
+            spilled = allocate_with_spills(graph, num_registers, search)
+    except ValueError as e:
+        print(f"Failure: Unable to color (allocate) nodes to {num_registers} registers. {e}",
               file=sys.stderr)
         sys.exit(1)
+    print(f"Success! Nodes have been allocated to {num_registers} registers")
+    if spilled:
+        print(f"Spilled to memory (R{num_registers - 1} reserved as scratch): "
+              f"{', '.join(spilled)}")
+    if min_cost:
+        _choose_cheapest(code_list, graph, num_registers, min_cost)
+    print("\nRegister Coloring Table:")
+    for var, reg in graph.color.items():
+        print(f"  {var} -> R{reg}")
     return graph.color
 
 
+def _choose_cheapest(code_list, graph, num_registers: int, metric: str) -> None:
+    """Replace graph.color with the cheapest colouring cost_search finds
+    under metric and report its cost; exit if the search fails."""
+    from cost_search import cheapest_colouring
+    try:
+        with _phase("cost_search"):
+            result = cheapest_colouring(code_list, graph, num_registers, metric)
+    except ValueError as e:
+        print(f"Error during cost search: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Estimated cost ({metric}): {result.cost}, down from {result.initial_cost} "
+          f"after {result.search_nodes} search node(s)"
+          f"{'' if result.optimal else ' (budget reached, may not be optimal)'}")
+
+
 def main():
     """
     Main entry point. Validates command-line arguments, then
@@ -138,12 +377,26 @@ def main():
     Returns:
         None
     """
-    num_registers_str, infile_name = _validate_args(sys.argv)
+    global _PROFILER
+    num_registers_str, infile_name, options = _validate_args(sys.argv)
     num_registers = _parse_num_registers(num_registers_str)
     _validate_input_file(infile_name)
-    code_list = _tokenize_and_parse(infile_name)
-    color = _build_and_allocate(code_list, num_registers)
-    gen_output(code_list, color, num_registers, infile_name)
+    if "--memory" in options:
+        from memory_profile import MemoryProfiler
+        _PROFILER = MemoryProfiler()
+        _PROFILER.start()
+    code_list = _tokenize_and_parse(infile_name, all_errors="--all-errors" in options,
+                                    parallel="--parallel-parse" in options)
+    min_cost = "cycles" if "--min-cycles" in options else \
+        "instructions" if "--min-instructions" in options else None
+    color = _build_and_allocate(code_list, num_registers, portfolio="--portfolio" in options,
+                                min_cost=min_cost)
+    gen_output(code_list, color, num_registers, infile_name,
+               stream="--stream" in options, binary="--binary" in options)
+    if _PROFILER is not None:
+        _PROFILER.stop()
+        print("\nMemory by phase:")
+        print(_PROFILER.report())
 
 
 if __name__ == "__main__":
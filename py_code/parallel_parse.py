@@ -0,0 +1,223 @@
+"""
+Summary: Parallel tokenizing and parsing of very large input files. Every
+    line of the input syntax is an independent statement, so the file is
+    split at newline boundaries into chunks that worker processes read,
+    tokenize and parse on their own. The instructions of the chunks are
+    concatenated in order. The live:, pin: and avoid: lines are only
+    checked afterwards, against the variables used by every instruction
+    before them in the whole file, exactly as the sequential Parser
+    checks them.
+
+    Errors are reported as the sequential tokenizer and parser report
+    them: a TypeError for the first invalid token in the file (tokenizing
+    finishes before parsing starts), otherwise a ParseError for the first
+    error in the file, with line numbers counted from the start of the
+    file.
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import pipeline
+from interm_rep import ThreeAdrInst, ThreeAdrInstList
+from parser import Parser, ParseError
+from tokenizer import Tokenizer, TokenType
+
+CHUNKS_PER_WORKER = 4   # more chunks than workers evens out uneven chunks
+
+
+class _ChunkResult(NamedTuple):
+    instructions: list      # (dest, src1, op, src2) per instruction
+    used: set               # variables used by the chunk's instructions
+    live: list              # (instructions before it, vars, (line, column) per var,
+                            #  kind) per live, pin or avoid statement
+    pinned: dict            # the chunk's register constraints
+    forbidden: dict
+    lines: int              # newlines in the chunk
+    error: tuple            # (kind, message, line, column) or None
+
+
+def chunk_ranges(path: str, num_chunks: int) -> list:
+    """
+    Splits a file into byte ranges that each end just after a newline
+    (the last one ends at the end of the file).
+    Args:
+        path: The input file.
+        num_chunks: The number of ranges wanted; fewer are returned for
+            files with fewer lines.
+    Returns:
+        list: (start, end) byte offsets, in file order.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, "rb") as f:
+        for i in range(1, num_chunks):
+            target = max(start, size * i // num_chunks)
+            f.seek(target)
+            f.readline()                # move to the start of the next line
+            end = f.tell()
+            if end >= size:
+                break
+            if end > start:
+                ranges.append((start, end))
+                start = end
+    ranges.append((start, size))
+    return ranges
+
+
+class _ChunkParser(Parser):
+    """A Parser that records each live:, pin: and avoid: statement instead
+    of checking it, since a chunk cannot see the variables used in
+    earlier chunks."""
+
+    def __init__(self, tokens, positions):
+        super().__init__(tokens, positions)
+        self.live_statements = []
+
+    def semantic_check(self, live_vars, token_indices=None, kind="Live"):
+        self.live_statements.append((len(self.code_list.instructions), list(live_vars),
+                                     [self.positions(i) for i in token_indices], kind))
+        return live_vars
+
+
+def _used_vars(instructions) -> set:
+    """Return the variables used by (dest, src1, op, src2) tuples."""
+    used = set()
+    for dest, src1, _, src2 in instructions:
+        used.add(dest)
+        if not src1.isdigit():
+            used.add(src1)
+        if src2 and not src2.isdigit():
+            used.add(src2)
+    return used
+
+
+def _parse_chunk(path: str, start: int, end: int) -> _ChunkResult:
+    """
+    Reads, tokenizes and parses one chunk; runs in a worker process.
+    Errors are returned rather than raised, with chunk-relative lines.
+    Args:
+        path: The input file.
+        start: The chunk's first byte offset.
+        end: The offset just past the chunk.
+    Returns:
+        _ChunkResult: The chunk's instructions, used variables, live
+            statements, newline count and first error.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode().replace("\r\n", "\n").replace("\r", "\n")
+    lines = text.count("\n")
+    tokenizer = Tokenizer.from_text(text)
+    tokenizer.tokenize(keep_invalid=True)
+    tokens = tokenizer.tokens
+    invalid = next((i for i, token in enumerate(tokens) if token.type == TokenType.INV), None)
+    if invalid is not None:
+        error = ("token", f"Invalid token: {tokens[invalid].value}",
+                 *tokenizer.position(invalid))
+        return _ChunkResult([], set(), [], {}, {}, lines, error)
+
+    parser = _ChunkParser(tokens, tokenizer.position)
+    error = None
+    try:
+        parser.parse()
+    except ParseError as e:
+        error = ("parse", e.message, e.line, e.column)
+    # On an error, what parsed before it is kept: a live: statement
+    # earlier in the chunk must still be checked first.
+    instructions = [(inst.dest, inst.src1, inst.op, inst.src2)
+                    for inst in parser.code_list.instructions]
+    code_list = parser.code_list
+    return _ChunkResult(instructions, _used_vars(instructions), parser.live_statements,
+                        code_list.pinned, code_list.forbidden, lines, error)
+
+
+def _raise_token_error(results, first_lines) -> None:
+    """Raise the first invalid-token error in the file, if any; the
+    sequential tokenizer reports it before any parse error."""
+    for result, first_line in zip(results, first_lines):
+        if result.error is not None and result.error[0] == "token":
+            _, message, line, column = result.error
+            raise TypeError(f"Line {line + first_line}, column {column}: {message}")
+
+
+def merge_chunks(results) -> ThreeAdrInstList:
+    """
+    Concatenates the parsed chunks and checks every live:, pin: and
+    avoid: statement against the variables used before it in the whole
+    file.
+    Args:
+        results: The _ChunkResults in file order.
+    Returns:
+        ThreeAdrInstList: The instructions of every chunk, with the live
+            variables of the last live: statement and the register
+            constraints of every chunk.
+    Raises:
+        TypeError: If a chunk contains an invalid token.
+        ParseError: If a chunk has a syntax error, or a live, pinned or
+            constrained variable is not used before its statement.
+    """
+    first_lines = []
+    line = 0
+    for result in results:
+        first_lines.append(line)
+        line += result.lines
+    _raise_token_error(results, first_lines)
+
+    code_list = ThreeAdrInstList()
+    used_before = set()
+    for result, first_line in zip(results, first_lines):
+        for count, live_vars, positions, kind in result.live:
+            used = used_before | _used_vars(result.instructions[:count])
+            for var, (var_line, column) in zip(live_vars, positions):
+                if var not in used:
+                    raise ParseError(f"Semantic error: {kind} variable '{var}' is not "
+                                     f"used in the code.", var_line + first_line, column)
+            if kind == "Live":
+                code_list.set_live_on_exit(live_vars)
+        if result.error is not None:
+            _, message, line, column = result.error
+            raise ParseError(message, line + first_line, column)
+        used_before |= result.used
+        code_list.pinned.update(result.pinned)
+        for var, registers in result.forbidden.items():
+            code_list.forbid_registers(var, registers)
+        code_list.instructions.extend(ThreeAdrInst(*inst) for inst in result.instructions)
+    return code_list
+
+
+def parse_file(path: str, workers: int = None, num_chunks: int = None,
+               executor=None) -> ThreeAdrInstList:
+    """
+    Tokenizes and parses a file in parallel chunks.
+    Args:
+        path: The input file, in the text syntax.
+        workers: The number of worker processes when the pool is created
+            here; defaults to the CPU count.
+        num_chunks: The number of chunks; defaults to CHUNKS_PER_WORKER
+            per worker.
+        executor: Optional executor to run the chunks on. If None, a
+            ProcessPoolExecutor is created and shut down afterwards.
+    Returns:
+        ThreeAdrInstList: The same instruction list the sequential
+            Tokenizer and Parser produce.
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        TypeError: If the input contains an invalid token.
+        ParseError: If the input is not a valid block.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = chunk_ranges(path, num_chunks or workers * CHUNKS_PER_WORKER)
+    pool = executor or ProcessPoolExecutor(workers, mp_context=pipeline.worker_context())
+    try:
+        futures = [pool.submit(_parse_chunk, path, start, end) for start, end in ranges]
+        results = [future.result() for future in futures]
+    finally:
+        if executor is None:
+            pool.shutdown()
+    return merge_chunks(results)
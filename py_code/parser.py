@@ -1,25 +1,78 @@
 """
 Summary: The Parser. Translates tokens into three-address instructions.
+    parse stops at the first error; parse_recovering skips broken lines
+    and collects every error instead. Besides instructions and the live
+    statement, 'pin:' and 'avoid:' lines constrain the registers a
+    variable may be allocated:
+        pin: a R0, b R2         a must get R0 and b must get R2
+        avoid: c R0 R1, d R3    c must not get R0 or R1, d not R3
 
 Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
 Date: March 27, 2026
 """
 
-from typing import List, Optional, Tuple
+from __future__ import annotations
+
 from interm_rep import ThreeAdrInst, ThreeAdrInstList
 from tokenizer import TokenType, Token
 
 
+class ParseError(ValueError):
+    """
+    A syntax or semantic error in the input. When the parser knows token
+    positions, the message starts with the line and column of the
+    offending token, which are also kept as attributes.
+    """
+
+    def __init__(self, message: str, line: int = None, column: int = None):
+        """
+        Initializes the error.
+        Args:
+            message: The description of the error.
+            line: The 1-based line of the offending token, if known.
+            column: The 1-based column of the offending token, if known.
+        """
+        self.message = message
+        self.line = line
+        self.column = column
+        if line is not None:
+            message = f"Line {line}, column {column}: {message}"
+        super().__init__(message)
+
+
 class Parser:
-    def __init__(self, tokens: List[Token]):
+    def __init__(self, tokens: list[Token], positions=None):
         """
         Initializes the Parser with a list of tokens.
         Args:
             tokens: A list of Token objects produced by the Tokenizer.
+            positions: Optional function mapping a token index to its
+                (line, column), such as Tokenizer.position. It is only
+                called when an error is reported.
         """
         self.tokens = tokens
         self.pos = 0
         self.code_list = ThreeAdrInstList()
+        self.positions = positions
+        self.diagnostics = None     # list of ParseError while recovering
+
+    def error(self, message: str, index: int = None) -> ParseError:
+        """
+        Builds a ParseError located at a token.
+        Args:
+            message: The description of the error.
+            index: The index of the offending token; defaults to the
+                current position (the end of input if all tokens were
+                consumed).
+        Returns:
+            ParseError: The error, with a position if one is available.
+        """
+        index = self.pos if index is None else index
+        if index < len(self.tokens) and self.tokens[index].type == TokenType.INV:
+            message = f"Invalid token: {self.tokens[index].value}"
+        if self.positions is None:
+            return ParseError(message)
+        return ParseError(message, *self.positions(index))
 
     def get_next_token(self, expected_type=None):
         """
@@ -27,24 +80,24 @@ class Parser:
         optionally validating its type.
         Args:
             expected_type: The expected TokenType. If provided and the
-                current token does not match, a ValueError is raised.  
+                current token does not match, a ParseError is raised.  
         Returns:
             Token: The consumed token, or None if at end of input and
                 no expected_type was specified.
         Raises:
-            ValueError: If the current token type does not match
+            ParseError: If the current token type does not match
                 expected_type, or if the end of input is reached when
                 a specific type was expected.
         """
         if self.pos >= len(self.tokens):
             if expected_type:
-                raise ValueError(f"Unexpected end of file. Expected {expected_type}")
+                raise self.error(f"Unexpected end of file. Expected {expected_type}")
             return None
         
         token = self.tokens[self.pos]
 
         if expected_type is not None and token.type != expected_type:
-            raise ValueError(f"Expected {expected_type}, got {token.type}")
+            raise self.error(f"Expected {expected_type}, got {token.type}")
         self.pos += 1
         return token
 
@@ -66,23 +119,67 @@ class Parser:
             ThreeAdrInstList: The populated instruction list including
                 live-on-exit variable information.
         Raises:
-            ValueError: If an unexpected token is encountered.
+            ParseError: If an unexpected token is encountered.
         """
         while self.pos < len(self.tokens):
-            token = self.peek_current_token()
-            if token.type == TokenType.VAR:
-                self.handle_math_instruction()
+            self._parse_statement()
+        return self.code_list
 
-            elif token.type == TokenType.LIV:
-                self.handle_live_statement()
+    def parse_recovering(self) -> tuple:
+        """
+        Parses the full token list like parse, but instead of stopping
+        at the first error it records it, skips the rest of the broken
+        line and carries on with the next one, so one pass finds every
+        error. INV tokens (see Tokenizer.tokenize) are reported as
+        invalid tokens.
+        Returns:
+            tuple: (code_list, diagnostics) where code_list is the
+                ThreeAdrInstList of every line that parsed and
+                diagnostics is the list of ParseError found, in order.
+        """
+        self.diagnostics = []
+        while self.pos < len(self.tokens):
+            start = self.pos
+            try:
+                self._parse_statement()
+            except ParseError as e:
+                self.diagnostics.append(e)
+                self._synchronise(start)
+        return self.code_list, self.diagnostics
 
-            elif token.type == TokenType.NL:
-                self.get_next_token() # Skip empty lines
+    def _synchronise(self, start: int) -> None:
+        """Move past the first newline at or after token index start, the
+        end of the line on which a statement failed."""
+        pos = start
+        while pos < len(self.tokens) and self.tokens[pos].type != TokenType.NL:
+            pos += 1
+        self.pos = pos + 1
 
-            else:
-                raise ValueError(f"Unexpected token at start of line: {token}")
+    def _parse_statement(self) -> None:
+        """
+        Parses one line: an instruction, the live statement, a pin or
+        avoid statement or an empty line.
+        Returns:
+            None
+        Raises:
+            ParseError: If the line does not start with a valid token,
+                or the statement is malformed.
+        """
+        token = self.peek_current_token()
+        if token.type == TokenType.VAR:
+            self.handle_math_instruction()
 
-        return self.code_list
+        elif token.type == TokenType.LIV:
+            self.handle_live_statement()
+
+        elif token.type in (TokenType.PIN, TokenType.AVD):
+            self.handle_constraint_statement()
+
+        elif token.type == TokenType.NL:
+            self.get_next_token() # Skip empty lines
+
+        else:
+            raise self.error(f"Unexpected token at start of line: {token}")
 
     def handle_math_instruction(self):
         """
@@ -104,7 +201,7 @@ class Parser:
 
         self.code_list.add_instruct(ThreeAdrInst(dest, src1, op, src2))
 
-    def _parse_first_operand(self) -> Tuple[Optional[str], str]:
+    def _parse_first_operand(self) -> tuple[str | None, str]:
         """
         Parses the first operand on the right-hand side of an
         assignment, handling optional unary negation.
@@ -113,7 +210,8 @@ class Parser:
                 a unary minus was found (None otherwise) and src1 is
                 the operand value as a string.
         Raises:
-            ValueError: If the token is not a variable or literal.
+            ParseError: If the token is not a variable or literal, or
+                the input ends first.
         """
         unary_op = None
         current = self.peek_current_token()
@@ -123,12 +221,15 @@ class Parser:
             unary_op = self.get_next_token().value
 
         src1_token = self.get_next_token()
+        if src1_token is None:
+            raise self.error("Unexpected end of file. Expected variable or number")
         if src1_token.type not in (TokenType.VAR, TokenType.LIT):
-            raise ValueError(f"Expected variable or number, got {src1_token.type}")
+            raise self.error(f"Expected variable or number, got {src1_token.type}",
+                             self.pos - 1)
 
         return unary_op, src1_token.value
 
-    def _consume_binary_operand(self) -> Tuple[str, str]:
+    def _consume_binary_operand(self) -> tuple[str, str]:
         """
         Consumes a binary operator token followed by a variable or literal
         operand from the token stream.
@@ -136,16 +237,17 @@ class Parser:
             tuple: A pair (operator, src2) representing the consumed
                 operator string and second operand value.
         Raises:
-            ValueError: If the token after the operator is not a variable
+            ParseError: If the token after the operator is not a variable
                 or literal.
         """
         operator = self.get_next_token().value
         src2_token = self.get_next_token()
-        if src2_token.type not in (TokenType.VAR, TokenType.LIT):
-            raise ValueError("Expected second operand after operator")
+        if src2_token is None or src2_token.type not in (TokenType.VAR, TokenType.LIT):
+            raise self.error("Expected second operand after operator",
+                             self.pos - (src2_token is not None))
         return operator, src2_token.value
 
-    def _parse_second_operand(self, existing_op) -> Tuple[Optional[str], Optional[str]]:
+    def _parse_second_operand(self, existing_op) -> tuple[str | None, str | None]:
         """
         Parses the optional binary operator and second operand
         (e.g., + c). If a unary operator was already found, returns
@@ -158,7 +260,7 @@ class Parser:
                 operation string and src2 is the second operand value,
                 or (None, None) for simple assignments.
         Raises:
-            ValueError: If an operator is found but not followed by
+            ParseError: If an operator is found but not followed by
                 a valid operand.
         """
         # Unary instructions (x = -y) cannot have a second binary operator
@@ -176,11 +278,12 @@ class Parser:
         Returns:
             None
         Raises:
-            ValueError: If a listed variable was never used in the
+            ParseError: If a listed variable was never used in the
                 preceding code.
         """
         self.get_next_token(TokenType.LIV)
         self.get_next_token(TokenType.COL)
+        first = self.pos
         live_vars = self._collect_variable_list()
 
         # Handle trailing newline
@@ -188,10 +291,59 @@ class Parser:
             self.get_next_token()
 
         # Check live variables are valid (must be variables, not literals or operators)
-        self.semantic_check(live_vars)
+        live_vars = self.semantic_check(live_vars, range(first, self.pos, 2))
 
         self.code_list.set_live_on_exit(live_vars)
 
+    def handle_constraint_statement(self):
+        """
+        Parses a 'pin:' line, where each variable is followed by the one
+        register it must be allocated, or an 'avoid:' line, where each
+        variable is followed by the registers it must not be allocated.
+        The constraints are recorded on the code list after the same
+        semantic check as the live statement.
+        Returns:
+            None
+        Raises:
+            ParseError: If the line is malformed, a pinned variable is
+                given more than one register, or a listed variable was
+                never used in the preceding code.
+        """
+        pin = self.get_next_token().type == TokenType.PIN
+        self.get_next_token(TokenType.COL)
+        entries, indices = [], []
+        while True:
+            indices.append(self.pos)
+            var = self.get_next_token(TokenType.VAR).value
+            registers = [self._parse_register()]
+            while self.peek_current_token() and self.peek_current_token().type == TokenType.REG:
+                if pin:
+                    raise self.error("A pinned variable takes exactly one register")
+                registers.append(self._parse_register())
+            entries.append((var, registers))
+            if not (self.peek_current_token() and self.peek_current_token().type == TokenType.COM):
+                break
+            self.get_next_token()
+
+        # Handle trailing newline
+        if self.peek_current_token() and self.peek_current_token().type == TokenType.NL:
+            self.get_next_token()
+
+        valid = set(self.semantic_check([var for var, _ in entries], indices,
+                                        "Pinned" if pin else "Constrained"))
+        for var, registers in entries:
+            if var not in valid:
+                continue
+            if pin:
+                self.code_list.pin_register(var, registers[0])
+            else:
+                self.code_list.forbid_registers(var, registers)
+
+    def _parse_register(self) -> int:
+        """Consume a register token such as 'R2' and return its number
+        (the tokenizer only makes REG tokens from 'R' and ASCII digits)."""
+        return int(self.get_next_token(TokenType.REG).value[1:])
+
     def _collect_used_vars(self) -> set:
         """Return the set of all variable names used in the instruction list."""
         used = set()
@@ -204,24 +356,39 @@ class Parser:
                 used.add(inst.src2)
         return used
 
-    def semantic_check(self, live_vars):
+    def semantic_check(self, live_vars, token_indices=None, kind="Live"):
         """
-        Validates that every variable declared live on exit actually
-        appears in the instruction list.
+        Validates that every variable declared live on exit (or named by
+        a pin or avoid statement) actually appears in the instruction
+        list.
         Args:
             live_vars: A list of variable name strings declared as
                 live on exit.
+            token_indices: Optional token index of each variable in
+                live_vars, used to locate the error.
+            kind: How the variables are described in the error message
+                ('Live', 'Pinned' or 'Constrained').
         Returns:
-            None
+            list: The variables that passed. While recovering (see
+                parse_recovering), each failing variable is recorded as
+                a diagnostic and left out instead of raising.
         Raises:
-            ValueError: If any variable in live_vars is not used in
-                the code.
+            ParseError: If any variable in live_vars is not used in
+                the code, when not recovering.
         """
         used_vars = self._collect_used_vars()
-        for var in live_vars:
-            if var not in used_vars:
-                raise ValueError(
-                    f"Semantic error: Live variable '{var}' is not used in the code.")
+        valid = []
+        for i, var in enumerate(live_vars):
+            if var in used_vars:
+                valid.append(var)
+                continue
+            message = f"Semantic error: {kind} variable '{var}' is not used in the code."
+            error = ParseError(message) if token_indices is None \
+                else self.error(message, token_indices[i])
+            if self.diagnostics is None:
+                raise error
+            self.diagnostics.append(error)
+        return valid
 
     def _parse_additional_vars(self, variables: list) -> None:
         """Consume comma-separated VAR tokens and append them to variables."""
@@ -233,7 +400,7 @@ class Parser:
             else:
                 break
 
-    def _collect_variable_list(self) -> List[str]:
+    def _collect_variable_list(self) -> list[str]:
         """
         Parses a comma-separated list of variable names from the
         token stream.
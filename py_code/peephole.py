@@ -0,0 +1,95 @@
+"""
+Summary: Peephole and dead-code optimiser for generated assembly. Works on
+    an AsmInstList after generate_assembly and removes instructions that
+    cannot change the result of the block.
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+from target import AsmInstList, AsmInst, AsmOperator, AsmOperandMode
+
+
+def _location(operand):
+    """
+    Returns a hashable key for the storage an operand refers to.
+    Args:
+        operand: An AsmOperand, or None.
+    Returns:
+        tuple: ("reg", number) for a register, ("mem", name) for a memory
+            variable, or None for immediates and missing operands.
+    """
+    if operand is None or operand.mode == AsmOperandMode.IMM:
+        return None
+    if operand.mode == AsmOperandMode.RGD:
+        return ("reg", operand.val.reg_num)
+    return ("mem", operand.val.var_name)
+
+
+def is_self_move(inst: AsmInst) -> bool:
+    """
+    Checks whether an instruction moves a location onto itself.
+    Args:
+        inst: The AsmInst to check.
+    Returns:
+        bool: True for 'MOV Ri, Ri' (or the same memory variable twice).
+    """
+    return (inst.op == AsmOperator.MVR
+            and _location(inst.src) is not None
+            and _location(inst.src) == _location(inst.dest))
+
+
+def remove_self_moves(asm_list: AsmInstList) -> int:
+    """
+    Removes every self-move from the instruction list.
+    Args:
+        asm_list: The AsmInstList to optimise in place.
+    Returns:
+        int: The number of instructions removed.
+    """
+    before = len(asm_list.instructions)
+    asm_list.instructions = [inst for inst in asm_list.instructions
+                             if not is_self_move(inst)]
+    return before - len(asm_list.instructions)
+
+
+def remove_dead_code(asm_list: AsmInstList) -> int:
+    """
+    Removes instructions whose result is never read. Walks the list
+    backwards tracking which registers and memory variables are live;
+    only the memory locations of the live-on-exit variables are live at
+    the end of the block. A MOV kills its destination, while arithmetic
+    also reads it, so a dead arithmetic instruction takes the MOV that fed
+    it down with it on the same pass.
+    Args:
+        asm_list: The AsmInstList to optimise in place. Its live_on_exit
+            list must be set (generate_assembly does this).
+    Returns:
+        int: The number of instructions removed.
+    """
+    live = {("mem", var) for var in asm_list.live_on_exit}
+    kept = []
+    for inst in reversed(asm_list.instructions):
+        dest = _location(inst.dest)
+        if dest not in live:
+            continue
+        if inst.op == AsmOperator.MVR:
+            live.discard(dest)
+        src = _location(inst.src)
+        if src is not None:
+            live.add(src)
+        kept.append(inst)
+    removed = len(asm_list.instructions) - len(kept)
+    asm_list.instructions = kept[::-1]
+    return removed
+
+
+def optimise(asm_list: AsmInstList) -> int:
+    """
+    Runs every peephole pass over the instruction list.
+    Args:
+        asm_list: The AsmInstList to optimise in place.
+    Returns:
+        int: The total number of instructions removed.
+    """
+    return remove_self_moves(asm_list) + remove_dead_code(asm_list)
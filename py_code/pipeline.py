@@ -0,0 +1,181 @@
+"""
+Summary: The compile pipeline as a library call: tokenize, parse,
+    optimise, allocate and generate, returning the assembly and run
+    statistics instead of printing and exiting like main.py does. Used by
+    the allocator server.
+
+    Each process keeps a ColouringCache (SHAPE_CACHE), so a block whose
+    interference graph has the core shape of one allocated before in the
+    same process reuses that colouring instead of searching again.
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import multiprocessing
+import time
+from typing import NamedTuple
+
+from tokenizer import Tokenizer
+from parser import Parser
+from allocator import build_interfere_graph, split_self_divisions
+from shape_cache import ColouringCache
+from ir_optimiser import optimise as optimise_ir
+from generate import generate_assembly
+from peephole import optimise as optimise_asm
+import ir_binary
+
+SHAPE_CACHE = ColouringCache()
+
+
+class CompileResult(NamedTuple):
+    assembly: str       # the text listing, as written to a .s file
+    colour: dict        # variable name -> register number
+    spilled: list       # spilled variable names
+    stats: dict         # counts and per-phase timings
+
+
+def worker_context():
+    """
+    Returns the multiprocessing context for process pools that run the
+    pipeline. Pools start their workers lazily, after the parent may
+    have opened sockets and started threads; a plain fork would copy
+    those into every worker, so workers are forked from a clean
+    forkserver process instead where the platform has one.
+    Returns:
+        multiprocessing.context.BaseContext: The forkserver context, or
+            spawn where forkserver is unavailable.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def parse_text(text: str):
+    """
+    Tokenizes and parses source text.
+    Args:
+        text: The block in the input file syntax.
+    Returns:
+        ThreeAdrInstList: The parsed instruction list.
+    Raises:
+        TypeError: If the text contains an invalid token.
+        ValueError: If the tokens do not form a valid block.
+    """
+    tokenizer = Tokenizer.from_text(text)
+    tokenizer.tokenize()
+    return Parser(tokenizer.tokens, tokenizer.position).parse()
+
+
+def compile_code_list(code_list, num_registers: int, timings=None) -> CompileResult:
+    """
+    Runs everything after parsing on an instruction list: IR optimiser
+    (then split_self_divisions), interference graph, allocation with
+    spilling, code generation and peephole optimiser.
+    Args:
+        code_list: The ThreeAdrInstList to compile. It is optimised in
+            place.
+        num_registers: The number of available CPU registers.
+        timings: Optional dict of phase timings already measured (e.g.
+            parsing), extended with the phases run here.
+    Returns:
+        CompileResult: The assembly, colouring and statistics.
+    Raises:
+        ValueError: If the registers cannot hold the block even with
+            spilling, or code generation fails.
+    """
+    timings = dict(timings or {})
+    start = time.perf_counter()
+    ir_removed = optimise_ir(code_list)
+    split_self_divisions(code_list)
+    timings["optimise_ir"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph = build_interfere_graph(code_list)
+    timings["graph"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    spilled = SHAPE_CACHE.allocate(graph, num_registers)
+    timings["allocate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    asm = generate_assembly(code_list, graph.color, num_registers)
+    peephole_removed = optimise_asm(asm)
+    assembly = str(asm)
+    timings["generate"] = time.perf_counter() - start
+
+    stats = {
+        "ir_instructions": len(code_list.instructions),
+        "ir_removed": ir_removed,
+        "nodes": len(graph.graph),
+        "spilled": len(spilled),
+        "spill_stores": asm.spill_count,
+        "peephole_removed": peephole_removed,
+        "asm_instructions": len(asm.instructions),
+        "shape_cache": SHAPE_CACHE.stats(),
+        "seconds": timings,
+    }
+    return CompileResult(assembly, dict(graph.color), spilled, stats)
+
+
+def compile_text(text: str, num_registers: int) -> CompileResult:
+    """
+    Compiles source text in the input file syntax.
+    Args:
+        text: The block to compile.
+        num_registers: The number of available CPU registers.
+    Returns:
+        CompileResult: The assembly, colouring and statistics.
+    Raises:
+        TypeError: If the text contains an invalid token.
+        ValueError: If the block is invalid or cannot be allocated.
+    """
+    start = time.perf_counter()
+    code_list = parse_text(text)
+    return compile_code_list(code_list, num_registers,
+                             {"parse": time.perf_counter() - start})
+
+
+def compile_bytes(data: bytes, num_registers: int) -> CompileResult:
+    """
+    Compiles the raw contents of an input file, in either the text syntax
+    or the binary IR format.
+    Args:
+        data: The file contents.
+        num_registers: The number of available CPU registers.
+    Returns:
+        CompileResult: The assembly, colouring and statistics.
+    Raises:
+        TypeError: If the text contains an invalid token.
+        ValueError: If the block is invalid or cannot be allocated.
+    """
+    start = time.perf_counter()
+    if data[:len(ir_binary.MAGIC)] == ir_binary.MAGIC:
+        code_list = ir_binary.decode(data)
+    else:
+        code_list = parse_text(data.decode())
+    return compile_code_list(code_list, num_registers,
+                             {"parse": time.perf_counter() - start})
+
+
+def compile_file(path: str, num_registers: int) -> CompileResult:
+    """
+    Compiles an input file, in either the text syntax or the binary IR
+    format.
+    Args:
+        path: Path of the file to compile.
+        num_registers: The number of available CPU registers.
+    Returns:
+        CompileResult: The assembly, colouring and statistics.
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        TypeError: If the text contains an invalid token.
+        ValueError: If the block is invalid or cannot be allocated.
+    """
+    start = time.perf_counter()
+    if ir_binary.is_binary_ir(path):
+        code_list = ir_binary.load(path)
+    else:
+        with open(path) as f:
+            code_list = parse_text(f.read())
+    return compile_code_list(code_list, num_registers,
+                             {"parse": time.perf_counter() - start})
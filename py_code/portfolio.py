@@ -0,0 +1,243 @@
+"""
+Summary: Portfolio colouring. How long the exact search in
+    InterferenceGraph.allocate_registers takes on a hard graph depends
+    heavily on the order it visits the nodes in, and no single order is
+    best on every graph. A portfolio runs several searches over the same
+    graph in separate worker processes, each with a different node order
+    or a randomized-restart schedule. The first search to find a
+    colouring, or to prove that none exists, wins; the others are
+    terminated. The graph is handed to the workers once, in shared memory
+    (shared_ir), and searched by node id.
+
+    Strategies:
+        given       the order the caller passes (the simplify order when
+                    called from allocate_with_spills)
+        degree      highest degree first
+        bfs         breadth-first from the highest-degree node, so each
+                    node is coloured next to already coloured neighbours
+        restart-N   random orders, restarted with a new order (and twice
+                    the search-node budget) whenever the budget runs out
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import os
+import queue
+import random
+import time
+from typing import NamedTuple
+
+import pipeline
+import shared_ir
+from allocator import InterferenceGraph
+
+RESTART_BUDGET = 1000       # search nodes of the first randomized restart
+_POLL_SECONDS = 0.05        # how often to check for crashed workers
+
+
+class PortfolioResult(NamedTuple):
+    colourable: bool        # None if the time limit ran out first
+    strategy: str           # the winning strategy, or None
+    search_nodes: int       # search nodes the winner used
+    seconds: float          # wall-clock time until the winner reported
+
+
+class _BudgetExceeded(Exception):
+    """Raised when a budgeted search runs out of search nodes."""
+
+
+class _BudgetedGraph(InterferenceGraph):
+    """An InterferenceGraph whose exact search gives up after a number
+    of search nodes."""
+
+    def __init__(self, graph, color, budget, pinned=None, forbidden=None):
+        super().__init__()
+        self.graph = graph
+        self.color = dict(color)
+        self.budget = budget
+        self.pinned = pinned or {}
+        self.forbidden = forbidden or {}
+
+    def _count_search_node(self):
+        if self.search_nodes >= self.budget:
+            raise _BudgetExceeded
+        super()._count_search_node()
+
+
+def _degree_order(graph, order):
+    """Return order sorted by decreasing degree (stable for ties)."""
+    return sorted(order, key=lambda node: -len(graph[node]))
+
+
+def _bfs_order(graph, order):
+    """
+    Returns the nodes of order breadth-first from the highest-degree
+    node, visiting higher-degree neighbours first and restarting from
+    the highest-degree unvisited node for each further component.
+    """
+    wanted = set(order)
+    seen = set()
+    result = []
+    for start in _degree_order(graph, order):
+        if start in seen:
+            continue
+        seen.add(start)
+        frontier = [start]
+        while frontier:
+            result.extend(frontier)
+            following = []
+            for node in frontier:
+                for neighbour in _degree_order(graph, graph[node]):
+                    if neighbour in wanted and neighbour not in seen:
+                        seen.add(neighbour)
+                        following.append(neighbour)
+            frontier = following
+    return result
+
+
+def strategies(count):
+    """
+    Returns the names of the first count strategies of the portfolio.
+    Args:
+        count: The number of strategies wanted (at least 1).
+    Returns:
+        list: 'given', 'degree' and 'bfs', then 'restart-1',
+            'restart-2', ... as needed.
+    """
+    names = ["given", "degree", "bfs"][:count]
+    names += [f"restart-{i}" for i in range(1, count - len(names) + 1)]
+    return names
+
+
+def _search(graph, color, num_registers, order, strategy, pinned=None, forbidden=None):
+    """
+    Runs one strategy to completion.
+    Args:
+        graph: The adjacency mapping of the graph.
+        color: The partial colouring to extend.
+        num_registers: The number of colours.
+        order: The caller's node order.
+        strategy: A name returned by strategies().
+        pinned: Optional node -> register pins.
+        forbidden: Optional node -> forbidden registers.
+    Returns:
+        tuple: (colourable, colouring, search nodes used).
+    """
+    if not strategy.startswith("restart-"):
+        if strategy == "degree":
+            order = _degree_order(graph, order)
+        elif strategy == "bfs":
+            order = _bfs_order(graph, order)
+        search = _BudgetedGraph(graph, color, float("inf"), pinned, forbidden)
+        return search.allocate_registers(num_registers, order), search.color, search.search_nodes
+
+    rng = random.Random(strategy)
+    budget, used = RESTART_BUDGET, 0
+    while True:
+        order = list(order)
+        rng.shuffle(order)
+        search = _BudgetedGraph(graph, color, budget, pinned, forbidden)
+        try:
+            found = search.allocate_registers(num_registers, order)
+        except _BudgetExceeded:
+            used += search.search_nodes
+            budget *= 2
+            continue
+        return found, search.color, used + search.search_nodes
+
+
+def _worker(block, color, constraints, num_registers, order, strategy, results):
+    """Process entry point: run one strategy on the shared graph named
+    block (with node ids for names, also in the (pinned, forbidden)
+    constraints) and report on results."""
+    with shared_ir.attach(block) as view:
+        found, colouring, nodes = _search(view.graph, color, num_registers, order, strategy,
+                                          *constraints)
+    results.put((strategy, found, colouring, nodes))
+
+
+def colour_portfolio(graph, num_registers, order=None, workers=None, timeout=None):
+    """
+    Colours the graph by racing several exact searches in worker
+    processes. On success the winning colouring is stored in graph.color.
+    Args:
+        graph: The InterferenceGraph (or AllocationState) to colour.
+            Colours already in graph.color are kept and extended.
+            Its pinned and forbidden registers are honoured.
+        num_registers: The number of available CPU registers (colours).
+        order: The nodes to colour, in the order used by the 'given'
+            strategy; defaults to the graph's node order.
+        workers: The number of searches (one process each); defaults to
+            the CPU count, and is at least 2.
+        timeout: Seconds to wait for a conclusive answer; None waits
+            until one search finishes.
+    Returns:
+        PortfolioResult: Whether a colouring exists and which strategy
+            answered first. colourable is None if the time limit ran out.
+    Raises:
+        RuntimeError: If every worker process died without reporting.
+    """
+    order = list(graph.graph if order is None else order)
+    workers = max(2, workers or os.cpu_count() or 1)
+    context = pipeline.worker_context()
+    results = context.Queue()
+    start = time.perf_counter()
+    shared = shared_ir.SharedExport(graph)
+    ids = shared.ids
+    color = {ids[node]: colour for node, colour in graph.color.items()}
+    constraints = ({ids[node]: reg for node, reg in graph.pinned.items() if node in ids},
+                   {ids[node]: tuple(regs) for node, regs in graph.forbidden.items()
+                    if node in ids})
+    processes = [context.Process(target=_worker, daemon=True,
+                                 args=(shared.name, color, constraints, num_registers,
+                                       [ids[node] for node in order], strategy, results))
+                 for strategy in strategies(workers)]
+    deadline = None if timeout is None else start + timeout
+    try:
+        for process in processes:
+            process.start()
+        while True:
+            wait = _POLL_SECONDS if deadline is None else \
+                min(_POLL_SECONDS, deadline - time.perf_counter())
+            if wait <= 0:
+                return PortfolioResult(None, None, 0, time.perf_counter() - start)
+            if not any(process.is_alive() for process in processes):
+                wait = _POLL_SECONDS     # a last report may still be in the pipe
+            try:
+                strategy, found, colouring, nodes = results.get(timeout=wait)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    raise RuntimeError("every portfolio worker exited without a result")
+                continue
+            if found:
+                graph.color = {shared.names[i]: colour for i, colour in colouring.items()}
+            return PortfolioResult(found, strategy, nodes, time.perf_counter() - start)
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            if process.pid is not None:     # started
+                process.join()
+        results.close()
+        shared.close()
+
+
+def portfolio_search(graph, num_registers, order) -> bool:
+    """
+    Drop-in replacement for graph.allocate_registers(num_registers, order)
+    that runs the portfolio; used as the search of allocate_with_spills.
+    If every worker dies without a result (e.g. killed for running out of
+    memory), the search runs in this process instead.
+    Args:
+        graph: The InterferenceGraph to colour.
+        num_registers: The number of colours.
+        order: The nodes to colour.
+    Returns:
+        bool: True if a colouring was found (and stored in graph.color).
+    """
+    try:
+        return colour_portfolio(graph, num_registers, order).colourable
+    except RuntimeError:
+        return graph.allocate_registers(num_registers, order)
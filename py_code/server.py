@@ -0,0 +1,265 @@
+"""
+Summary: Long-running allocator daemon. Build systems that compile many
+    blocks connect over a Unix socket (or localhost TCP) instead of
+    starting a new interpreter per file, so the import and start-up cost
+    is paid once. An asyncio event loop accepts connections and hands each
+    request to a pool of worker processes, so several blocks are
+    allocated at the same time.
+
+    Protocol: newline-delimited JSON. Each request line is an object with
+    "num_registers" and either "source" (the block as text) or "path" (a
+    text or binary IR file readable by the server). Each response line is
+    {"ok": true, "assembly": ..., "colour": ..., "spilled": ...,
+    "stats": ...} or {"ok": false, "error": ...}. A connection may send
+    any number of requests; responses come back in the same order.
+
+    Run as a script:
+        python server.py --unix /tmp/allocator.sock [--workers N]
+        python server.py --port 8765 [--workers N]
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pipeline
+
+HOST = "127.0.0.1"
+_LINE_LIMIT = 1 << 26   # largest request line accepted, in bytes
+
+
+def handle_request(request: dict) -> dict:
+    """
+    Runs the compile pipeline for one decoded request. Runs inside a
+    worker, so every failure is turned into an error response rather than
+    raised; anything other than a bad request or an unreadable file is
+    reported as an internal error.
+    Args:
+        request: The decoded request object.
+    Returns:
+        dict: The response object.
+    """
+    if "num_registers" not in request:
+        return {"ok": False, "error": "missing field 'num_registers'"}
+    num_registers = request["num_registers"]
+    # bool is a subclass of int, but 'true' is not a register count
+    if (isinstance(num_registers, bool) or not isinstance(num_registers, int)
+            or num_registers < 1):
+        return {"ok": False, "error": "num_registers must be a positive integer"}
+    try:
+        if "source" in request:
+            result = pipeline.compile_text(request["source"], num_registers)
+        elif "path" in request:
+            result = pipeline.compile_file(request["path"], num_registers)
+        else:
+            raise ValueError("request needs a 'source' or a 'path'")
+    except (TypeError, ValueError, OSError) as e:
+        return {"ok": False, "error": str(e)}
+    except Exception as e:
+        return {"ok": False, "error": f"internal error: {type(e).__name__} {e}"}
+    return {"ok": True, "assembly": result.assembly, "colour": result.colour,
+            "spilled": result.spilled, "stats": result.stats}
+
+
+class AllocatorServer:
+    """
+    Accepts connections on an asyncio event loop and runs requests on an
+    executor. The loop itself only does I/O and JSON decoding.
+    """
+
+    def __init__(self, executor=None, workers: int = None):
+        """
+        Initializes the server.
+        Args:
+            executor: The concurrent.futures executor requests run on. If
+                None, a ProcessPoolExecutor with the given number of
+                workers is created and owned by the server.
+            workers: Number of worker processes when creating the pool;
+                defaults to the CPU count. Workers are forked from a
+                clean forkserver process (see pipeline.worker_context),
+                so they do not hold copies of open client sockets.
+        """
+        self._owns_executor = executor is None
+        self._workers = workers
+        self.executor = executor or self._new_pool()
+        self.server = None
+        self.requests_served = 0
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        """Create the worker pool the server owns."""
+        return ProcessPoolExecutor(max_workers=self._workers,
+                                   mp_context=pipeline.worker_context())
+
+    async def _respond(self, line: bytes) -> dict:
+        """Decode one request line and run it on the executor. If a worker
+        dies (e.g. killed for running out of memory on a huge block), the
+        request gets an error response and an owned pool is replaced, as a
+        broken pool fails every later request too."""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {"ok": False, "error": f"invalid JSON: {e}"}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "request must be a JSON object"}
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(self.executor, handle_request, request)
+        except BrokenProcessPool as e:
+            if self._owns_executor:
+                broken, self.executor = self.executor, self._new_pool()
+                broken.shutdown(wait=False)
+            response = {"ok": False, "error": f"internal error: worker died ({e})"}
+        self.requests_served += 1
+        return response
+
+    async def handle_client(self, reader, writer):
+        """
+        Serves one connection until the client closes it.
+        Args:
+            reader: The connection's asyncio.StreamReader.
+            writer: The connection's asyncio.StreamWriter.
+        Returns:
+            None
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b'{"ok": false, "error": "request too large"}\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self._respond(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start_unix(self, path: str):
+        """Start listening on a Unix socket at path, replacing a stale one."""
+        if os.path.exists(path):
+            os.unlink(path)
+        self.server = await asyncio.start_unix_server(self.handle_client, path,
+                                                      limit=_LINE_LIMIT)
+        return self.server
+
+    async def start_tcp(self, port: int, host: str = HOST):
+        """Start listening on host:port (localhost by default)."""
+        self.server = await asyncio.start_server(self.handle_client, host, port,
+                                                 limit=_LINE_LIMIT)
+        return self.server
+
+    async def close(self):
+        """Stop accepting connections and shut the owned executor down."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self._owns_executor:
+            self.executor.shutdown()
+
+
+def _connect(address):
+    """Return a socket connected to a Unix socket path or a (host, port)."""
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.connect(address)
+    return sock
+
+
+def send_requests(address, requests: list) -> list:
+    """
+    Blocking client: sends requests over one connection and waits for
+    every response.
+    Args:
+        address: The Unix socket path, or a (host, port) tuple.
+        requests: The request objects to send.
+    Returns:
+        list: The response objects, in request order.
+    """
+    with _connect(address) as sock:
+        payload = b"".join(json.dumps(r).encode() + b"\n" for r in requests)
+        sock.sendall(payload)
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile("rb") as f:
+            return [json.loads(line) for line in f]
+
+
+def send_request(address, request: dict) -> dict:
+    """Blocking client: send one request and return its response."""
+    return send_requests(address, [request])[0]
+
+
+def _parse_args(args):
+    """
+    Parses the command-line arguments.
+    Args:
+        args: sys.argv.
+    Returns:
+        tuple: (unix path or None, port or None, workers or None).
+    """
+    usage = "Usage: python server.py (--unix <path> | --port <n>) [--workers <n>]"
+    values = {"--unix": None, "--port": None, "--workers": None}
+    rest = args[1:]
+    try:
+        while rest:
+            flag, value, rest = rest[0], rest[1], rest[2:]
+            if flag not in values:
+                raise ValueError
+            values[flag] = value
+        port = int(values["--port"]) if values["--port"] else None
+        workers = int(values["--workers"]) if values["--workers"] else None
+    except (IndexError, ValueError):
+        print(usage, file=sys.stderr)
+        sys.exit(1)
+    if (values["--unix"] is None) == (port is None):
+        print(usage, file=sys.stderr)
+        sys.exit(1)
+    return values["--unix"], port, workers
+
+
+async def _serve(unix_path, port, workers):
+    """Run the server until cancelled."""
+    server = AllocatorServer(workers=workers)
+    if unix_path:
+        await server.start_unix(unix_path)
+        print(f"Allocator server listening on {unix_path}")
+    else:
+        await server.start_tcp(port)
+        print(f"Allocator server listening on {HOST}:{port}")
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(args):
+    """
+    Runs the allocator daemon until interrupted.
+    Args:
+        args: The command-line arguments.
+    Returns:
+        None
+    """
+    unix_path, port, workers = _parse_args(args)
+    try:
+        asyncio.run(_serve(unix_path, port, workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,214 @@
+"""
+Summary: Colouring cache keyed by the shape of the interference graph.
+    Blocks that differ only in variable names produce isomorphic graphs,
+    so once one of them has been coloured the others can reuse its
+    colouring by relabelling instead of searching again.
+
+    The canonical form is found by colour refinement: every node starts
+    with its degree as its colour and is repeatedly recoloured by its own
+    colour plus the sorted colours of its neighbours, until the partition
+    stops changing. Ties left over (nodes refinement cannot tell apart)
+    are broken by singling out one node and refining again. The resulting
+    node order turns the graph into a tuple of edges between positions,
+    which does not depend on the variable names. Two graphs with the same
+    tuple are isomorphic under the two orders, so a cache hit is always a
+    valid colouring; a tie broken differently can only cause a miss.
+
+    Only the core of the graph is canonicalised and cached: what is left
+    once every node with fewer than k neighbours has been peeled off
+    (repeatedly), which is where simplification first has to pick a
+    spill candidate and the exact search does its work. The peeled nodes
+    are coloured greedily around the core's colouring. A core that needs
+    spilling is cached as such, and the whole graph then goes straight
+    to allocate_with_spills' spilling step without the exact search. Tie-breaking
+    refines the whole graph once per node, so a core larger than
+    MAX_CORE_NODES bypasses the cache; canonicalising it could cost far
+    more than the search it saves.
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+from collections import Counter, OrderedDict
+
+from allocator import (InterferenceGraph, allocate_with_spills, colour_in_order,
+                       _spill_and_colour)
+
+MAX_CORE_NODES = 64     # larger cores are allocated without the cache
+
+
+def _refine(adjacency, colours):
+    """
+    Refines a node colouring until it is stable.
+    Args:
+        adjacency: Per node, the list of neighbour positions.
+        colours: Per node, its starting colour (int).
+    Returns:
+        list: Per node, its colour in the stable partition. Colours are
+            numbered 0, 1, ... in the sorted order of their signatures, so
+            they do not depend on the order of the nodes.
+    """
+    classes = len(set(colours))
+    while True:
+        signatures = [(colours[v], tuple(sorted(colours[u] for u in neighbours)))
+                      for v, neighbours in enumerate(adjacency)]
+        rank = {sig: i for i, sig in enumerate(sorted(set(signatures)))}
+        colours = [rank[sig] for sig in signatures]
+        if len(rank) == classes:
+            return colours
+        classes = len(rank)
+
+
+def canonical_form(graph):
+    """
+    Computes a relabel-invariant form of the graph's shape.
+    Args:
+        graph: The InterferenceGraph.
+    Returns:
+        tuple: (nodes, edges). nodes lists the variables in canonical
+            order; edges is the sorted tuple of (i, j) position pairs,
+            i < j, of every interference edge.
+    """
+    nodes = list(graph.graph)
+    index = {node: i for i, node in enumerate(nodes)}
+    adjacency = [[index[n] for n in graph.graph[node]] for node in nodes]
+    colours = _refine(adjacency, [len(neighbours) for neighbours in adjacency])
+    while len(set(colours)) < len(nodes):
+        counts = Counter(colours)
+        cell = min(colour for colour, size in counts.items() if size > 1)
+        chosen = colours.index(cell)
+        colours = [2 * colour + 1 for colour in colours]
+        colours[chosen] -= 1
+        colours = _refine(adjacency, colours)
+
+    edges = tuple(sorted((min(colours[v], colours[u]), max(colours[v], colours[u]))
+                         for v, neighbours in enumerate(adjacency)
+                         for u in neighbours if v < u))
+    order = sorted(range(len(nodes)), key=colours.__getitem__)
+    return [nodes[i] for i in order], edges
+
+
+def _core(graph, num_colours):
+    """
+    Peels off nodes with fewer than num_colours remaining neighbours
+    until none is left.
+    Args:
+        graph: The InterferenceGraph.
+        num_colours: The number of colours available.
+    Returns:
+        tuple: (order, core) where order lists the peeled nodes in
+            reverse removal order (so colouring them greedily in that
+            order after the core never runs out of colours) and core
+            lists the remaining nodes in graph order.
+    """
+    degree = {node: len(edges) for node, edges in graph.graph.items()}
+    ready = [node for node, d in degree.items() if d < num_colours]
+    removed = []
+    while ready:
+        node = ready.pop()
+        removed.append(node)
+        del degree[node]
+        for neighbour in graph.graph[node]:
+            if neighbour in degree:
+                degree[neighbour] -= 1
+                if degree[neighbour] == num_colours - 1:
+                    ready.append(neighbour)
+    return removed[::-1], list(degree)
+
+
+def _subgraph(graph, nodes):
+    """Return the InterferenceGraph induced by nodes."""
+    sub = InterferenceGraph()
+    keep = set(nodes)
+    sub.graph = {node: dict.fromkeys(n for n in graph.graph[node] if n in keep)
+                 for node in nodes}
+    return sub
+
+
+class ColouringCache:
+    """
+    Least-recently-used cache from (canonical core shape, number of
+    registers) to the colouring allocate_with_spills found for the core,
+    or None if the core does not fit in the registers. Only graphs with a core are cached; a graph
+    simplification colours on its own is faster to colour than to
+    canonicalise. Graphs with register constraints are never cached,
+    since their constraints depend on the variable names, and neither
+    are graphs whose core has more than MAX_CORE_NODES nodes.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Initializes an empty cache.
+        Args:
+            maxsize: The number of shapes kept; the least recently used
+                one is dropped when a new shape would exceed it.
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0   # graphs coloured without the cache
+
+    def allocate(self, graph, num_registers, search=None) -> list:
+        """
+        Same as allocate_with_spills, but reuses the colouring of an
+        earlier graph whose core has the same shape when there is one.
+        Args:
+            graph: The InterferenceGraph to colour. Its color dictionary
+                is overwritten with the final assignment.
+            num_registers: The number of available CPU registers.
+            search: The exact search, passed on to allocate_with_spills.
+        Returns:
+            list: The spilled variable names, in the order they were
+                chosen.
+        Raises:
+            ValueError: If spilling is needed but fewer than two
+                registers are available.
+        """
+        if graph.pinned or graph.forbidden:
+            self.bypassed += 1
+            return allocate_with_spills(graph, num_registers, search)
+        order, core = _core(graph, num_registers)
+        if not core or len(core) > MAX_CORE_NODES:
+            self.bypassed += 1
+            return allocate_with_spills(graph, num_registers, search)
+
+        nodes, edges = canonical_form(_subgraph(graph, core))
+        key = (num_registers, len(nodes), edges)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            colours = self.entries[key]
+        else:
+            self.misses += 1
+            sub = _subgraph(graph, nodes)
+            fits = not allocate_with_spills(sub, num_registers, search)
+            colours = tuple(sub.color[node] for node in nodes) if fits else None
+            self.entries[key] = colours
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+        if colours is None:
+            # The core needs spilling, so the whole graph does: skip the
+            # search that would prove it again and spill straight away.
+            return _spill_and_colour(graph, num_registers, {})
+        # Colouring the peeled nodes greedily after the core never runs
+        # out of colours.
+        graph.color = dict(zip(nodes, colours))
+        colour_in_order(graph, num_registers, order)
+        return []
+
+    def hit_rate(self) -> float:
+        """Return hits / lookups, or 0.0 before the first lookup."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """Return the cache counters as a dictionary."""
+        return {"hits": self.hits, "misses": self.misses, "bypassed": self.bypassed,
+                "entries": len(self.entries), "hit_rate": self.hit_rate()}
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        self.entries.clear()
+        self.hits = self.misses = self.bypassed = 0
@@ -0,0 +1,249 @@
+"""
+Summary: Shared-memory hand-off of instruction lists and interference
+    graphs to worker processes. Pickling an InterferenceGraph (a dict of
+    sets of strings) for every worker can cost more than colouring it, so
+    SharedExport writes both into one multiprocessing.shared_memory block
+    as flat int32 arrays, and workers attach to it by name.
+
+    Every string (variable or literal) is interned to an id; the graph's
+    nodes come first, so node ids are 0 .. num_nodes - 1 in graph order.
+    The graph is stored in compressed sparse row (CSR) form: the
+    neighbours of node i are neighbours[offsets[i]:offsets[i + 1]]. An
+    instruction is four ids (dest, src1, op, src2), with -1 for a missing
+    operand. Block layout, all int32 except the string bytes:
+
+        header     num_strings, num_nodes, num_neighbours,
+                   num_instructions (-1 if no IR), num_live, blob_bytes
+        strings    num_strings + 1 byte offsets into the blob
+        offsets    num_nodes + 1
+        neighbours num_neighbours
+        code       4 * num_instructions
+        live       num_live
+        blob       the UTF-8 strings, back to back
+
+    SharedView.graph maps node ids to memoryview slices of the block, so
+    a worker reads the adjacency without copying it and can colour it
+    directly with allocate_frozen (colours are keyed by id). Strings are
+    only decoded when asked for.
+
+Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
+Date: October 19, 2026
+"""
+
+from array import array
+from multiprocessing import shared_memory
+from types import MappingProxyType
+
+from allocator import InterferenceGraph
+from interm_rep import ThreeAdrInst, ThreeAdrInstList
+
+_HEADER = 6
+_ITEM = array("i").itemsize
+_OPS = (None, "+", "-", "*", "/")     # op id -> operator
+
+
+class SharedExport:
+    """
+    The owner of a shared block. The block lives until close(); workers
+    attach to it with attach(export.name) in the meantime.
+    """
+
+    def __init__(self, graph=None, code_list=None):
+        """
+        Interns the strings and writes the graph and instructions into a
+        new shared memory block.
+        Args:
+            graph: The InterferenceGraph (or FrozenGraph) to export, or
+                None for an empty graph.
+            code_list: The ThreeAdrInstList to export, or None.
+        """
+        adjacency = graph.graph if graph is not None else {}
+        self.ids = {node: i for i, node in enumerate(adjacency)}
+        self.names = list(adjacency)
+        offsets = array("i", [0])
+        neighbours = array("i")
+        for edges in adjacency.values():
+            neighbours.extend(map(self.ids.__getitem__, edges))
+            offsets.append(len(neighbours))
+
+        code = array("i")
+        live = array("i")
+        if code_list is not None:
+            for inst in code_list.instructions:
+                code.extend((self._intern(inst.dest), self._intern(inst.src1),
+                             _OPS.index(inst.op), self._intern(inst.src2)))
+            live.extend(self._intern(var) for var in code_list.live_on_exit)
+
+        encoded = [name.encode() for name in self.names]
+        starts = array("i", [0])
+        for data in encoded:
+            starts.append(starts[-1] + len(data))
+        header = array("i", [len(self.names), len(adjacency), len(neighbours),
+                             len(code) // 4 if code_list is not None else -1,
+                             len(live), starts[-1]])
+        ints = b"".join(part.tobytes() for part in
+                        (header, starts, offsets, neighbours, code, live))
+        self._shm = shared_memory.SharedMemory(create=True,
+                                               size=max(1, len(ints) + starts[-1]))
+        self._shm.buf[:len(ints)] = ints
+        self._shm.buf[len(ints):len(ints) + starts[-1]] = b"".join(encoded)
+
+    def _intern(self, name):
+        """Return the id of name (-1 for None), adding it if new."""
+        if name is None:
+            return -1
+        index = self.ids.get(name)
+        if index is None:
+            index = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    @property
+    def name(self) -> str:
+        """The shared block's name, which is all a worker needs."""
+        return self._shm.name
+
+    @property
+    def size(self) -> int:
+        """The block's size in bytes."""
+        return self._shm.size
+
+    def close(self) -> None:
+        """Free the block. Views attached to it stay valid until they
+        are closed; new ones cannot attach."""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SharedView:
+    """
+    A read-only view of a SharedExport, in this process or another. It
+    has the graph attribute of a FrozenGraph, keyed by node id, so
+    allocator.allocate_frozen can colour it.
+    """
+
+    def __init__(self, name: str):
+        """
+        Attaches to a shared block.
+        Args:
+            name: SharedExport.name of the block.
+        Raises:
+            FileNotFoundError: If no block of that name exists.
+        """
+        self._shm = shared_memory.SharedMemory(name)
+        buf = self._shm.buf
+        header = buf[:_HEADER * _ITEM].cast("i")
+        (self.num_strings, self.num_nodes, num_neighbours, self.num_instructions,
+         num_live, blob_bytes) = header
+        header.release()
+
+        sizes = (self.num_strings + 1, self.num_nodes + 1, num_neighbours,
+                 4 * max(0, self.num_instructions), num_live)
+        end = (_HEADER + sum(sizes)) * _ITEM
+        self._ints = buf[_HEADER * _ITEM:end].cast("i")
+        self._blob = buf[end:end + blob_bytes]
+        parts = []
+        start = 0
+        for size in sizes:
+            parts.append(self._ints[start:start + size])
+            start += size
+        self._starts, offsets, neighbours, self._code, self._live = parts
+        self._rows = [neighbours[offsets[i]:offsets[i + 1]] for i in range(self.num_nodes)]
+        self._views = parts + self._rows
+        self._graph = MappingProxyType(dict(enumerate(self._rows)))
+        self._names = None
+
+    @property
+    def graph(self):
+        """The read-only adjacency mapping: node id -> memoryview of
+        neighbour ids."""
+        return self._graph
+
+    def name_of(self, index: int) -> str:
+        """Return the string with the given id (None for -1)."""
+        if index < 0:
+            return None
+        return bytes(self._blob[self._starts[index]:self._starts[index + 1]]).decode()
+
+    @property
+    def names(self) -> list:
+        """Every interned string, by id; decoded on first use."""
+        if self._names is None:
+            self._names = [self.name_of(i) for i in range(self.num_strings)]
+        return self._names
+
+    def names_of(self, ids) -> list:
+        """Return the strings of an iterable of ids."""
+        names = self.names
+        return [names[i] for i in ids]
+
+    def to_interference_graph(self):
+        """
+        Rebuilds the named graph (a copy; workers that colour by id do
+        not need it).
+        Returns:
+            InterferenceGraph: The exported graph.
+        """
+        graph = InterferenceGraph()
+        names = self.names
+        graph.graph = {names[i]: dict.fromkeys(names[j] for j in row)
+                       for i, row in enumerate(self._rows)}
+        return graph
+
+    def to_code_list(self) -> ThreeAdrInstList:
+        """
+        Rebuilds the exported instruction list.
+        Returns:
+            ThreeAdrInstList: A copy of the exported instructions.
+        Raises:
+            ValueError: If the block was exported without one.
+        """
+        if self.num_instructions < 0:
+            raise ValueError("no instruction list was exported")
+        names = self.names + [None]     # id -1 -> None
+        code = self._code
+        code_list = ThreeAdrInstList()
+        code_list.instructions = [ThreeAdrInst(names[code[i]], names[code[i + 1]],
+                                               _OPS[code[i + 2]], names[code[i + 3]])
+                                  for i in range(0, len(code), 4)]
+        code_list.set_live_on_exit(self.names_of(self._live))
+        return code_list
+
+    def close(self) -> None:
+        """Detach from the block. Every memoryview handed out by this
+        view, including the rows of graph, is released."""
+        if self._shm is None:
+            return
+        for view in self._views + [self._ints, self._blob]:
+            view.release()
+        self._graph = MappingProxyType({})
+        self._shm.close()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach(name: str) -> SharedView:
+    """
+    Attaches to a block written by SharedExport; call close() (or use
+    the view as a context manager) when done.
+    Args:
+        name: SharedExport.name of the block.
+    Returns:
+        SharedView: The view.
+    Raises:
+        FileNotFoundError: If no block of that name exists.
+    """
+    return SharedView(name)
@@ -7,8 +7,20 @@ Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
 Date: March 27, 2026
 """
 
+from __future__ import annotations
+
 from enum import Enum
-from typing import Union
+
+# Entries an intern cache may hold before it is emptied. The caches live as
+# long as the process (e.g. a server worker), and variable names and
+# immediates differ from block to block; registers never come near this.
+INTERN_LIMIT = 1 << 16
+
+def _bounded_setdefault(cache: dict, key, value):
+    """dict.setdefault on an intern cache, emptying it first if it is full."""
+    if len(cache) >= INTERN_LIMIT:
+        cache.clear()
+    return cache.setdefault(key, value)
 
 class AsmOperandMode(Enum):
     """Represents the addressing mode of an assembly operand."""
@@ -16,17 +28,69 @@ class AsmOperandMode(Enum):
     ABS = "absolute"
     RGD = "register direct"
 
-class AsmVariable:
+class _Interned:
+    """
+    Base class for the immutable, interned operand classes. Constructing
+    one with arguments already seen returns the existing object, so there
+    is usually a single instance per register number, variable or operand.
+    The caches are bounded (see INTERN_LIMIT), so equality and hashing go
+    by value; only register operands, of which there are few, can be
+    relied on to compare with 'is'. Subclasses list their attributes in
+    __slots__ and build instances with _intern.
+    """
+    __slots__ = ()
+
+    def _values(self) -> tuple:
+        """Return the attribute values, in __slots__ order."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        """Compares by value; interned instances are usually identical."""
+        if self is other:
+            return True
+        if type(self) is not type(other):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        """Hashes by value, consistently with __eq__."""
+        return hash(self._values())
+
+    def __setattr__(self, name, value):
+        """Rejects attribute assignment; interned objects are shared."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @classmethod
+    def _intern(cls, key, **attrs):
+        """Return the cached instance for key, creating it from attrs on
+        first use. Threads that race to create the same key all get the
+        instance that reached the cache first (dict.setdefault is
+        atomic), so 'is' comparisons stay valid."""
+        obj = cls._cache.get(key)
+        if obj is None:
+            obj = object.__new__(cls)
+            for name, value in attrs.items():
+                object.__setattr__(obj, name, value)
+            obj = _bounded_setdefault(cls._cache, key, obj)
+        return obj
+
+    def __reduce__(self):
+        """Pickles by constructor arguments so unpickling re-interns."""
+        return (type(self), self._values())
+
+class AsmVariable(_Interned):
     """Represents a named variable in assembly, stored in main memory."""
-    def __init__(self, var_name: str, val: int):
+    __slots__ = ("var_name", "val")
+    _cache = {}
+
+    def __new__(cls, var_name: str, val: int):
         """
-        Initializes an AsmVariable instance.
+        Returns the AsmVariable for the given name and value.
         Args:
             var_name: The name of the variable.
             val: The value or label associated with the variable.
         """
-        self.var_name = var_name
-        self.val = val
+        return cls._intern((var_name, val), var_name=var_name, val=val)
 
     def __str__(self):
         """
@@ -36,15 +100,18 @@ class AsmVariable:
         """
         return f"{self.val}"
 
-class AsmRegister:
+class AsmRegister(_Interned):
     """Represents a CPU register identified by number."""
-    def __init__(self, reg_num):
+    __slots__ = ("reg_num",)
+    _cache = {}
+
+    def __new__(cls, reg_num):
         """
-        Initializes an AsmRegister instance.
+        Returns the AsmRegister for the given register number.
         Args:
             reg_num: The register number (integer >= 0).
         """
-        self.reg_num = reg_num
+        return cls._intern(reg_num, reg_num=reg_num)
 
     def __str__(self):
         """
@@ -54,19 +121,21 @@ class AsmRegister:
         """
         return f"R{self.reg_num}"
 
-class AsmOperand:
+class AsmOperand(_Interned):
     """Represents an operand in an assembly instruction."""
-    def __init__(self, mode: AsmOperandMode, val: Union["AsmRegister", "AsmVariable", int]):
+    __slots__ = ("mode", "val")
+    _cache = {}
+
+    def __new__(cls, mode: AsmOperandMode, val: AsmRegister | AsmVariable | int):
         """
-        Initializes an AsmOperand instance.
+        Returns the AsmOperand for the given mode and value.
         Args:
             mode: The addressing mode (immediate, absolute, or
                 register direct).
             val: The operand value (an AsmRegister, AsmVariable,
                 or int depending on the mode).
         """
-        self.mode = mode
-        self.val = val
+        return cls._intern((mode, val), mode=mode, val=val)
 
     def __str__(self):
         """
@@ -76,6 +145,38 @@ class AsmOperand:
         """
         return str(self.val)
 
+def register_operand(reg_num: int) -> AsmOperand:
+    """Return the register direct operand for register reg_num."""
+    operand = _REGISTER_OPERANDS.get(reg_num)
+    if operand is None:
+        operand = _bounded_setdefault(_REGISTER_OPERANDS, reg_num,
+                                      AsmOperand(AsmOperandMode.RGD, AsmRegister(reg_num)))
+    return operand
+
+def variable_operand(var_name: str) -> AsmOperand:
+    """Return the absolute operand for the memory variable var_name."""
+    operand = _VARIABLE_OPERANDS.get(var_name)
+    if operand is None:
+        operand = _bounded_setdefault(
+            _VARIABLE_OPERANDS, var_name,
+            AsmOperand(AsmOperandMode.ABS, AsmVariable(var_name, var_name)))
+    return operand
+
+def immediate_operand(value: int) -> AsmOperand:
+    """Return the immediate operand for value."""
+    operand = _IMMEDIATE_OPERANDS.get(value)
+    if operand is None:
+        operand = _bounded_setdefault(_IMMEDIATE_OPERANDS, value,
+                                      AsmOperand(AsmOperandMode.IMM, value))
+    return operand
+
+# Fast paths for the factories above, keyed by their single argument; filled
+# with setdefault so racing threads agree on one operand, and bounded like
+# the class caches
+_REGISTER_OPERANDS = {}
+_VARIABLE_OPERANDS = {}
+_IMMEDIATE_OPERANDS = {}
+
 class AsmOperator(Enum):
     """Represents the set of supported assembly operations."""
     ADD = "ADD"             # ADD   src, Ri
@@ -93,9 +194,25 @@ class AsmOperator(Enum):
         """
         return self.value
 
+# The cost model: estimated cycles of each operation, plus MEMORY_CYCLES for
+# every absolute (memory) operand it reads or writes. MVR and MVD share the
+# "MOV" value, so they are one member and one entry; a store pays for its
+# memory destination instead.
+OPERATOR_CYCLES = {
+    AsmOperator.ADD: 1,
+    AsmOperator.SUB: 1,
+    AsmOperator.MUL: 3,
+    AsmOperator.DIV: 12,
+    AsmOperator.MVR: 1,
+}
+MEMORY_CYCLES = 2
+COST_METRICS = ("cycles", "instructions")
+
 class AsmInst:
     """A class representing a Assembly Instruction, which is what each
         three-address instruction will be compiled into"""
+    __slots__ = ("op", "src", "dest")
+
     def __init__(self, op: AsmOperator, src: AsmOperand, dest: AsmOperand):
         """
         Initializes an AsmInst instance.
@@ -115,6 +232,28 @@ class AsmInst:
             str: The instruction in the format 'OP    src, dest'.
         """
         return f"{self.op}    {self.src}, {self.dest}"
+
+    def cost(self, metric: str = "cycles") -> int:
+        """
+        Estimates the cost of the instruction under the cost model.
+        Args:
+            metric: 'cycles' for OPERATOR_CYCLES plus MEMORY_CYCLES per
+                memory operand, or 'instructions' to count 1.
+        Returns:
+            int: The estimated cost.
+        Raises:
+            ValueError: If the metric is not one of COST_METRICS.
+        """
+        if metric == "instructions":
+            return 1
+        if metric != "cycles":
+            raise ValueError(f"Unknown cost metric: {metric}. Valid metrics: "
+                             f"{', '.join(COST_METRICS)}")
+        cycles = OPERATOR_CYCLES[self.op]
+        for operand in (self.src, self.dest):
+            if operand is not None and operand.mode == AsmOperandMode.ABS:
+                cycles += MEMORY_CYCLES
+        return cycles
     
 class AsmInstList:
     """A list ASM instructions that represents the assembly code output"""
@@ -129,6 +268,11 @@ class AsmInstList:
         """
         self.instructions = []      # The assembly instructions
         self.live_on_exit = []      # List of variables that are live on exit
+        # Number of stores to spill slots, one per definition of a spilled
+        # variable. Spilled values are read straight from memory and are
+        # computed in the scratch register instead of their own, so these
+        # stores are the only instructions spill code adds.
+        self.spill_count = 0
         if num_regs < 0:
             raise ValueError(f"Invalid Number of Register: {num_regs}. Must allocate >= 0 registers.")
         else:
@@ -140,11 +284,33 @@ class AsmInstList:
         Returns:
             str: All instructions, one per line, indented.
         """
-        string = ""
-        for inst in self.instructions:
-            string += f"    {str(inst)}\n"
-        return string
+        return "".join([f"    {inst}\n" for inst in self.instructions])
     
+    def write(self, out):
+        """
+        Writes the formatted assembly listing to a writable one line at a
+        time, without building the whole listing as a single string.
+        Args:
+            out: Any object with a write(str) method, such as a file
+                opened in text mode.
+        Returns:
+            None
+        """
+        for inst in self.instructions:
+            out.write(f"    {inst}\n")
+
+    def cost(self, metric: str = "cycles") -> int:
+        """
+        Estimates the cost of the whole listing (see AsmInst.cost).
+        Args:
+            metric: 'cycles' or 'instructions'.
+        Returns:
+            int: The summed cost of every instruction.
+        Raises:
+            ValueError: If the metric is not one of COST_METRICS.
+        """
+        return sum(inst.cost(metric) for inst in self.instructions)
+
     def add_inst(self, inst: AsmInst):
         """
         Appends an assembly instruction to the instruction list.
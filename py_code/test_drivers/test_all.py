@@ -16,11 +16,29 @@ sys.path.insert(0, parent_dir)
 
 from tokenizer import TokenType, Token, Tokenizer
 from interm_rep import ThreeAdrInst, ThreeAdrInstList
-from parser import Parser
-from allocator import InterferenceGraph, build_interfere_graph
+from parser import Parser, ParseError
+from allocator import (InterferenceGraph, build_interfere_graph, allocate_with_spills,
+                       FrozenGraph, allocate_frozen, allocate_concurrently,
+                       split_self_divisions)
 from target import (AsmRegister, AsmVariable, AsmOperand, AsmOperandMode,
-                    AsmOperator, AsmInst, AsmInstList)
-from generate import generate_assembly, make_operand
+                    AsmOperator, AsmInst, AsmInstList, register_operand,
+                    variable_operand, immediate_operand)
+from generate import generate_assembly, make_operand, write_assembly
+from peephole import optimise, remove_self_moves, remove_dead_code
+import target
+import ir_optimiser
+import asm_binary
+import ir_binary
+import pipeline
+import server
+import batch
+from incremental import IncrementalAllocator
+import portfolio
+from shape_cache import ColouringCache, canonical_form
+import parallel_parse
+import shared_ir
+from memory_profile import MemoryProfiler
+from cost_search import cheapest_colouring, colouring_cost
 
 TEST_INPUTS = os.path.join(current_dir, "test_inputs")
 
@@ -210,7 +228,7 @@ def test_allocator():
     # 27 — add_node
     g = InterferenceGraph()
     g.add_node("a")
-    _check("add_node creates empty set", "a" in g.graph and g.graph["a"] == set())
+    _check("add_node creates empty neighbour dict", "a" in g.graph and g.graph["a"] == {})
     # 28 — add_node twice: no duplicate
     g.add_node("a")
     _check("add_node twice: still one entry", len(g.graph) == 1)
@@ -382,6 +400,1236 @@ def test_target():
     _check("AsmInstList __str__ contains 'MVR'", "MVR" in str(lst_s))
 
 
+# ---------------------------------------------------------------------------
+# Spilling allocator / spill code (5 tests)
+# ---------------------------------------------------------------------------
+
+def test_spill():
+    # 60 — colourable graph: nothing is spilled
+    g = InterferenceGraph()
+    g.add_edge("a", "b")
+    _check("no spill needed -> []", allocate_with_spills(g, 2) == [])
+    _check("no spill needed: both coloured", set(g.color) == {"a", "b"})
+    # 61 — triangle with 2 registers: R1 reserved, one colour left
+    g2 = InterferenceGraph()
+    g2.add_edge("a", "b")
+    g2.add_edge("b", "c")
+    g2.add_edge("a", "c")
+    spilled = allocate_with_spills(g2, 2)
+    _check("triangle, 2 regs: two nodes spilled", len(spilled) == 2)
+    _check("triangle, 2 regs: scratch R1 unused",
+           all(reg == 0 for reg in g2.color.values()))
+    # 62 — spilling needs a scratch register
+    g3 = InterferenceGraph()
+    g3.add_edge("a", "b")
+    _check_raises("spill with 1 reg raises ValueError", ValueError,
+                  lambda: allocate_with_spills(g3, 1))
+    # 63 — spilled dest is computed in the scratch register, then stored
+    lst = ThreeAdrInstList()
+    lst.add_instruct(ThreeAdrInst("a", "b", "+", "1"))
+    lst.set_live_on_exit(["a"])
+    asm = generate_assembly(lst, {"b": 0}, 2)
+    last = asm.instructions[-1]
+    _check("spilled dest: computed in R1", asm.instructions[0].dest.val.reg_num == 1)
+    _check("spilled dest: stored to its slot",
+           last.op == AsmOperator.MVD and last.dest.mode == AsmOperandMode.ABS
+           and last.dest.val.var_name == "a")
+    _check("spilled dest: one spill store counted", asm.spill_count == 1)
+    _check("spilled live var: no extra store-back", len(asm.instructions) == 3)
+    # 64 — scratch register must not be handed out by the colour map
+    _check_raises("busy scratch register raises ValueError", ValueError,
+                  lambda: generate_assembly(lst, {"b": 1}, 2))
+
+
+# ---------------------------------------------------------------------------
+# Peephole optimiser (8 tests)
+# ---------------------------------------------------------------------------
+
+def test_peephole():
+    r0 = AsmOperand(AsmOperandMode.RGD, AsmRegister(0))
+    r1 = AsmOperand(AsmOperandMode.RGD, AsmRegister(1))
+    mem_a = AsmOperand(AsmOperandMode.ABS, AsmVariable("a", "a"))
+    # 65 — self-moves are removed, other moves kept
+    lst = AsmInstList(2)
+    lst.add_inst(AsmInst(AsmOperator.MVR, r0, r0))
+    lst.add_inst(AsmInst(AsmOperator.MVR, r0, r1))
+    _check("remove_self_moves removes one", remove_self_moves(lst) == 1)
+    _check("remove_self_moves keeps MOV R0, R1", len(lst.instructions) == 1
+           and lst.instructions[0].dest is r1)
+    # 66 — a register overwritten before it is read is dead
+    lst2 = AsmInstList(1)
+    lst2.add_inst(AsmInst(AsmOperator.MVR, AsmOperand(AsmOperandMode.IMM, 1), r0))
+    lst2.add_inst(AsmInst(AsmOperator.ADD, AsmOperand(AsmOperandMode.IMM, 2), r0))
+    lst2.add_inst(AsmInst(AsmOperator.MVR, AsmOperand(AsmOperandMode.IMM, 3), r0))
+    lst2.add_inst(AsmInst(AsmOperator.MVD, r0, mem_a))
+    lst2.set_live_on_exit(["a"])
+    _check("remove_dead_code removes the dead chain", remove_dead_code(lst2) == 2)
+    _check("remove_dead_code keeps the live store",
+           lst2.instructions[-1].dest is mem_a)
+    # 67 — nothing survives when nothing is live on exit
+    lst3 = _make_code_list("a = 1\nb = a + 2\nlive:\n")
+    asm3 = generate_assembly(lst3, {"a": 0, "b": 0}, 1)
+    optimise(asm3)
+    _check("no live vars: everything is dead", asm3.instructions == [])
+    # 68 — 'a = a + 1' keeps only the ADD and the store-back
+    lst4 = _make_code_list("a = a + 1\nlive: a\n")
+    asm4 = generate_assembly(lst4, {"a": 0}, 1)
+    _check("optimise removes MOV R0, R0", optimise(asm4) == 1)
+    _check("optimise leaves ADD + store", [i.op for i in asm4.instructions]
+           == [AsmOperator.ADD, AsmOperator.MVD])
+    # 69 — dest sharing src2's register: commutative operands are swapped
+    lst5 = ThreeAdrInstList()
+    lst5.add_instruct(ThreeAdrInst("x", "y", "+", "z"))
+    asm5 = generate_assembly(lst5, {"x": 0, "y": 1, "z": 0}, 2)
+    _check("dest == src2 reg: ADD reads y", str(asm5.instructions[1]) == "ADD    R1, R0")
+    # 70 — in-place negation multiplies by -1 instead of clearing the operand
+    lst6 = ThreeAdrInstList()
+    lst6.add_instruct(ThreeAdrInst("x", "y", "-"))
+    asm6 = generate_assembly(lst6, {"x": 0, "y": 0}, 1)
+    _check("in-place negation: MUL -1", str(asm6.instructions[1]) == "MUL    -1, R0")
+    # 71 — a divisor never shares a register with the quotient
+    graph = build_interfere_graph(_make_code_list("x = y / z\nlive: x\n"))
+    _check("divisor interferes with dest", "z" in graph.graph["x"])
+    # 171 — a division into its own divisor goes through a fresh temporary
+    code = _make_code_list("b = a + c\na = b / a\nlive: a\n")
+    graph = build_interfere_graph(code)
+    _check("building the graph leaves the list alone", len(code.instructions) == 2)
+    _check("split_self_divisions counts rewrites", split_self_divisions(code) == 1)
+    graph = build_interfere_graph(code)
+    _check("x = y / x split with a copy",
+           [str(inst) for inst in code.instructions][1:] == ["t0 = a", "a = b / t0"]
+           and "t0" in graph.graph["a"])
+    _check("x = y / x compiles", "DIV" in pipeline.compile_text(
+        "b = a + c\na = b / a\nlive: a\n", 3).assembly)
+
+
+# ---------------------------------------------------------------------------
+# IR optimiser (6 tests)
+# ---------------------------------------------------------------------------
+
+def _ir_strs(code_list):
+    return [str(inst) for inst in code_list.instructions]
+
+def test_ir_optimiser():
+    # 72 — constant arithmetic is folded
+    code = _make_code_list("t1 = 3 * 4\nlive: t1\n")
+    ir_optimiser.propagate_and_fold(code)
+    _check("fold 3 * 4 -> 12", _ir_strs(code) == ["t1 = 12"])
+    # 73 — a negative result becomes a unary negation of a literal
+    code = _make_code_list("t1 = 3 - 5\nlive: t1\n")
+    ir_optimiser.propagate_and_fold(code)
+    _check("fold 3 - 5 -> - 2", _ir_strs(code) == ["t1 = - 2"])
+    # 74 — inexact division is left alone
+    code = _make_code_list("t1 = 7 / 2\nlive: t1\n")
+    ir_optimiser.propagate_and_fold(code)
+    _check("7 / 2 not folded", _ir_strs(code) == ["t1 = 7 / 2"])
+    # 75 — copies are propagated, then the dead copy is removed
+    code = _make_code_list("b = a\nc = b + 1\nlive: c\n")
+    _check("copy removed", ir_optimiser.optimise(code) == 1)
+    _check("copy propagated", _ir_strs(code) == ["c = a + 1"])
+    # 76 — redefining the source of a copy stops the propagation
+    code = _make_code_list("b = a\na = 5\nc = b + a\nlive: c\n")
+    ir_optimiser.optimise(code)
+    _check("redefinition respected", _ir_strs(code) == ["b = a", "c = b + 5"])
+    # 77 — definitions not live afterwards are removed, live ones kept
+    code = _make_code_list("x = 10\ny = x\nx = 3\nlive: x\n")
+    _check("dead defs removed", ir_optimiser.remove_dead_code(code) == 2)
+    _check("last def of live var kept", _ir_strs(code) == ["x = 3"])
+
+
+# ---------------------------------------------------------------------------
+# Local value numbering (4 tests)
+# ---------------------------------------------------------------------------
+
+def test_value_numbering():
+    # 78 — a repeated expression becomes a copy of the first result
+    code = _make_code_list("x = a * 4\ny = a * 4\nlive: x, y\n")
+    _check("repeat found", ir_optimiser.eliminate_common_subexpressions(code) == 1)
+    _check("repeat becomes copy", _ir_strs(code) == ["x = a * 4", "y = x"])
+    # 79 — commutative operands match in either order, '-' does not
+    code = _make_code_list("x = a + b\ny = b + a\nz = b - a\nw = a - b\nlive: y, z, w\n")
+    ir_optimiser.eliminate_common_subexpressions(code)
+    _check("b + a reuses a + b", _ir_strs(code)[1] == "y = x")
+    _check("b - a is not a - b", _ir_strs(code)[3] == "w = a - b")
+    # 80 — redefining an operand stops the reuse
+    code = _make_code_list("x = a * 4\na = 2\ny = a * 4\nlive: x, y\n")
+    _check("redefined operand: no reuse",
+           ir_optimiser.eliminate_common_subexpressions(code) == 0)
+    # 81 — redefining the holder stops the reuse, a copy of it still counts
+    code = _make_code_list("x = a * 4\nz = x\nx = 1\ny = a * 4\nlive: x, y, z\n")
+    ir_optimiser.eliminate_common_subexpressions(code)
+    _check("copy of redefined holder reused", _ir_strs(code)[3] == "y = z")
+    code = _make_code_list("x = a * 4\nt1 = a * 4\ny = x + t1\nlive: y\n")
+    ir_optimiser.optimise(code)
+    _check("optimise multiplies once", _ir_strs(code) == ["x = a * 4", "y = x + x"])
+
+
+# ---------------------------------------------------------------------------
+# Streaming assembly writer (4 tests)
+# ---------------------------------------------------------------------------
+
+def test_stream():
+    import io
+    code = _make_code_list("a = 1\nb = a + 2\nc = - b\nlive: a, c\n")
+    colour_map = {"a": 0, "b": 1, "c": 1}
+    expected = str(generate_assembly(code, colour_map, 2))
+    # 82 — AsmInstList.write matches __str__
+    out = io.StringIO()
+    generate_assembly(code, colour_map, 2).write(out)
+    _check("AsmInstList.write == str()", out.getvalue() == expected)
+    # 83 — write_assembly streams the same text and counts instructions
+    out2 = io.StringIO()
+    count = write_assembly(code, colour_map, 2, out2)
+    _check("write_assembly == str(generate_assembly)", out2.getvalue() == expected)
+    _check("write_assembly returns instruction count",
+           count == len(generate_assembly(code, colour_map, 2).instructions))
+    # 84 — write_assembly writes one line per call
+    class _Recorder:
+        def __init__(self):
+            self.calls = []
+        def write(self, text):
+            self.calls.append(text)
+    rec = _Recorder()
+    write_assembly(code, colour_map, 2, rec)
+    _check("write_assembly writes line by line", len(rec.calls) == count)
+    # 176 — a failure part way through streaming leaves no truncated output
+    import contextlib
+    import main
+    failing = _make_code_list("a = 1\nb = a + 2\nd = b / c\nlive: d\n")
+    src = os.path.join(TEST_INPUTS, "_stream_fail.txt")
+    out_path = os.path.splitext(src)[0] + ".s"
+    try:
+        with open(out_path, "w") as f:
+            f.write("old listing\n")
+        with contextlib.redirect_stderr(io.StringIO()):
+            _check_raises("stream: generation error exits", SystemExit,
+                          lambda: main.gen_output(failing, {"a": 0, "b": 1, "c": 0, "d": 0},
+                                                  2, src, stream=True))
+        with open(out_path) as f:
+            _check("stream: previous output kept", f.read() == "old listing\n")
+        _check("stream: no temporary left", not any(
+            name.startswith("_stream_fail.s.") for name in os.listdir(TEST_INPUTS)))
+    finally:
+        if os.path.exists(out_path):
+            os.remove(out_path)
+
+
+# ---------------------------------------------------------------------------
+# Interned operands (6 tests)
+# ---------------------------------------------------------------------------
+
+def test_interned_operands():
+    import pickle
+    # 85 — one object per register, variable and operand
+    _check("AsmRegister interned", AsmRegister(3) is AsmRegister(3))
+    _check("AsmVariable interned", AsmVariable("q", "q") is AsmVariable("q", "q"))
+    _check("AsmOperand interned", AsmOperand(AsmOperandMode.RGD, AsmRegister(3))
+           is AsmOperand(AsmOperandMode.RGD, AsmRegister(3)))
+    # 86 — make_operand hands out the shared objects
+    _check("make_operand register shared",
+           make_operand("a", {"a": 2}) is make_operand("b", {"b": 2}))
+    _check("make_operand memory shared", make_operand("m", {}) is make_operand("m", {}))
+    # 87 — interned objects are immutable
+    _check_raises("AsmRegister is immutable", AttributeError,
+                  lambda: setattr(AsmRegister(0), "reg_num", 5))
+    _check_raises("AsmOperand has no __dict__", AttributeError,
+                  lambda: setattr(AsmOperand(AsmOperandMode.IMM, 1), "extra", 1))
+    # 88 — pickling round-trips to the same interned object
+    op = AsmOperand(AsmOperandMode.ABS, AsmVariable("z", "z"))
+    _check("pickle keeps identity", pickle.loads(pickle.dumps(op)) is op)
+    # 175 — threads racing to create the same operands all get one object
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+    barrier = threading.Barrier(8)
+    def create(_):
+        barrier.wait()
+        return [register_operand(n) for n in range(5000, 5200)] + \
+               [AsmRegister(n) for n in range(6000, 6200)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(create, range(8)))
+    finally:
+        sys.setswitchinterval(interval)
+    _check("interning is thread safe", all(a is b for other in results[1:]
+                                           for a, b in zip(results[0], other)))
+    # 182 — the caches are bounded, and operands still compare by value
+    #       once an older instance has been dropped from them
+    old = variable_operand("v0")
+    limit, target.INTERN_LIMIT = target.INTERN_LIMIT, 16
+    try:
+        operands = [variable_operand(f"v{i}") for i in range(100)]
+        _check("intern caches bounded", len(AsmOperand._cache) <= 16
+               and len(target._VARIABLE_OPERANDS) <= 16)
+    finally:
+        target.INTERN_LIMIT = limit
+    _check("operands equal by value", variable_operand("v0") == old
+           and hash(variable_operand("v0")) == hash(old) and operands[0] != operands[1])
+
+
+# ---------------------------------------------------------------------------
+# Binary assembly format (5 tests)
+# ---------------------------------------------------------------------------
+
+def test_asm_binary():
+    code = _make_code_list("a = 1\nb = a + 2\nc = - b\nd = c * e\nlive: a, d\n")
+    asm = generate_assembly(code, {"a": 0, "b": 1, "c": 1, "d": 1}, 2)
+    data = asm_binary.encode(asm)
+    # 89 — encode/decode round trip keeps instructions, registers, live vars
+    back = asm_binary.decode(data)
+    _check("binary round trip: same listing", str(back) == str(asm))
+    _check("binary round trip: num_regs", back.num_regs == 2)
+    _check("binary round trip: live_on_exit", back.live_on_exit == ["a", "d"])
+    # 90 — random access decodes a single record
+    reader = asm_binary.AsmBinaryReader(data)
+    _check("reader length", len(reader) == len(asm.instructions))
+    _check("reader random access", str(reader[3]) == str(asm.instructions[3]))
+    _check_raises("reader index out of range", IndexError, lambda: reader[len(reader)])
+    # 91 — text -> binary -> text round trip
+    text = str(asm)
+    _check("text round trip", asm_binary.binary_to_text(asm_binary.text_to_binary(text)) == text)
+    # 92 — foreign data is rejected
+    _check_raises("bad magic raises ValueError", ValueError,
+                  lambda: asm_binary.decode(b"NOPE" + data[4:]))
+    _check_raises("truncated data raises ValueError", ValueError,
+                  lambda: asm_binary.decode(data[:-1]))
+    # 93 — an immediate wider than 32 bits cannot be encoded
+    big = AsmInstList(1)
+    big.add_inst(AsmInst(AsmOperator.MVR, AsmOperand(AsmOperandMode.IMM, 2**40),
+                         AsmOperand(AsmOperandMode.RGD, AsmRegister(0))))
+    _check_raises("wide immediate raises ValueError", ValueError,
+                  lambda: asm_binary.encode(big))
+
+
+# ---------------------------------------------------------------------------
+# Binary IR format (5 tests)
+# ---------------------------------------------------------------------------
+
+def test_ir_binary():
+    import tempfile
+    src = "a = 1\nb = a + 22\nc = - b\nd = c\nlive: b, d\n"
+    code = _make_code_list(src)
+    data = ir_binary.encode(code)
+    # 94 — encode/decode round trip
+    back = ir_binary.decode(data)
+    _check("IR round trip: instructions", _ir_strs(back) == _ir_strs(code))
+    _check("IR round trip: live_on_exit", back.live_on_exit == ["b", "d"])
+    _check("IR round trip: missing src2 is None", back.instructions[2].src2 is None)
+    # 95 — the reader decodes single instructions on demand
+    reader = ir_binary.IRBinaryReader(data)
+    _check("IR reader length", len(reader) == 4)
+    _check("IR reader negative index", str(reader[-1]) == "d = c")
+    # 96 — mmap-backed file load, and magic sniffing
+    with tempfile.NamedTemporaryFile(suffix=".irb", delete=False) as f:
+        f.write(data)
+        name = f.name
+    _check("is_binary_ir on binary file", ir_binary.is_binary_ir(name))
+    _check("load from file", _ir_strs(ir_binary.load(name)) == _ir_strs(code))
+    os.unlink(name)
+    _check("is_binary_ir on text file",
+           not ir_binary.is_binary_ir(os.path.join(TEST_INPUTS, "plain.txt")))
+    # 97 — to_text output parses back to the same block
+    reparsed = _make_code_list(ir_binary.to_text(back))
+    _check("to_text re-parses", _ir_strs(reparsed) == _ir_strs(code)
+           and reparsed.live_on_exit == code.live_on_exit)
+    _check_raises("bad IR magic raises ValueError", ValueError,
+                  lambda: ir_binary.decode(b"RASM" + data[4:]))
+    # 180 — pin: and avoid: constraints survive the round trip
+    code = _make_code_list("a = 1\nb = a + 2\nlive: b\npin: b R2\navoid: a R0 R2\n")
+    back = ir_binary.decode(ir_binary.encode(code))
+    _check("IR round trip: pinned", back.pinned == {"b": 2})
+    _check("IR round trip: forbidden", back.forbidden == {"a": {0, 2}})
+
+
+# ---------------------------------------------------------------------------
+# Pipeline / allocator server (5 tests)
+# ---------------------------------------------------------------------------
+
+def test_server():
+    import asyncio
+    import shutil
+    import tempfile
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+    src = "a = b + c\nd = a * 2\nlive: d\n"
+    # 98 — the pipeline runs every stage on in-memory text
+    result = pipeline.compile_text(src, 3)
+    _check("pipeline assembly ends with the store of d",
+           result.assembly.splitlines()[-1].split() == ["MOV", "R0,", "d"])
+    _check("pipeline stats", result.stats["spilled"] == 0
+           and result.stats["asm_instructions"] == len(result.assembly.splitlines()))
+    # 99 — handle_request reports errors instead of raising
+    _check("request error: bad token",
+           not server.handle_request({"num_registers": 3, "source": "a = b $ c\n"})["ok"])
+    _check("request error: no source",
+           "source" in server.handle_request({"num_registers": 3})["error"])
+    _check("request error: missing num_registers",
+           not server.handle_request({"source": src})["ok"])
+    # 178 — true is not a register count, and a KeyError inside the
+    # pipeline is not mistaken for a missing field
+    _check("request error: num_registers true",
+           "positive integer" in server.handle_request({"num_registers": True,
+                                                        "source": src})["error"])
+    compile_text = pipeline.compile_text
+    def broken(source, num_registers):
+        raise KeyError("t9")
+    pipeline.compile_text = broken
+    try:
+        error = server.handle_request({"num_registers": 3, "source": src})["error"]
+    finally:
+        pipeline.compile_text = compile_text
+    _check("request error: internal KeyError", "missing field" not in error and "t9" in error)
+    # 181 — any other failure in a worker, or a worker dying, still
+    # gets a response
+    def crashes(source, num_registers):
+        raise RuntimeError("boom")
+    pipeline.compile_text = crashes
+    try:
+        error = server.handle_request({"num_registers": 3, "source": src})["error"]
+    finally:
+        pipeline.compile_text = compile_text
+    _check("request error: any exception", error == "internal error: RuntimeError boom")
+
+    class DeadPool(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            raise BrokenProcessPool("a worker exited")
+    srv = server.AllocatorServer(executor=DeadPool(1))
+    response = asyncio.run(srv._respond(b'{"num_registers": 3, "source": "a = 1"}'))
+    srv.executor.shutdown()
+    _check("server: dead worker reported", not response["ok"]
+           and "worker died" in response["error"])
+    # 100 — round trip over a Unix socket, several requests per connection
+    tmpdir = tempfile.mkdtemp()
+    path = os.path.join(tmpdir, "alloc.sock")
+    loop = asyncio.new_event_loop()
+    srv = server.AllocatorServer(executor=ThreadPoolExecutor(2))
+    loop.run_until_complete(srv.start_unix(path))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        responses = server.send_requests(path, [
+            {"num_registers": 3, "source": src},
+            {"num_registers": 2, "path": os.path.join(TEST_INPUTS, "1binary_parse.txt")},
+            {"num_registers": 3, "source": "a = $\n"},
+        ])
+        _check("server response count", len(responses) == 3)
+        _check("server assembly matches pipeline",
+               responses[0]["ok"] and responses[0]["assembly"] == result.assembly)
+        _check("server compiles a path",
+               responses[1]["ok"] and responses[1]["stats"]["ir_instructions"] > 0)
+        _check("server error response", not responses[2]["ok"])
+        _check("server counts requests", srv.requests_served == 3)
+    finally:
+        asyncio.run_coroutine_threadsafe(srv.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        srv.executor.shutdown()
+        shutil.rmtree(tmpdir)
+
+
+# ---------------------------------------------------------------------------
+# Batch pipeline (5 tests)
+# ---------------------------------------------------------------------------
+
+def test_batch():
+    import asyncio
+    import shutil
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    tmpdir = tempfile.mkdtemp()
+    names = ["1binary_parse.txt", "2unary_lit.txt", "4high_interfere.txt",
+             "5live_var_error.txt", "plain.txt"]
+    for name in names:
+        shutil.copy(os.path.join(TEST_INPUTS, name), tmpdir)
+    paths = [os.path.join(tmpdir, name) for name in names]
+    paths.append(os.path.join(tmpdir, "missing.txt"))
+    report = asyncio.run(batch.run_batch(paths, 3, queue_size=1, workers=2,
+                                         io_threads=2, executor=ThreadPoolExecutor(2)))
+    # 101 — good files are written, bad ones reported
+    _check("batch compiled count", report.files == 4)
+    _check("batch failures", sorted(os.path.basename(p) for p, _ in report.failed)
+           == ["5live_var_error.txt", "missing.txt"])
+    # 102 — output matches the single-file pipeline
+    with open(os.path.join(tmpdir, "1binary_parse.s")) as f:
+        written = f.read()
+    expected = pipeline.compile_file(os.path.join(TEST_INPUTS, "1binary_parse.txt"), 3)
+    _check("batch output matches pipeline", written == expected.assembly)
+    # 103 — bounded queues never hold more than queue_size items
+    _check("batch queues bounded", max(report.peak_queue.values()) <= 1)
+    _check("batch report formats", "files/s" in batch.format_report(report))
+    # 104 — binary IR inputs go through the same stages
+    with open(os.path.join(tmpdir, "bin.irb"), "wb") as f:
+        f.write(ir_binary.encode(_make_code_list("a = b * 2\nlive: a\n")))
+    report = asyncio.run(batch.run_batch([os.path.join(tmpdir, "bin.irb")], 2,
+                                         executor=ThreadPoolExecutor(1)))
+    _check("batch compiles binary IR", report.files == 1 and report.ir_instructions == 1
+           and os.path.exists(os.path.join(tmpdir, "bin.s")))
+    # 183 — a failed write keeps the previous listing and leaves no temporary
+    out_path = os.path.join(tmpdir, "bin.s")
+    with open(out_path) as f:
+        before = f.read()
+    _check_raises("batch write failure raises", TypeError, lambda: batch._write(out_path, None))
+    with open(out_path) as f:
+        _check("batch write failure keeps the listing", f.read() == before)
+    _check("batch write failure leaves no temporary",
+           not [name for name in os.listdir(tmpdir) if name.endswith(".tmp")])
+    shutil.rmtree(tmpdir)
+
+
+# ---------------------------------------------------------------------------
+# Start-up imports (3 tests)
+# ---------------------------------------------------------------------------
+
+def test_startup():
+    import subprocess
+    import main
+    probe = ("import sys, main; print(sorted(m for m in ('typing', 'asm_binary', "
+             "'ir_binary', 'asyncio', 'multiprocessing') if m in sys.modules))")
+    loaded = subprocess.run([sys.executable, "-c", probe], cwd=parent_dir,
+                            capture_output=True, text=True).stdout.strip()
+    # 105 — plain text runs do not load typing or the binary-format modules
+    _check("main imports no mode-only modules", loaded == "[]")
+    # 106 — main's copy of the binary IR magic matches ir_binary
+    _check("main IR magic matches ir_binary", main._IR_BINARY_MAGIC == ir_binary.MAGIC)
+    # 107 — Token keeps its tuple fields and keyword construction
+    token = Token(value="a", type=TokenType.VAR)
+    _check("Token fields", token.type is TokenType.VAR and token.value == "a"
+           and tuple(token) == (TokenType.VAR, "a"))
+
+
+# ---------------------------------------------------------------------------
+# Regex lexer / token positions (3 tests)
+# ---------------------------------------------------------------------------
+
+def test_lexer():
+    src = "a=  10\nb   =a+ 5\n\n    c = -b\nlive: c"
+    tok = Tokenizer.from_text(src)
+    tok.tokenize()
+    # 108 — the single-scan lexer keeps the old splitting rules
+    _check("lexer values", [t.value for t in tok.tokens] ==
+           ["a", "=", "10", "\n", "b", "=", "a", "+", "5", "\n", "\n",
+            "c", "=", "-", "b", "\n", "live", ":", "c"])
+    _check("lexer types", [t.type for t in tok.tokens[16:19]] ==
+           [TokenType.LIV, TokenType.COL, TokenType.VAR])
+    odd = Tokenizer.from_text("12ab")
+    _check_raises("digits then letters split, letters invalid", TypeError, odd.tokenize)
+    skip = Tokenizer.from_text("a\t=$ b_\r\n")
+    skip.tokenize()
+    _check("non-token characters are skipped",
+           [t.value for t in skip.tokens] == ["a", "=", "b", "\n"])
+    # 109 — repeated values share one Token
+    _check("repeated tokens are shared", tok.tokens[0] is tok.tokens[6])
+    # 110 — positions are (line, column) from the per-line arrays
+    _check("position of first token", tok.position(0) == (1, 1))
+    _check("position after skipped spaces", tok.position(2) == (1, 5))
+    _check("position on an indented line", tok.position(14) == (4, 10))
+    _check("position of an empty line's newline", tok.position(10) == (3, 1))
+    _check("position past the last token", tok.position(len(tok.tokens)) == (5, 8))
+    _check("one line start per line", len(tok.line_tokens) == 5)
+
+
+# ---------------------------------------------------------------------------
+# Error positions (4 tests)
+# ---------------------------------------------------------------------------
+
+def _parse_error(src: str):
+    """Tokenize and parse src with positions; return the error raised."""
+    tok = Tokenizer.from_text(src)
+    try:
+        tok.tokenize()
+        Parser(tok.tokens, tok.position).parse()
+    except (TypeError, ValueError) as e:
+        return e
+    return None
+
+def test_error_positions():
+    # 111 — syntax errors carry the offending token's line and column
+    e = _parse_error("a = 1\nb = a +\nc = 2 3\n")
+    _check("missing operand located", isinstance(e, ParseError)
+           and (e.line, e.column) == (2, 8) and str(e).startswith("Line 2, column 8: "))
+    e = _parse_error("a = 1\n  b c\n")
+    _check("expected-token error located", (e.line, e.column) == (2, 5)
+           and e.message == "Expected TokenType.EQ, got TokenType.VAR")
+    e = _parse_error("a = 1\n= b\n")
+    _check("bad start of line located", (e.line, e.column) == (2, 1))
+    # 112 — end of input is located after the last token
+    e = _parse_error("a = 1\nb =")
+    _check("end of file located", (e.line, e.column) == (2, 4))
+    # 113 — semantic errors point at the live variable
+    e = _parse_error("x = 5\ny = x + 1\nlive: y, z\n")
+    _check("unused live var located", (e.line, e.column) == (3, 10))
+    # 114 — invalid tokens are located by the tokenizer; no positions without one
+    e = _parse_error("a = 1\nb = a + Q\n")
+    _check("invalid token located", isinstance(e, TypeError)
+           and str(e) == "Line 2, column 9: Invalid token: Q")
+    try:
+        Parser(_make_tokens("a = 1 +\n")).parse()
+        e = None
+    except ParseError as err:
+        e = err
+    _check("no position without a position function",
+           e is not None and e.line is None and str(e) == e.message)
+
+
+# ---------------------------------------------------------------------------
+# Error-recovering parser (4 tests)
+# ---------------------------------------------------------------------------
+
+def test_recovering_parser():
+    src = ("a = 1\nb = a +\nc = Q * a\n= 4\ne = a / 2\n"
+           "live: e, z, a, y\n")
+    tok = Tokenizer.from_text(src)
+    tok.tokenize(keep_invalid=True)
+    code, diagnostics = Parser(tok.tokens, tok.position).parse_recovering()
+    # 115 — one pass reports every broken line, in order
+    _check("recovering parser finds every error",
+           [(e.line, e.column) for e in diagnostics]
+           == [(2, 8), (3, 5), (4, 1), (6, 10), (6, 16)])
+    _check("invalid token reported as such", diagnostics[1].message == "Invalid token: Q")
+    # 116 — the good lines are still parsed
+    _check("recovering parser keeps good lines",
+           _ir_strs(code) == ["a = 1", "e = a / 2"])
+    _check("unused live vars left out", code.live_on_exit == ["e", "a"])
+    # 117 — a valid input gives the same result as parse, with no diagnostics
+    with open(os.path.join(TEST_INPUTS, "1binary_parse.txt")) as f:
+        src = f.read()
+    code, diagnostics = Parser(_make_tokens(src)).parse_recovering()
+    _check("valid input: no diagnostics", diagnostics == [])
+    _check("valid input: same IR as parse",
+           _ir_strs(code) == _ir_strs(_make_code_list(src)))
+    # 118 — keep_invalid turns invalid runs into INV tokens
+    tok = Tokenizer.from_text("ab = 1\n")
+    tok.tokenize(keep_invalid=True)
+    _check("keep_invalid makes INV tokens", tok.tokens[0].type == TokenType.INV)
+
+
+# ---------------------------------------------------------------------------
+# Incremental allocator (5 tests)
+# ---------------------------------------------------------------------------
+
+def test_incremental():
+    src = "a = 1\nb = a + 2\nc = b * a\nd = c - b\nlive: d, a\n"
+    code = _make_code_list(src)
+    inc = IncrementalAllocator(code, 3)
+    # 119 — insert: graph matches a full rebuild, colouring stays valid
+    inc.insert(2, ThreeAdrInst("e", "a", "+", "b"))
+    _check("insert: graph equals rebuild",
+           inc.graph.graph == build_interfere_graph(code).graph)
+    _check("insert: colouring valid",
+           all(inc.color[x] != inc.color[y] for x in inc.graph.graph
+               for y in inc.graph.graph[x]))
+    _check("insert: new edges counted", inc.last_edit["edges_added"] > 0)
+    # 120 — remove: the edit is undone exactly
+    before = build_interfere_graph(_make_code_list(src)).graph
+    removed = inc.remove(2)
+    _check("remove returns the instruction", str(removed) == "e = a + b")
+    _check("remove: graph equals original", inc.graph.graph == before)
+    _check("remove: unused node dropped", "e" not in inc.color)
+    # 121 — replace: liveness only recomputed back to where it settles
+    inc.replace(3, ThreeAdrInst("d", "c", "-", "a"))
+    _check("replace: graph equals rebuild",
+           inc.graph.graph == build_interfere_graph(code).graph)
+    _check("replace: no full recolour", inc.full_recolours == 0)
+    # 122 — an edit the local repair cannot absorb falls back to a full allocation
+    code = _make_code_list("a = 1\nb = 2\nc = a + b\nlive: c\n")
+    inc = IncrementalAllocator(code, 2)
+    inc.insert(2, ThreeAdrInst("d", "a", "+", "b"))    # a, b, d form a triangle
+    _check("full recolour counted", inc.full_recolours == 1 and inc.last_edit["full"])
+    _check("full recolour: every node coloured or spilled",
+           all(v in inc.color or v in inc.spilled for v in inc.graph.graph))
+    _check_raises("insert out of bounds raises IndexError", IndexError,
+                  lambda: inc.insert(99, ThreeAdrInst("x", "1")))
+    # 179 — an edit that divides into its own divisor still generates
+    code = _make_code_list("a = 1\nb = 2\nlive: a, b\n")
+    inc = IncrementalAllocator(code, 3)
+    inc.insert(2, ThreeAdrInst("a", "c", "/", "a"))
+    lines = str(generate_assembly(code, inc.color, 3)).splitlines()
+    reg = f"R{inc.color['a']}"
+    _check("self-division edit: list keeps its indices", len(code.instructions) == 3)
+    _check("self-division edit: divides by the stored copy",
+           [line.split() for line in lines[2:5]] ==
+           [["MOV", f"{reg},", "a"], ["MOV", f"R{inc.color['c']},", reg], ["DIV", "a,", reg]])
+    inc.replace(2, ThreeAdrInst("b", "a", "/", "b"))
+    _check("self-division replace: generates",
+           "DIV    b" in str(generate_assembly(code, inc.color, 3)))
+
+
+# ---------------------------------------------------------------------------
+# Colour-symmetry breaking (5 tests)
+# ---------------------------------------------------------------------------
+
+def test_symmetry_breaking():
+    # 123 — a clique of k + 1 nodes is proved uncolourable without trying
+    #       every renaming of the colours (k! = 40320 branches for k = 8)
+    g = InterferenceGraph()
+    nodes = [f"v{i}" for i in range(9)]
+    for i, a in enumerate(nodes):
+        for b in nodes[i + 1:]:
+            g.add_edge(a, b)
+    _check("K9 with 8 colours: no colouring", g.allocate_registers(8, nodes) is False)
+    _check("K9 with 8 colours: one search node per level",
+           g.search_nodes == len(nodes))
+    # 124 — the first colouring found is still the lowest-numbered one
+    g = InterferenceGraph()
+    g.add_edge("a", "b")
+    g.add_edge("b", "c")
+    g.add_edge("c", "d")
+    g.add_edge("d", "a")
+    _check("4-cycle coloured with 2 colours",
+           g.allocate_registers(3, ["a", "b", "c", "d"])
+           and g.color == {"a": 0, "b": 1, "c": 0, "d": 1})
+    # 125 — colours already assigned count as in use
+    g = InterferenceGraph()
+    g.add_edge("a", "b")
+    g.color["a"] = 2
+    _check("precoloured node: search extends the partial colouring",
+           g.allocate_registers(3, ["b"]) and g.color["b"] == 0)
+    # 173 — the search does not recurse: a 40x40 torus (no node has fewer
+    #       than 4 neighbours) is searched node by node
+    g = InterferenceGraph()
+    for i in range(40):
+        for j in range(40):
+            g.add_edge(f"v{i}_{j}", f"v{(i + 1) % 40}_{j}")
+            g.add_edge(f"v{i}_{j}", f"v{i}_{(j + 1) % 40}")
+    _check("torus: exact search without recursion",
+           allocate_with_spills(g, 4) == [] and len(g.color) == 1600
+           and all(g.color[a] != g.color[b] for a in g.graph for b in g.graph[a]))
+    # 174 — a budgeted search gives up and leaves the nodes uncoloured
+    g = InterferenceGraph()
+    for i, a in enumerate(nodes):
+        for b in nodes[i + 1:]:
+            g.add_edge(a, b)
+    _check("budget: search gives up", g.allocate_registers(8, nodes, budget=3) is None
+           and g.color == {} and g.search_nodes == 3)
+
+
+# ---------------------------------------------------------------------------
+# Portfolio colouring (5 tests)
+# ---------------------------------------------------------------------------
+
+def test_portfolio():
+    triangle = InterferenceGraph()
+    triangle.add_edge("a", "b")
+    triangle.add_edge("b", "c")
+    triangle.add_edge("c", "a")
+    # 126 — infeasibility proved by whichever search finishes first
+    result = portfolio.colour_portfolio(triangle, 2, workers=3)
+    _check("portfolio: triangle has no 2-colouring", result.colourable is False)
+    _check("portfolio: winner named",
+           result.strategy in portfolio.strategies(3))
+    # 127 — a colouring found by a worker is stored on the graph
+    result = portfolio.colour_portfolio(triangle, 3, workers=2)
+    _check("portfolio: triangle 3-coloured",
+           result.colourable is True
+           and sorted(triangle.color.values()) == [0, 1, 2])
+    # 128 — strategy list: fixed orders first, then randomized restarts
+    _check("strategies(5)", portfolio.strategies(5)
+           == ["given", "degree", "bfs", "restart-1", "restart-2"])
+    # 129 — used as allocate_with_spills' search (a 4-cycle has no node of
+    #       degree < 2, so simplification alone cannot colour it)
+    g = InterferenceGraph()
+    for a, b in (("a", "b"), ("b", "c"), ("c", "d"), ("d", "a")):
+        g.add_edge(a, b)
+    _check("portfolio_search: 4-cycle needs no spill",
+           allocate_with_spills(g, 2, portfolio.portfolio_search) == [])
+    _check("portfolio_search: colouring valid",
+           len(g.color) == 4 and all(g.color[a] != g.color[b]
+                                     for a in g.graph for b in g.graph[a]))
+    # 184 — if every worker dies, the search runs in process
+    def workers_died(*args, **kwargs):
+        raise RuntimeError("every portfolio worker exited without a result")
+    colour_portfolio, portfolio.colour_portfolio = portfolio.colour_portfolio, workers_died
+    try:
+        g.color = {}
+        found = portfolio.portfolio_search(g, 2, list(g.graph))
+    finally:
+        portfolio.colour_portfolio = colour_portfolio
+    _check("portfolio_search: falls back when workers die", found and len(g.color) == 4)
+
+
+# ---------------------------------------------------------------------------
+# Graph-shape colouring cache (5 tests)
+# ---------------------------------------------------------------------------
+
+def _graph_of(edges):
+    g = InterferenceGraph()
+    for a, b in edges:
+        g.add_edge(a, b)
+    return g
+
+
+def test_shape_cache():
+    # K4 minus one edge, plus a pendant node, under two sets of names
+    g1 = _graph_of([("a", "b"), ("a", "c"), ("a", "d"), ("b", "c"), ("c", "d"), ("d", "e")])
+    g2 = _graph_of([("x", "y"), ("q", "x"), ("w", "x"), ("q", "y"), ("w", "q"), ("p", "w")])
+    # 130 — the canonical form does not depend on the names
+    nodes1, edges1 = canonical_form(g1)
+    nodes2, edges2 = canonical_form(g2)
+    _check("canonical form: renamed graph has same edges", edges1 == edges2)
+    _check("canonical form: node order maps d -> w", nodes2[nodes1.index("d")] == "w")
+    _check("canonical form: different shape differs",
+           canonical_form(_graph_of([("a", "b"), ("b", "c")]))[1] != edges1)
+    # 131 — the second shape is coloured by relabelling the first
+    cache = ColouringCache()
+    spilled1 = cache.allocate(g1, 2)
+    spilled2 = cache.allocate(g2, 2)
+    _check("cache: miss then hit", cache.misses == 1 and cache.hits == 1)
+    _check("cache: relabelled spills", len(spilled1) == len(spilled2)
+           and [nodes2[nodes1.index(v)] for v in spilled1] == spilled2)
+    _check("cache: relabelled colouring valid",
+           all(g2.color[a] != g2.color[b] for a in g2.color for b in g2.graph[a]
+               if b in g2.color))
+    _check("cache: hit rate", cache.stats()["hit_rate"] == 0.5)
+    # 132 — graphs simplification colours alone bypass the cache
+    cache.allocate(_graph_of([("a", "b")]), 2)
+    _check("cache: simple graph bypassed", cache.bypassed == 1 and len(cache.entries) == 1)
+    # 133 — least recently used shape evicted
+    small = ColouringCache(maxsize=1)
+    small.allocate(g1, 2)
+    small.allocate(_graph_of([("a", "b"), ("a", "c"), ("a", "d"),
+                              ("b", "c"), ("b", "d"), ("c", "d")]), 3)
+    _check("cache: LRU eviction", len(small.entries) == 1
+           and next(iter(small.entries))[0] == 3)
+    # 172 — only the core is cached; a large core bypasses the cache
+    cache = ColouringCache()
+    pairs = [(f"p{i}", f"q{i}") for i in range(200)]
+    first = _graph_of([("a", "b"), ("a", "c"), ("a", "d"), ("b", "c"), ("c", "d")] + pairs)
+    second = _graph_of([("x", "y"), ("q", "x"), ("w", "x"), ("q", "y"), ("w", "q"),
+                        ("w", "p")] + pairs[:50])
+    spilled = cache.allocate(first, 2)
+    spilled2 = cache.allocate(second, 2)
+    _check("cache: same core, different graph hits",
+           cache.hits == 1 and len(second.color) + len(spilled2) == len(second.graph)
+           and all(second.color[a] != second.color[b] for a in second.color
+                   for b in second.graph[a] if b in second.color))
+    clique = _graph_of([(f"v{i}", f"v{j}") for i in range(80) for j in range(i + 1, 80)])
+    _check("cache: large core bypassed", cache.allocate(clique, 8)
+           and cache.bypassed == 1 and len(cache.entries) == 1)
+
+
+# ---------------------------------------------------------------------------
+# Frozen graph / concurrent allocation (4 tests)
+# ---------------------------------------------------------------------------
+
+def test_frozen_graph():
+    src = "a = 1\nb = 2\nc = a + b\nd = c * a\ne = d - b\nf = e / c\nlive: f, a, b\n"
+    graph = build_interfere_graph(_make_code_list(src))
+    frozen = graph.freeze()
+    # 134 — the snapshot cannot be changed, and does not follow the graph
+    def assign():
+        frozen.graph["z"] = frozenset()
+    _check_raises("frozen graph: item assignment raises", TypeError, assign)
+    _check_raises("frozen graph: edge sets are frozen", AttributeError,
+                  lambda: frozen.graph["a"].add("z"))
+    graph.add_edge("a", "zz")
+    _check("frozen graph: later edits not seen", "zz" not in frozen.graph)
+    graph.remove_node("zz")
+    # 135 — allocating a frozen graph leaves it uncoloured and unchanged
+    state = allocate_frozen(frozen, 3)
+    expected = allocate_with_spills(graph, 3)
+    _check("allocate_frozen: same as allocate_with_spills",
+           state.color == graph.color and state.spilled == expected)
+    _check("allocate_frozen: snapshot has no colouring",
+           not hasattr(frozen, "color") and str(frozen) == str(FrozenGraph(graph.graph)))
+    # 136 — many register counts at once on one shared graph
+    counts = [2, 3, 4, 5, 6] * 4
+    states = allocate_concurrently(frozen, counts, max_workers=8)
+    results = []
+    for k, state in zip(counts, states):
+        allocate_with_spills(graph, k)
+        results.append(state.num_registers == k and state.color == graph.color)
+    _check("allocate_concurrently: every result matches a sequential run", all(results))
+    # 137 — jobs may name their own search
+    calls = []
+    def search(g, k, order):
+        calls.append(k)
+        return g.allocate_registers(k, order)
+    states = allocate_concurrently(frozen, [(2, search), 6])
+    _check("allocate_concurrently: per-job search used", calls == [2]
+           and states[1].spilled == [])
+
+
+# ---------------------------------------------------------------------------
+# Parallel chunked parsing (5 tests)
+# ---------------------------------------------------------------------------
+
+def _parse_in_chunks(path, num_chunks):
+    ranges = parallel_parse.chunk_ranges(path, num_chunks)
+    return parallel_parse.merge_chunks(
+        [parallel_parse._parse_chunk(path, start, end) for start, end in ranges])
+
+
+def _parse_sequentially(path):
+    tokenizer = Tokenizer(path)
+    tokenizer.tokenize()
+    return Parser(tokenizer.tokens, tokenizer.position).parse()
+
+
+def _error_of(fn):
+    try:
+        fn()
+    except (TypeError, ValueError) as e:
+        return type(e), str(e)
+    return None
+
+
+def test_parallel_parse():
+    path = os.path.join(TEST_INPUTS, "1binary_parse.txt")
+    with open(path) as f:
+        src = f.read()
+    expected = _make_code_list(src)
+    # 138 — chunks end just after a newline and cover the whole file
+    ranges = parallel_parse.chunk_ranges(path, 4)
+    with open(path, "rb") as f:
+        data = f.read()
+    _check("chunk_ranges: contiguous and complete",
+           ranges[0][0] == 0 and ranges[-1][1] == len(data)
+           and all(a[1] == b[0] for a, b in zip(ranges, ranges[1:])))
+    _check("chunk_ranges: split after newlines",
+           all(data[end - 1:end] == b"\n" for _, end in ranges[:-1]))
+    # 139 — concatenated chunks give the sequential result
+    code = _parse_in_chunks(path, 50)
+    _check("chunked parse: same instructions", _ir_strs(code) == _ir_strs(expected))
+    _check("chunked parse: same live vars", code.live_on_exit == expected.live_on_exit)
+    # 140 — live: checked against the merged used-variable set, with file lines
+    bad = os.path.join(TEST_INPUTS, "5live_var_error.txt")
+    _check("chunked parse: live error matches sequential",
+           _error_of(lambda: _parse_in_chunks(bad, 8))
+           == _error_of(lambda: _parse_sequentially(bad)))
+    # 141 — an invalid token anywhere beats an earlier syntax error
+    tmp = os.path.join(TEST_INPUTS, "_chunks.txt")
+    with open(tmp, "w") as f:
+        f.write("a = 1\nb = a +\n" + "c = a\n" * 20 + "d = Q\nlive: c\n")
+    try:
+        _check("chunked parse: token error first, with file line",
+               _error_of(lambda: _parse_in_chunks(tmp, 6))
+               == (TypeError, "Line 23, column 5: Invalid token: Q"))
+        # 142 — the process pool gives the same result
+        with open(tmp, "w") as f:
+            f.write(src)
+        code = parallel_parse.parse_file(tmp, workers=2)
+        _check("parse_file: same as sequential", _ir_strs(code) == _ir_strs(expected))
+    finally:
+        os.remove(tmp)
+
+
+# ---------------------------------------------------------------------------
+# Shared-memory hand-off (5 tests)
+# ---------------------------------------------------------------------------
+
+def test_shared_ir():
+    code = _make_code_list("a = 5\nb = a + 1\nc = -b\nd = c / b\ne = a * d\nlive: e, b\n")
+    graph = build_interfere_graph(code)
+    with shared_ir.SharedExport(graph, code) as shared:
+        with shared_ir.attach(shared.name) as view:
+            # 143 — the instruction list survives the round trip
+            copy = view.to_code_list()
+            _check("shared IR: same instructions", _ir_strs(copy) == _ir_strs(code))
+            _check("shared IR: same live vars", copy.live_on_exit == ["e", "b"])
+            # 144 — node ids come first, rows are views of neighbour ids
+            _check("shared graph: node ids in graph order",
+                   view.names_of(range(view.num_nodes)) == list(graph.graph))
+            _check("shared graph: rows are memoryviews",
+                   all(isinstance(row, memoryview) for row in view.graph.values()))
+            _check("shared graph: same adjacency",
+                   view.to_interference_graph().graph == graph.graph)
+            # 145 — the view can be coloured by id like a FrozenGraph
+            state = allocate_frozen(view, 2)
+            spilled = allocate_with_spills(graph, 2)
+            _check("shared graph: allocate_frozen by id",
+                   view.names_of(state.spilled) == spilled
+                   and {view.names[i]: c for i, c in state.color.items()} == graph.color)
+        # 146 — closing a view releases its rows
+        _check("shared view: closed view has no graph", len(view.graph) == 0)
+        name = shared.name
+    _check_raises("shared export: closed block cannot be attached",
+                  FileNotFoundError, lambda: shared_ir.attach(name))
+    # 147 — a graph exported on its own has no instruction list
+    with shared_ir.SharedExport(graph) as shared:
+        with shared_ir.attach(shared.name) as view:
+            _check_raises("shared export: no IR exported",
+                          ValueError, view.to_code_list)
+
+
+# ---------------------------------------------------------------------------
+# Deterministic output (3 tests)
+# ---------------------------------------------------------------------------
+
+def test_determinism():
+    import subprocess
+    probe = ("import hashlib, os, pipeline\n"
+             "from allocator import build_interfere_graph\n"
+             "inputs = os.path.join('test_drivers', 'test_inputs')\n"
+             "out = []\n"
+             "for name in sorted(os.listdir(inputs)):\n"
+             "    if not name.endswith('.txt'):\n"
+             "        continue\n"
+             "    for k in (2, 3, 4):\n"
+             "        try:\n"
+             "            code = pipeline.parse_text(open(os.path.join(inputs, name)).read())\n"
+             "            out.append(str(build_interfere_graph(code)))\n"
+             "            out.append(pipeline.compile_code_list(code, k).assembly)\n"
+             "        except (TypeError, ValueError) as e:\n"
+             "            out.append(str(e))\n"
+             "print(len(out), hashlib.sha1(''.join(out).encode()).hexdigest())\n")
+    outputs = set()
+    for seed in ("0", "1", "2", "3"):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        outputs.add(subprocess.run([sys.executable, "-c", probe], cwd=parent_dir, env=env,
+                                   capture_output=True, text=True).stdout.strip())
+    # 148 — graphs and assembly do not depend on string hashing
+    _check("same graphs and assembly under 4 hash seeds",
+           len(outputs) == 1 and not next(iter(outputs)).startswith("0 "))
+    # 149 — nodes and neighbours iterate in insertion order
+    g = InterferenceGraph()
+    for a, b in [("q", "c"), ("q", "a"), ("b", "q"), ("q", "z")]:
+        g.add_edge(a, b)
+    _check("adjacency in insertion order",
+           list(g.graph) == ["q", "c", "a", "b", "z"] and list(g.graph["q"]) == ["c", "a", "b", "z"])
+    g.remove_edge("q", "a")
+    g.add_edge("q", "a")
+    _check("re-added edge goes last", list(g.graph["q"]) == ["c", "b", "z", "a"])
+    # 150 — snapshots keep the order
+    _check("frozen graph keeps neighbour order",
+           str(g.freeze()) == str(g) and g.freeze().graph["q"] == ("c", "b", "z", "a"))
+
+
+# ---------------------------------------------------------------------------
+# Memory profiling (4 tests)
+# ---------------------------------------------------------------------------
+
+def test_memory_profile():
+    import subprocess
+    profiler = MemoryProfiler(top_sites=1)
+    profiler.start()
+    try:
+        with profiler.phase("keep"):
+            kept = bytearray(1_000_000)
+        with profiler.phase("temporary"):
+            len(bytearray(2_000_000))
+        try:
+            with profiler.phase("fails"):
+                raise ValueError("bad block")
+        except ValueError:
+            pass
+    finally:
+        profiler.stop()
+    keep, temporary, fails = profiler.phases
+    # 151 — retained bytes stay, a freed temporary only shows in the peak
+    _check("memory: retained allocation", keep.retained >= 1_000_000 and keep.peak >= keep.retained)
+    _check("memory: temporary only in peak",
+           temporary.peak >= 2_000_000 and temporary.retained < 100_000)
+    # 152 — the top site is the line that allocated
+    _check("memory: top allocation site",
+           keep.sites[0][0].startswith("test_all.py:") and keep.sites[0][1] >= 1_000_000)
+    # 153 — a phase that raises is still recorded
+    _check("memory: failed phase recorded", fails.phase == "fails" and len(kept) == 1_000_000)
+    _check("memory: report lists phases",
+           all(name in profiler.report() for name in ("keep", "temporary", "fails")))
+    # 154 — main.py --memory reports every phase of a run
+    src = os.path.join(TEST_INPUTS, "_memory.txt")
+    with open(src, "w") as f:
+        f.write("a = 1\nb = a + 2\nc = b * a\nlive: c\n")
+    try:
+        out = subprocess.run([sys.executable, "main.py", "3", src, "--memory"], cwd=parent_dir,
+                             capture_output=True, text=True).stdout
+        report = out[out.find("Memory by phase:"):]
+        _check("main --memory reports each phase",
+               all(f"\n{phase} " in report for phase in
+                   ("read", "tokenize", "parse", "optimise_ir", "graph", "allocate",
+                    "generate", "peephole", "write")))
+    finally:
+        for path in (src, os.path.splitext(src)[0] + ".s"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# ---------------------------------------------------------------------------
+# Register constraints (11 tests)
+# ---------------------------------------------------------------------------
+
+def _valid_colouring(graph):
+    return all(graph.color[x] != graph.color[y] for x in graph.color
+               for y in graph.graph[x] if y in graph.color)
+
+
+def test_register_constraints():
+    src = ("a = 1\nb = a + 2\nc = b * a\nd = c - b\nlive: d, a\n"
+           "pin: d R2, a R0\navoid: c R0 R2, b R1\n")
+    # 155 — pin, avoid and register tokens
+    types = [t.type for t in _make_tokens("pin: a R0\navoid: b R1 R12\n")]
+    _check("pin/avoid/register tokens",
+           types[:4] == [TokenType.PIN, TokenType.COL, TokenType.VAR, TokenType.REG]
+           and types[5] == TokenType.AVD and types[-2:] == [TokenType.REG, TokenType.NL])
+    # 156 — the parser records the constraints on the code list
+    code = _make_code_list(src)
+    _check("parser: pins", code.pinned == {"d": 2, "a": 0})
+    _check("parser: forbidden registers", code.forbidden == {"c": {0, 2}, "b": {1}})
+    _check("parser: live still set", code.live_on_exit == ["d", "a"])
+    # 157 — malformed and unused constraints are rejected
+    _check_raises("parser: pin with two registers", ParseError,
+                  lambda: _make_code_list("a = 1\nlive: a\npin: a R0 R1\n"))
+    _check_raises("parser: avoid without a register", ParseError,
+                  lambda: _make_code_list("a = 1\nlive: a\navoid: a\n"))
+    _check("parser: unused pinned variable",
+           "Pinned variable 'z'" in str(_error_of(
+               lambda: _make_code_list("a = 1\nlive: a\npin: z R0\n"))))
+    # 177 — only ASCII digits make a register or literal
+    _check_raises("get_type('R²') raises TypeError", TypeError, lambda: Token.get_type("R²"))
+    _check_raises("get_type('½') raises TypeError", TypeError, lambda: Token.get_type("½"))
+    _check("pin: a R² is a located error", "Line 2, column 8" in str(_error_of(
+        lambda: _make_code_list("a = 1\npin: a R²\nlive: a\n"))))
+    # 158 — allocation honours pins and forbidden registers
+    graph = build_interfere_graph(code)
+    spilled = allocate_with_spills(graph, 3)
+    _check("allocate: pins honoured", spilled == [] and graph.color["d"] == 2
+           and graph.color["a"] == 0)
+    _check("allocate: forbidden avoided", graph.color["c"] == 1
+           and graph.color["b"] != 1 and _valid_colouring(graph))
+    # 159 — pinned nodes are pre-coloured and left out of the search
+    graph = build_interfere_graph(code)
+    graph.color = {}
+    found = graph.allocate_registers(3, list(graph.graph))
+    _check("allocate_registers: pins applied", found and graph.color["d"] == 2
+           and graph.color["a"] == 0 and graph.color["c"] not in (0, 2)
+           and _valid_colouring(graph))
+    _check("allocate_registers: pinned nodes not searched",
+           graph.search_nodes == len(graph.graph) - 2 + 1)
+    # 160 — clashing pins raise
+    clash = build_interfere_graph(_make_code_list(
+        "a = 1\nb = a + 2\nc = b * a\nlive: c, a\npin: c R1, a R1\n"))
+    _check_raises("allocate: interfering pins clash", ValueError,
+                  lambda: allocate_with_spills(clash, 3))
+    _check("allocate_registers: clashing pins fail",
+           clash.allocate_registers(3, list(clash.graph)) is False)
+    _check_raises("allocate: pin beyond the registers", ValueError,
+                  lambda: allocate_with_spills(build_interfere_graph(code), 2))
+    tight = build_interfere_graph(_make_code_list(
+        "a = 1\nb = 2\nc = a + b\nd = c + a\nlive: d, b, a\npin: a R1\n"))
+    _check_raises("allocate: pin on the scratch register", ValueError,
+                  lambda: allocate_with_spills(tight, 2))
+    # 161 — a variable forbidden every register is spilled, pinned ones never
+    graph = build_interfere_graph(_make_code_list(
+        "a = 1\nb = 2\nc = a + b\nd = c + a\nlive: d, b, a\n"
+        "pin: b R0\navoid: a R0 R1 R2\n"))
+    spilled = allocate_with_spills(graph, 3)
+    _check("allocate: fully forbidden variable spilled", "a" in spilled
+           and "b" not in spilled and graph.color["b"] == 0 and _valid_colouring(graph))
+    # 162 — the parallel parser keeps the constraints
+    tmp = os.path.join(TEST_INPUTS, "_constraints.txt")
+    with open(tmp, "w") as f:
+        f.write(src)
+    try:
+        merged = _parse_in_chunks(tmp, 5)
+    finally:
+        os.remove(tmp)
+    _check("chunked parse: constraints kept",
+           merged.pinned == code.pinned and merged.forbidden == code.forbidden)
+    # 163 — incremental edits keep the pins
+    inc = IncrementalAllocator(_make_code_list(src), 3)
+    inc.insert(2, ThreeAdrInst("e", "a", "+", "b"))
+    _check("incremental: pins kept after insert", inc.color["d"] == 2
+           and inc.color["a"] == 0 and inc.color["c"] == 1 and _valid_colouring(inc.graph))
+    # 164 — the text form round-trips the constraints
+    again = _make_code_list(ir_binary.to_text(code))
+    _check("to_text: constraints round-trip",
+           again.pinned == code.pinned and again.forbidden == code.forbidden)
+
+# ---------------------------------------------------------------------------
+# Cost-driven colouring (6 tests)
+# ---------------------------------------------------------------------------
+
+def _cheapest_by_enumeration(code, graph, num_registers, metric):
+    from itertools import product
+    nodes = list(graph.color)
+    costs = []
+    for regs in product(range(num_registers), repeat=len(nodes)):
+        colour = dict(zip(nodes, regs))
+        if all(colour[x] != colour[y] for x in nodes for y in graph.graph[x]):
+            costs.append(colouring_cost(code, colour, num_registers, metric))
+    return min(costs)
+
+
+def test_cost_search():
+    import subprocess
+    src = "b = a + 1\nc = b - a\nd = -c\ne = d * b\nf = e\nlive: f, a\n"
+    # 165 — the cost model prices operations and memory operands
+    add = AsmInst(AsmOperator.ADD, register_operand(1), register_operand(0))
+    load = AsmInst(AsmOperator.MVR, variable_operand("x"), register_operand(0))
+    store = AsmInst(AsmOperator.MVD, register_operand(0), variable_operand("x"))
+    mul = AsmInst(AsmOperator.MUL, immediate_operand(-1), register_operand(0))
+    _check("cost: register ADD is 1 cycle", add.cost() == 1)
+    _check("cost: memory operands add cycles",
+           load.cost() == 3 and store.cost() == 3 and mul.cost() == 3)
+    _check("cost: instruction metric counts 1", mul.cost("instructions") == 1)
+    _check_raises("cost: unknown metric", ValueError, lambda: add.cost("bytes"))
+    listing = AsmInstList(2)
+    for inst in (add, load, store, mul):
+        listing.add_inst(inst)
+    _check("cost: listing sums its instructions",
+           listing.cost() == 10 and listing.cost("instructions") == 4)
+    # 166 — colouring_cost is the listing's cost without self-moves
+    code = _make_code_list(src)
+    graph = build_interfere_graph(code)
+    allocate_with_spills(graph, 3)
+    asm = generate_assembly(code, graph.color, 3)
+    remove_self_moves(asm)
+    _check("colouring_cost matches the listing",
+           colouring_cost(code, graph.color, 3) == asm.cost()
+           and colouring_cost(code, graph.color, 3, "instructions") == len(asm.instructions))
+    # 167 — the search finds the cheapest valid colouring
+    for metric in ("cycles", "instructions"):
+        graph = build_interfere_graph(code)
+        allocate_with_spills(graph, 3)
+        result = cheapest_colouring(code, graph, 3, metric)
+        _check(f"cost search ({metric}): optimal and valid",
+               result.optimal and _valid_colouring(graph) and set(graph.color) == set(graph.graph)
+               and result.cost <= result.initial_cost
+               and result.cost == colouring_cost(code, graph.color, 3, metric)
+               and result.cost == _cheapest_by_enumeration(code, graph, 3, metric))
+    # 168 — a spent budget keeps a valid colouring that is no worse
+    big = _make_code_list("".join(f"t{i} = t{i - 1} + t{i // 2}\n" for i in range(1, 60))
+                          + "live: t59, t30, t0\n")
+    graph = build_interfere_graph(big)
+    allocate_with_spills(graph, 4)
+    result = cheapest_colouring(big, graph, 4, budget=1)
+    _check("cost search: budget reached", not result.optimal and result.search_nodes >= 1)
+    _check("cost search: budgeted result valid", _valid_colouring(graph)
+           and result.cost <= result.initial_cost
+           and result.cost == colouring_cost(big, graph.color, 4))
+    # 169 — pins, forbidden registers and spills are kept
+    tight = _make_code_list("a = 1\nb = 2\nc = 3\nd = a + b\ne = d + c\nf = e\n"
+                            "live: f, a, b, c\npin: b R0\navoid: d R1\n")
+    graph = build_interfere_graph(tight)
+    spilled = allocate_with_spills(graph, 3)
+    kept = set(graph.color)
+    cheapest_colouring(tight, graph, 3)
+    _check("cost search: constraints and spills kept", spilled and set(graph.color) == kept
+           and graph.color["b"] == 0 and graph.color.get("d") != 1
+           and 2 not in graph.color.values() and _valid_colouring(graph))
+    _check_raises("cost search: unknown metric", ValueError,
+                  lambda: cheapest_colouring(code, graph, 3, "bytes"))
+    # 170 — main.py reports the chosen cost
+    path = os.path.join(TEST_INPUTS, "_cost.txt")
+    with open(path, "w") as f:
+        f.write(src)
+    try:
+        run = lambda *flags: subprocess.run([sys.executable, "main.py", "3", path, *flags],
+                                            cwd=parent_dir, capture_output=True, text=True)
+        out = run("--min-cycles").stdout
+        _check("main --min-cycles reports the cost", "Estimated cost (cycles): " in out)
+        _check("main: cost flags exclusive",
+               run("--min-cycles", "--min-instructions").returncode == 1)
+    finally:
+        for leftover in (path, os.path.splitext(path)[0] + ".s"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+
+
 # ---------------------------------------------------------------------------
 # Runner
 # ---------------------------------------------------------------------------
@@ -409,6 +1657,81 @@ def run_all():
     print("\n--- AsmInst / AsmInstList / target ---")
     test_target()
 
+    print("\n--- Spilling allocator / spill code ---")
+    test_spill()
+
+    print("\n--- Peephole optimiser ---")
+    test_peephole()
+
+    print("\n--- IR optimiser ---")
+    test_ir_optimiser()
+
+    print("\n--- Local value numbering ---")
+    test_value_numbering()
+
+    print("\n--- Streaming assembly writer ---")
+    test_stream()
+
+    print("\n--- Interned operands ---")
+    test_interned_operands()
+
+    print("\n--- Binary assembly format ---")
+    test_asm_binary()
+
+    print("\n--- Binary IR format ---")
+    test_ir_binary()
+
+    print("\n--- Pipeline / allocator server ---")
+    test_server()
+
+    print("\n--- Batch pipeline ---")
+    test_batch()
+
+    print("\n--- Start-up imports ---")
+    test_startup()
+
+    print("\n--- Regex lexer / token positions ---")
+    test_lexer()
+
+    print("\n--- Error positions ---")
+    test_error_positions()
+
+    print("\n--- Error-recovering parser ---")
+    test_recovering_parser()
+
+    print("\n--- Incremental allocator ---")
+    test_incremental()
+
+    print("\n--- Colour-symmetry breaking ---")
+    test_symmetry_breaking()
+
+    print("\n--- Portfolio colouring ---")
+    test_portfolio()
+
+    print("\n--- Graph-shape colouring cache ---")
+    test_shape_cache()
+
+    print("\n--- Frozen graph / concurrent allocation ---")
+    test_frozen_graph()
+
+    print("\n--- Parallel chunked parsing ---")
+    test_parallel_parse()
+
+    print("\n--- Shared-memory hand-off ---")
+    test_shared_ir()
+
+    print("\n--- Deterministic output ---")
+    test_determinism()
+
+    print("\n--- Memory profiling ---")
+    test_memory_profile()
+
+    print("\n--- Register constraints ---")
+    test_register_constraints()
+
+    print("\n--- Cost-driven colouring ---")
+    test_cost_search()
+
     print("\n" + "=" * 50)
     total = _passed + _failed
     print(f"Results: {_passed}/{total} passed", end="")
@@ -1,12 +1,17 @@
 """
 Summary: Handles lexical analysis of the input file, converting raw characters
-    into a sequence of typed tokens for use by the parser.
+    into a sequence of typed tokens for use by the parser. Tokenizing is a
+    single scan with one compiled pattern; token positions are kept per
+    line rather than per token.
 
 Authors: Anna Running Rabbit, Jordan Senko, and Joseph Mills
 Date: March 27, 2026
 """
 
-from typing import NamedTuple
+import re
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
 from enum import Enum
 
 class TokenType(Enum):
@@ -15,6 +20,9 @@ class TokenType(Enum):
     LIT = "literal"
     EQ = "equality"
     LIV = "live"
+    PIN = "pin"
+    AVD = "avoid"
+    REG = "register"
     COL = "colon"
     COM = "comma"
     NL = "newline"
@@ -27,9 +35,23 @@ _SINGLE_CHAR_TYPES = {
     "\n": TokenType.NL, "=": TokenType.EQ,
 }
 
-class Token(NamedTuple):
-    type: TokenType
-    value: str
+# The lexer's master pattern: one alternative per kind of token, captured
+# by the single group, each preceded by any characters that cannot start
+# a token (spaces, tabs, stray punctuation), which are skipped as the old
+# character-by-character scan skipped them. Alphanumeric runs are split
+# exactly as before; Token.get_type then decides what each one is.
+_TOKEN_RE = re.compile(r"(?:[^\w+\-*/=\n:,]|_)*(\n|[-+*/=:,]|\d+|[^\W\d_][^\W_]*)")
+
+def _is_digits(text: str) -> bool:
+    """Return True if text is a run of ASCII digits. str.isnumeric also
+    accepts characters such as '²' and '½', which int() rejects."""
+    return text.isascii() and text.isdigit()
+
+class Token(namedtuple("Token", ["type", "value"])):
+    """A (type, value) pair: a TokenType and the token's source text.
+    Built on collections.namedtuple rather than typing.NamedTuple, which
+    would load the typing module on every start-up."""
+    __slots__ = ()
 
     def __str__(self):
         """
@@ -47,7 +69,8 @@ class Token(NamedTuple):
         Determines the TokenType of a given string.
         Args:
             char: The string to classify (a single character or a
-                multi-character token such as a variable name or 'live').
+                multi-character token such as a variable name, a keyword
+                ('live', 'pin', 'avoid') or a register such as 'R0').
         Returns:
             TokenType: The corresponding token type.
         Raises:
@@ -57,11 +80,17 @@ class Token(NamedTuple):
             return _SINGLE_CHAR_TYPES[char]
         if char == "live":
             return TokenType.LIV
-        if char.isnumeric():
+        if char == "pin":
+            return TokenType.PIN
+        if char == "avoid":
+            return TokenType.AVD
+        if char[0] == "R" and len(char) > 1 and _is_digits(char[1:]):
+            return TokenType.REG
+        if _is_digits(char):
             return TokenType.LIT
         if len(char) == 1 and char.islower() and char != "t":
             return TokenType.VAR
-        if char[0] == "t" and len(char) > 1 and char[1:].isnumeric():
+        if char[0] == "t" and len(char) > 1 and _is_digits(char[1:]):
             return TokenType.VAR
         raise TypeError(f"Invalid token: {char}")
 
@@ -80,10 +109,28 @@ class Tokenizer:
             with open(file_name) as f:
                 self.content = f.read()
             self.tokens = []
-            self._pos = 0
+            self.line_tokens = array("I")   # index of each line's first token
+            self.line_offsets = array("I")  # offset of each line's first character
         except FileNotFoundError:
             raise FileNotFoundError(f"Tokenize input file not found: {file_name}")
 
+    @classmethod
+    def from_text(cls, content: str) -> "Tokenizer":
+        """
+        Creates a Tokenizer over source text that is already in memory,
+        without reading a file.
+        Args:
+            content: The source text to tokenize.
+        Returns:
+            Tokenizer: A tokenizer whose content buffer is the given text.
+        """
+        tokenizer = cls.__new__(cls)
+        tokenizer.content = content
+        tokenizer.tokens = []
+        tokenizer.line_tokens = array("I")
+        tokenizer.line_offsets = array("I")
+        return tokenizer
+
     def __str__(self):
         """
         Returns a comma-separated string of all token values.
@@ -100,53 +147,80 @@ class Tokenizer:
                 values.append(token.value)
         return ", ".join(values)
 
-    def _read_digit_token(self) -> str:
-        """Read consecutive digit characters from the content buffer and
-        return the full literal string, advancing self._pos."""
-        result = ""
-        while self._pos < len(self.content) and self.content[self._pos].isdigit():
-            result += self.content[self._pos]
-            self._pos += 1
-        return result
-
-    def _read_alpha_token(self, start_char: str) -> str:
-        """Read consecutive alphanumeric characters from the content buffer
-        and return the full token string, advancing self._pos."""
-        result = start_char
-        while self._pos < len(self.content) and self.content[self._pos].isalnum():
-            result += self.content[self._pos]
-            self._pos += 1
-        return result
-
-    def get_string(self, start_char: str) -> str:
+    def tokenize(self, keep_invalid: bool = False) -> None:
         """
-        Reads consecutive characters from the content buffer to build a
-        complete alphanumeric token starting from the given character.
+        Splits the content buffer into token values with one findall scan
+        of _TOKEN_RE, then types them through a table that calls
+        Token.get_type once per distinct value, so each repeated variable,
+        literal and operator shares a single Token. Also fills the
+        per-line position arrays used by position().
         Args:
-            start_char: The first character of the token being built.
+            keep_invalid: If True, an alphanumeric run that is not a
+                valid token becomes a TokenType.INV token instead of
+                raising, so Parser.parse_recovering can report every one.
         Returns:
-            str: The complete token string.
+            None
+        Raises:
+            TypeError: If an alphanumeric run is not a valid token
+                (e.g. 'ab', 't', 'Q') and keep_invalid is False. The
+                message gives its line and column.
         """
-        if start_char.isdigit():
-            return start_char + self._read_digit_token()
-        return self._read_alpha_token(start_char)
+        table = {}
+        def lookup(value):
+            """Return the Token for value, classifying it on first use. The
+            first occurrence of a value is the one classified, so an
+            invalid value is reported at its first occurrence."""
+            try:
+                token = table[value] = Token(Token.get_type(value), value)
+            except TypeError as e:
+                if keep_invalid:
+                    token = table[value] = Token(TokenType.INV, value)
+                    return token
+                self._index_lines(values)
+                line, column = self.position(values.index(value))
+                raise TypeError(f"Line {line}, column {column}: {e}") from None
+            return token
+        values = _TOKEN_RE.findall(self.content)
+        self.tokens = [table[v] if v in table else lookup(v) for v in values]
+        self._index_lines(values)
+
+    def _index_lines(self, values: list) -> None:
+        """Record where each line starts: its first token's index in
+        line_tokens and its first character's offset in line_offsets.
+        Every newline is a token, so both grow once per line."""
+        line_tokens, line_offsets = array("I", [0]), array("I", [0])
+        index, offset = 0, 0
+        find = self.content.find
+        try:
+            while True:
+                index = values.index("\n", index) + 1
+                offset = find("\n", offset) + 1
+                line_tokens.append(index)
+                line_offsets.append(offset)
+        except ValueError:
+            pass
+        self.line_tokens, self.line_offsets = line_tokens, line_offsets
 
-    def tokenize(self) -> None:
+    def position(self, index: int) -> tuple:
         """
-        Reads the content buffer character by character and populates the
-        token list. Skips whitespace and groups alphanumeric characters
-        into complete tokens.
+        Returns the source position of a token. Only line starts are
+        stored, so the token's line is re-scanned to find its column;
+        this keeps tokenize() fast and costs nothing until a position is
+        actually needed, such as for an error message.
+        Args:
+            index: The token's index in the token list; an index equal
+                to the list length gives the position after the last
+                token.
         Returns:
-            None
+            tuple: (line, column), both starting at 1.
         """
-        self._pos = 0
-        while self._pos < len(self.content):
-            char = self.content[self._pos]
-            self._pos += 1
-            if char == " ":
-                continue
-            if char.isdigit() or char.isalpha():
-                var = self.get_string(char)
-                self.tokens.append(Token(value=var, type=Token.get_type(var)))
-            if char in "+-/*=\n:,":
-                self.tokens.append(Token(value=char, type=Token.get_type(char)))
+        line = bisect_right(self.line_tokens, index)
+        first = self.line_tokens[line - 1]
+        start = self.line_offsets[line - 1]
+        offset = start
+        for i, match in enumerate(_TOKEN_RE.finditer(self.content, start), first):
+            offset = match.start(1)
+            if i == index:
+                return line, offset - start + 1
+            offset = match.end()
+        return line, offset - start + 1